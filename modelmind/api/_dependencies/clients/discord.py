@@ -1,10 +1,16 @@
+import httpx
+from fastapi import Depends
+
+from modelmind.api._dependencies.clients.http_client import get_httpx_client
 from modelmind.config import settings
 from modelmind.services.discord.webhook import DiscordWebhookClient
 
 
-def get_discord_notifications_webhook_client() -> DiscordWebhookClient:
+def get_discord_notifications_webhook_client(
+    httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
+) -> DiscordWebhookClient:
     return DiscordWebhookClient(
         base_url=settings.discord.webhook_base_url,
         webhook_id=settings.discord.notifications_webhook_id,
-        timeout=8000,
+        client=httpx_client,
     )
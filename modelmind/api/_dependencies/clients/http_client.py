@@ -0,0 +1,6 @@
+import httpx
+from fastapi import Request
+
+
+def get_httpx_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.httpx_client
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, TypeVar
+
+from fastapi import HTTPException
+
+from modelmind.api.business.questionnaires.exceptions import QuestionnaireNotFoundException
+from modelmind.community.engines.engine_factory import EngineFactory
+from modelmind.db.daos.questionnaires import QuestionnairesDAO
+from modelmind.db.exceptions.questionnaires import DBQuestionnaireNotFound
+from modelmind.db.schemas.questionnaires import DBQuestionnaire
+from modelmind.db.schemas.questions import DBQuestion
+from modelmind.models.questionnaires.base import Questionnaire
+from modelmind.models.questions.schemas import Question
+
+T = TypeVar("T")
+
+
+def build_questionnaire(
+    db_questionnaire: DBQuestionnaire, language: str, db_questions: List[DBQuestion]
+) -> Questionnaire:
+    def build_questions() -> List[Question]:
+        # TODO: Convert the DBQuestion models to the correct BaseQuestion models
+        # BaseQuestion is abstract, so we need to convert to the correct subclass
+        return [Question(**question.model_dump()) for question in db_questions]
+
+    engine = EngineFactory.get_or_create_engine(
+        questionnaire_id=str(db_questionnaire.id),
+        language=language,
+        engine_name=db_questionnaire.engine,
+        questions_builder=build_questions,
+        config=db_questionnaire.config.get("engine"),
+        content_version=db_questionnaire.content_version,
+    )
+
+    return Questionnaire(name=db_questionnaire.name, engine=engine, questions=engine.questions)
+
+
+class QuestionnaireContext:
+    """
+    Request scoped loader of a questionnaire, its questions and its engine.
+
+    -> Every load runs at most once per request, concurrent callers await the same task.
+    -> The questionnaire document and its questions only depend on the id and language, so they load in parallel.
+    """
+
+    def __init__(
+        self,
+        questionnaire_id: str,
+        language: str,
+        questionnaires_dao: QuestionnairesDAO,
+        validate_language: bool = False,
+    ) -> None:
+        self.questionnaire_id = questionnaire_id
+        self.language = language
+        self.questionnaires_dao = questionnaires_dao
+        self.validate_language = validate_language
+        self._loads: Dict[str, asyncio.Future[Any]] = {}
+
+    def _once(self, name: str, load: Callable[[], Awaitable[T]]) -> "asyncio.Future[T]":
+        if name not in self._loads:
+            self._loads[name] = asyncio.ensure_future(load())
+        return self._loads[name]
+
+    async def db_questionnaire(self) -> DBQuestionnaire:
+        return await self._once("db_questionnaire", self._load_db_questionnaire)
+
+    async def db_questions(self) -> List[DBQuestion]:
+        return await self._once("db_questions", self._load_db_questions)
+
+    async def questionnaire(self) -> Questionnaire:
+        return await self._once("questionnaire", self._load_questionnaire)
+
+    async def _load_db_questionnaire(self) -> DBQuestionnaire:
+        try:
+            return await self.questionnaires_dao.get_from_id(self.questionnaire_id)
+        except DBQuestionnaireNotFound as e:
+            raise QuestionnaireNotFoundException(self.questionnaire_id) from e
+        except Exception as e:
+            logging.error("Failed to fetch questionnaire with id %s: %s", self.questionnaire_id, str(e))
+            raise HTTPException(status_code=500, detail=str(e)) from e
+
+    async def _load_db_questions(self) -> List[DBQuestion]:
+        if self.validate_language:
+            is_language_available = await self.questionnaires_dao.is_language_available(
+                self.questionnaire_id, self.language
+            )
+            if not is_language_available:
+                raise HTTPException(
+                    status_code=400, detail=f"Language {self.language} not available for this questionnaire"
+                )
+        try:
+            return await self.questionnaires_dao.get_questions(self.questionnaire_id, self.language)
+        except Exception as e:
+            logging.error(f"Failed to fetch questions for questionnaire with id '{self.questionnaire_id}': {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to fetch questions: {str(e)}")
+
+    async def _load_questionnaire(self) -> Questionnaire:
+        questionnaire_load = self._once("db_questionnaire", self._load_db_questionnaire)
+        questions_load = self._once("db_questions", self._load_db_questions)
+        done, pending = await asyncio.wait((questionnaire_load, questions_load), return_when=asyncio.FIRST_EXCEPTION)
+        if pending:
+            # One load failed and the request fails with it, do not leave the other one running unobserved
+            for load in pending:
+                load.cancel()
+            await asyncio.wait(pending)
+            failed = done.pop()
+            raise failed.exception()  # type: ignore[misc]
+        return build_questionnaire(questionnaire_load.result(), self.language, questions_load.result())
@@ -3,17 +3,15 @@ from typing import List
 
 from fastapi import Depends, HTTPException, Path
 
+from modelmind.api._dependencies.context import QuestionnaireContext, build_questionnaire
 from modelmind.api._dependencies.daos.providers import questionnaires_dao_provider
-from modelmind.api._dependencies.session.get import get_session_from_token
+from modelmind.api._dependencies.session.get import SessionClaims, get_session_claims
 from modelmind.api.business.questionnaires.exceptions import QuestionnaireNotFoundException
-from modelmind.community.engines.engine_factory import EngineFactory
 from modelmind.db.daos.questionnaires import QuestionnairesDAO
 from modelmind.db.exceptions.questionnaires import DBQuestionnaireNotFound
 from modelmind.db.schemas.questionnaires import DBQuestionnaire
 from modelmind.db.schemas.questions import DBQuestion
-from modelmind.db.schemas.sessions import DBSession
 from modelmind.models.questionnaires.base import Questionnaire
-from modelmind.models.questions.schemas import Question
 
 
 async def get_questionnaire_by_name(
@@ -57,33 +55,35 @@ async def validate_requested_language(
     return language
 
 
-async def get_questionnaire_from_session(
-    session: DBSession = Depends(get_session_from_token),
+async def get_language_from_session(claims: SessionClaims = Depends(get_session_claims)) -> str:
+    return claims.language
+
+
+async def get_session_questionnaire_context(
+    claims: SessionClaims = Depends(get_session_claims),
     questionnaires_dao: QuestionnairesDAO = Depends(questionnaires_dao_provider),
-) -> DBQuestionnaire:
-    try:
-        return await questionnaires_dao.get_from_id(session.questionnaire_id)
-    except DBQuestionnaireNotFound:
-        raise QuestionnaireNotFoundException(str(session.questionnaire_id))
-    except Exception as e:
-        logging.error(f"Failed to fetch questionnaire {session.questionnaire_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+) -> QuestionnaireContext:
+    return QuestionnaireContext(claims.questionnaire_id, claims.language, questionnaires_dao)
+
 
+async def get_path_questionnaire_context(
+    questionnaire_id: str = Path(alias="id"),
+    language: str = Depends(get_language_from_path),
+    questionnaires_dao: QuestionnairesDAO = Depends(questionnaires_dao_provider),
+) -> QuestionnaireContext:
+    return QuestionnaireContext(questionnaire_id, language, questionnaires_dao, validate_language=True)
 
-async def get_language_from_session(session: DBSession = Depends(get_session_from_token)) -> str:
-    return session.language
+
+async def get_questionnaire_from_session(
+    context: QuestionnaireContext = Depends(get_session_questionnaire_context),
+) -> DBQuestionnaire:
+    return await context.db_questionnaire()
 
 
 async def get_questions_from_session(
-    questionnaire: DBQuestionnaire = Depends(get_questionnaire_from_session),
-    questionnaires_dao: QuestionnairesDAO = Depends(questionnaires_dao_provider),
-    language: str = Depends(get_language_from_session),
+    context: QuestionnaireContext = Depends(get_session_questionnaire_context),
 ) -> List[DBQuestion]:
-    try:
-        return await questionnaires_dao.get_questions(questionnaire.id, language)
-    except Exception as e:
-        logging.error(f"Failed to fetch questions for questionnaire with id '{questionnaire.id}': {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch questions: {str(e)}")
+    return await context.db_questions()
 
 
 async def get_questions_by_questionnaire_name(
@@ -101,42 +101,26 @@ async def get_questions_by_questionnaire_name(
 
 
 async def get_questions_by_questionnaire_id(
-    questionnaire_id: str = Path(alias="id"),
-    questionnaires_dao: QuestionnairesDAO = Depends(questionnaires_dao_provider),
-    language: str = Depends(get_language_from_path),
+    context: QuestionnaireContext = Depends(get_path_questionnaire_context),
 ) -> List[DBQuestion]:
-    await validate_requested_language(questionnaire_id, questionnaires_dao, language)
-    try:
-        return await questionnaires_dao.get_questions(questionnaire_id, language)
-    except Exception as e:
-        logging.error(f"Failed to fetch questions for questionnaire with id '{questionnaire_id}': {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch questions: {str(e)}")
+    return await context.db_questions()
 
 
 async def initialize_questionnaire_from_id(
-    db_questionnaire: DBQuestionnaire = Depends(get_questionnaire_by_id),
-    db_questions: List[DBQuestion] = Depends(get_questions_by_questionnaire_id),
+    context: QuestionnaireContext = Depends(get_path_questionnaire_context),
 ) -> Questionnaire:
-    # TODO: Convert the DBQuestion models to the correct BaseQuestion models
-    # BaseQuestion is abstract, so we need to convert to the correct subclass
-    questions = [Question(**question.model_dump()) for question in db_questions]
-
-    engine = EngineFactory.create_engine(
-        db_questionnaire.engine, questions=questions, config=db_questionnaire.config.get("engine")
-    )
-
-    return Questionnaire(name=db_questionnaire.name, engine=engine, questions=questions)
+    return await context.questionnaire()
 
 
 async def initialize_questionnaire_from_session(
-    db_questionnaire: DBQuestionnaire = Depends(get_questionnaire_from_session),
-    db_questions: List[DBQuestion] = Depends(get_questions_from_session),
+    context: QuestionnaireContext = Depends(get_session_questionnaire_context),
 ) -> Questionnaire:
-    return await initialize_questionnaire_from_id(db_questionnaire, db_questions)
+    return await context.questionnaire()
 
 
 async def initialize_questionnaire_from_name(
     db_questionnaire: DBQuestionnaire = Depends(get_questionnaire_by_name),
+    language: str = Depends(get_language_from_path),
     db_questions: List[DBQuestion] = Depends(get_questions_by_questionnaire_name),
 ) -> Questionnaire:
-    return await initialize_questionnaire_from_id(db_questionnaire, db_questions)
+    return build_questionnaire(db_questionnaire, language, db_questions)
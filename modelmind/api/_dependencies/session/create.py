@@ -1,5 +1,8 @@
+from datetime import datetime
+from typing import Any, Optional
+
 import jwt
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Response
 
 from modelmind.api._dependencies.daos.providers import sessions_dao_provider
 from modelmind.config import settings
@@ -8,14 +11,38 @@ from modelmind.db.schemas import DBIdentifier
 from modelmind.db.schemas.sessions import DBSession, SessionStatus
 
 
-def create_jwt_session_token(session_id: DBIdentifier, profile_id: DBIdentifier) -> str:
-    payload = {
+def create_jwt_session_token(
+    session_id: DBIdentifier, profile_id: DBIdentifier, session: Optional[DBSession] = None
+) -> str:
+    payload: dict[str, Any] = {
         "session": str(session_id),
         "profile": str(profile_id),
     }
+    if session is not None and settings.jwt.session_claims:
+        stale_at = datetime.now().timestamp() + settings.jwt.session_claims_max_age
+        if session.expires_at:
+            # The session itself is read again to expire it
+            stale_at = min(stale_at, session.expires_at.timestamp())
+        payload["claims"] = {
+            "questionnaire": str(session.questionnaire_id),
+            "language": session.language,
+            "status": session.status.value,
+            "stale_at": stale_at,
+        }
     return jwt.encode(payload, settings.jwt.secret_key, algorithm=settings.jwt.algorithm)
 
 
+def set_session_cookie(response: Response, session: DBSession) -> None:
+    response.set_cookie(
+        key=settings.mm_session_cookie,
+        value=create_jwt_session_token(session.id, session.profile_id, session),
+        domain=settings.domain,
+        httponly=True,
+        secure=True,
+        samesite="strict",
+    )
+
+
 async def create_session(
     profile_id: DBIdentifier,
     questionnaire_id: DBIdentifier,
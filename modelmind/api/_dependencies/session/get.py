@@ -1,14 +1,18 @@
+import hashlib
 import json
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
 import jwt
-from fastapi import Depends, HTTPException, Request
+from fastapi import Depends, HTTPException, Request, Response
 from hkdf import Hkdf
 from jose.exceptions import JWEError
 from jose.jwe import decrypt
+from pydantic import BaseModel
 
 from modelmind.api._dependencies.daos.providers import sessions_dao_provider
+from modelmind.api._dependencies.session.create import set_session_cookie
 from modelmind.api.business.auth.exceptions import JWTExpiredException, JWTInvalidException, JWTMissingException
 from modelmind.config import settings
 from modelmind.db.daos.sessions import SessionsDAO
@@ -16,20 +20,36 @@ from modelmind.db.exceptions.sessions import SessionNotFound
 from modelmind.db.schemas import DBIdentifier
 from modelmind.db.schemas.sessions import DBSession, SessionStatus
 from modelmind.logger import log
+from modelmind.utils.cache import AsyncLRUCache
 
+# Payloads of the NextAuth tokens already decrypted, by digest of the secret and token
+_next_payloads = AsyncLRUCache(max_size=settings.jwt.next_token_cache_size, ttl=settings.jwt.next_token_cache_ttl)
 
+
+@lru_cache(maxsize=4)
 def __next_encryption_key(secret: str) -> bytes:
     return Hkdf("", bytes(secret, "utf-8")).expand(b"NextAuth.js Generated Encryption Key", 32)
 
 
 def decode_next_jwe(token: str, secret: str) -> Dict[str, Any]:
+    """Decrypt a NextAuth token, payloads of tokens seen before are served from a cache until they expire."""
+    key = hashlib.sha256(f"{secret}:{token}".encode("utf-8")).digest()
+    cached = _next_payloads.get(key)
+    if cached is not None:
+        return dict(cached)
+
     decrypted = decrypt(token, __next_encryption_key(secret))
 
     if decrypted:
-        return json.loads(bytes.decode(decrypted, "utf-8"))
+        payload = json.loads(bytes.decode(decrypted, "utf-8"))
     else:
         raise JWTInvalidException()
 
+    expires_in = payload.get("exp", 0) - datetime.now().timestamp()
+    if expires_in > 0:
+        _next_payloads.set(key, payload, ttl=min(expires_in, settings.jwt.next_token_cache_ttl))
+    return dict(payload)
+
 
 def get_next_payload_from_cookies(request: Request) -> Optional[dict]:
     session_token = request.cookies.get(settings.next_cookie)
@@ -67,19 +87,77 @@ async def get_session_from_id(
     session_id: DBIdentifier, sessions_dao: SessionsDAO = Depends(sessions_dao_provider)
 ) -> DBSession:
     try:
-        return await sessions_dao.get(session_id)
+        return await sessions_dao.get_from_id(session_id)
     except SessionNotFound:
         raise HTTPException(status_code=403, detail="Forbidden")
 
 
-async def fetch_session(session_id: DBIdentifier, sessions_dao: SessionsDAO) -> DBSession:
-    session = await get_session_from_id(session_id, sessions_dao)
+async def fetch_session(session_id: DBIdentifier, sessions_dao: SessionsDAO, fresh: bool = False) -> DBSession:
+    """A fresh session is read from Firestore, for status checks that another instance may have outdated."""
+    if fresh:
+        try:
+            session = await sessions_dao.get_fresh(session_id)
+        except SessionNotFound:
+            raise HTTPException(status_code=403, detail="Forbidden")
+    else:
+        session = await get_session_from_id(session_id, sessions_dao)
     if session.expires_at and session.expires_at < datetime.now():
         await sessions_dao.update_status(session_id, SessionStatus.EXPIRED)
-        session.status = SessionStatus.EXPIRED
+        # The session may be the cached one, which is shared and must not be mutated
+        session = session.model_copy(update={"status": SessionStatus.EXPIRED})
     return session
 
 
+class SessionClaims(BaseModel):
+    """Session fields needed to answer a questionnaire, read from the session token when it carries them."""
+
+    session_id: str
+    profile_id: str
+    questionnaire_id: str
+    language: str
+    status: SessionStatus
+
+    @classmethod
+    def from_session(cls, session: DBSession) -> "SessionClaims":
+        return cls(
+            session_id=str(session.id),
+            profile_id=str(session.profile_id),
+            questionnaire_id=str(session.questionnaire_id),
+            language=session.language,
+            status=session.status,
+        )
+
+
+async def get_session_claims(
+    response: Response,
+    jwt_payload: dict = Depends(get_session_payload_from_token),
+    sessions_dao: SessionsDAO = Depends(sessions_dao_provider),
+) -> SessionClaims:
+    """
+    Session claims from the token while they are fresh, from the session otherwise.
+
+    -> Stale or missing claims are read from the session and a new token is set, when session_claims is enabled.
+    -> Status sensitive operations must still check the session itself.
+    """
+    claims = jwt_payload.get("claims")
+    if claims and claims["stale_at"] > datetime.now().timestamp():
+        return SessionClaims(
+            session_id=jwt_payload["session"],
+            profile_id=jwt_payload["profile"],
+            questionnaire_id=claims["questionnaire"],
+            language=claims["language"],
+            status=claims["status"],
+        )
+
+    try:
+        session = await fetch_session(jwt_payload["session"], sessions_dao)
+    except ValueError:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    if settings.jwt.session_claims:
+        set_session_cookie(response, session)
+    return SessionClaims.from_session(session)
+
+
 async def get_session_from_token(
     session_id: DBIdentifier = Depends(get_session_id_from_token),
     sessions_dao: SessionsDAO = Depends(sessions_dao_provider),
@@ -88,3 +166,13 @@ async def get_session_from_token(
         return await fetch_session(session_id, sessions_dao)
     except ValueError:
         raise HTTPException(status_code=403, detail="Forbidden")
+
+
+async def get_fresh_session_from_token(
+    session_id: DBIdentifier = Depends(get_session_id_from_token),
+    sessions_dao: SessionsDAO = Depends(sessions_dao_provider),
+) -> DBSession:
+    try:
+        return await fetch_session(session_id, sessions_dao, fresh=True)
+    except ValueError:
+        raise HTTPException(status_code=403, detail="Forbidden")
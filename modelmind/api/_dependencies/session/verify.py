@@ -1,14 +1,22 @@
 from fastapi import Depends
 
+from modelmind.api._dependencies.daos.providers import sessions_dao_provider
 from modelmind.api.business.sessions.exceptions import (
     SessionAlreadyCompletedException,
     SessionExpiredException,
     SessionInProgressException,
     UnknownSessionStatusException,
 )
+from modelmind.db.daos.sessions import SessionsDAO
 from modelmind.db.schemas.sessions import DBSession, SessionStatus
 
-from .get import get_session_from_token
+from .get import (
+    SessionClaims,
+    fetch_session,
+    get_fresh_session_from_token,
+    get_session_claims,
+    get_session_from_token,
+)
 
 
 async def session_not_expired(session: DBSession = Depends(get_session_from_token)) -> DBSession:
@@ -29,7 +37,7 @@ async def session_status_in_progress(session: DBSession = Depends(get_session_fr
         raise UnknownSessionStatusException()
 
 
-async def session_status_completed(session: DBSession = Depends(get_session_from_token)) -> DBSession:
+async def session_status_completed(session: DBSession = Depends(get_fresh_session_from_token)) -> DBSession:
     if session.status == SessionStatus.COMPLETED:
         return session
     elif session.status == SessionStatus.IN_PROGRESS:
@@ -38,3 +46,13 @@ async def session_status_completed(session: DBSession = Depends(get_session_from
         raise SessionExpiredException(str(session.id))
     else:
         raise UnknownSessionStatusException()
+
+
+async def claims_status_in_progress(
+    claims: SessionClaims = Depends(get_session_claims),
+    sessions_dao: SessionsDAO = Depends(sessions_dao_provider),
+) -> SessionClaims:
+    if claims.status != SessionStatus.IN_PROGRESS:
+        # Raises the error matching the current status of the session
+        await session_status_in_progress(await fetch_session(claims.session_id, sessions_dao))
+    return claims
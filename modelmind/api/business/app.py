@@ -1,17 +1,22 @@
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 import google.cloud.logging as logging
+import httpx
 from fastapi import APIRouter, FastAPI
 from fastapi.datastructures import State as FastAPIState
-from fastapi.responses import UJSONResponse
 from google.cloud import firestore
 from google.cloud.logging import Logger
 
 from modelmind.api.business import health_router, profile_router, questionnaire_router, results_router
+from modelmind.api.responses import PydanticJSONResponse
+from modelmind.commands.warm_questionnaire_cache import WarmQuestionnaireCacheCommand
+from modelmind.commands.watch_questionnaire_versions import WatchQuestionnaireVersionsCommand
 from modelmind.config import PACKAGE_NAME, settings
 from modelmind.logger import log
 from modelmind.services.firestore.client import initialize_firestore_client
+from modelmind.services.httpx_client import create_async_client
 
 # from modelmind.services.monitoring.cloud_trace import meter_provider, tracer_provider
 # from modelmind.services.monitoring.error_reporting import ErrorReporting
@@ -23,6 +28,7 @@ class BusinessAPI(FastAPI):
         firestore: firestore.AsyncClient
         logging: logging.Client | None
         logger: Logger | None
+        httpx_client: httpx.AsyncClient
         # error_reporting: ErrorReporting | None
 
     state: State
@@ -42,6 +48,25 @@ def app() -> BusinessAPI:
         # On startup
         log.info("Starting up")
         app.state.firestore = initialize_firestore_client()
+        app.state.httpx_client = create_async_client()
+        if settings.questionnaire_cache.warm_on_startup:
+            try:
+                await asyncio.wait_for(
+                    WarmQuestionnaireCacheCommand(app.state.firestore).run(),
+                    timeout=settings.questionnaire_cache.warm_timeout,
+                )
+            except TimeoutError:
+                log.warning(
+                    "Questionnaire cache not warmed within %ss, starting with a partial cache",
+                    settings.questionnaire_cache.warm_timeout,
+                )
+        version_watcher = None
+        if settings.questionnaire_cache.version_poll_interval > 0:
+            version_watcher = asyncio.create_task(
+                WatchQuestionnaireVersionsCommand(
+                    app.state.firestore, settings.questionnaire_cache.version_poll_interval
+                ).run()
+            )
         app.state.logging = logging.Client()
         app.state.logger = app.state.logging.logger(PACKAGE_NAME)
         # app.state.error_reporting = ErrorReporting(service=PACKAGE_NAME)
@@ -49,6 +74,9 @@ def app() -> BusinessAPI:
         yield
         # On shutdown
         log.info("Shutting down")
+        if version_watcher:
+            version_watcher.cancel()
+        await app.state.httpx_client.aclose()
 
     app = BusinessAPI(
         title=f"{PACKAGE_NAME.capitalize()} Business API",
@@ -56,7 +84,7 @@ def app() -> BusinessAPI:
         docs_url=f"{settings.server.prefix}/docs",
         redoc_url=f"{settings.server.prefix}/redoc",
         openapi_url=f"{settings.server.prefix}/openapi.json",
-        default_response_class=UJSONResponse,
+        default_response_class=PydanticJSONResponse,
         lifespan=lifespan,
     )
     log.info("FastAPI application created")
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
-router = APIRouter()
+from modelmind.api.responses import ModelResponseRoute
+
+router = APIRouter(route_class=ModelResponseRoute)
 
 
 @router.get("/health-check")
@@ -8,6 +8,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from modelmind.config import PACKAGE_NAME, Environment, settings
+from modelmind.db.daos.sessions import SessionsDAO
+from modelmind.db.reads import total_reads, track_reads
+from modelmind.logger import log
 from modelmind.services.monitoring.cloud_trace import trace
 from modelmind.services.monitoring.trace_context import BaseContext, Context
 
@@ -72,6 +75,7 @@ def setup_middlewares(app: FastAPI) -> None:
             logger=request.app.state.logger,
         )
         request.scope["context"] = ctx
+        reads = track_reads()
         response = await call_next(request)
         latency = time() - begin
         ctx.set_latency(f"{latency}s")
@@ -79,7 +83,11 @@ def setup_middlewares(app: FastAPI) -> None:
 
         response.headers["X-Transaction-Id"] = ctx.trace_id
 
+        log.debug("Firestore reads for %s: %s", request.url.path, reads)
+        log.debug("Session cache: %s, hit rate %.2f", SessionsDAO.cache.stats(), SessionsDAO.cache.hit_rate)
+
         if settings.environment != Environment.PROD:
             response.headers["X-latency"] = f"{latency}s"
+            response.headers["X-Firestore-Reads"] = str(total_reads(reads))
 
         return response
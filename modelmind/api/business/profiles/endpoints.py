@@ -3,13 +3,14 @@ from fastapi import APIRouter, Depends
 from modelmind.api._dependencies.daos.providers import profiles_dao_provider, results_dao_provider
 from modelmind.api._dependencies.profile import get_profile
 from modelmind.api._dependencies.session.get import get_session_from_token
+from modelmind.api.responses import ModelResponseRoute
 from modelmind.db.daos.profiles import ProfilesDAO
 from modelmind.db.daos.results import ResultsDAO
 from modelmind.db.schemas.profiles import Biographics, DBProfile
-from modelmind.db.schemas.results import DBResult
+from modelmind.db.schemas.results import DBResultSummary
 from modelmind.db.schemas.sessions import DBSession
 
-router = APIRouter(prefix="/profile")
+router = APIRouter(prefix="/profile", route_class=ModelResponseRoute)
 
 
 @router.put("/me/biographics")
@@ -34,6 +35,9 @@ async def get_my_profile(
 async def get_my_profile_results(
     db_profile: DBProfile = Depends(get_profile),
     results_dao: ResultsDAO = Depends(results_dao_provider),
-) -> list[DBResult]:
+) -> list[DBResultSummary]:
     # May create a custom schema response
-    return await results_dao.list_from_profile(db_profile.id)
+    return [
+        DBResultSummary.model_validate(db_result.model_dump())
+        for db_result in await results_dao.list_from_profile(db_profile.id)
+    ]
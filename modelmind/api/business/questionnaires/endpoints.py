@@ -1,4 +1,5 @@
 import asyncio
+from typing import Any, Coroutine
 
 from fastapi import APIRouter, Depends, Response
 
@@ -16,27 +17,54 @@ from modelmind.api._dependencies.questionnaire import (
     initialize_questionnaire_from_session,
 )
 from modelmind.api._dependencies.results import get_result, get_result_from_session
-from modelmind.api._dependencies.session.create import create_jwt_session_token, create_session
-from modelmind.api._dependencies.session.get import get_session_from_token
-from modelmind.api._dependencies.session.verify import session_status_completed, session_status_in_progress
+from modelmind.api._dependencies.session.create import create_session, set_session_cookie
+from modelmind.api._dependencies.session.get import SessionClaims, fetch_session, get_session_from_token
+from modelmind.api._dependencies.session.verify import (
+    claims_status_in_progress,
+    session_status_completed,
+    session_status_in_progress,
+)
 from modelmind.api.business.analytics.schemas import AnalyticsResponse
 from modelmind.api.business.profiles.schemas import SessionResponse
-from modelmind.api.business.questionnaires.schemas import NextQuestionsResponse, SessionLanguageUpdateRequest
+from modelmind.api.business.questionnaires.exceptions import InvalidAnswersException
+from modelmind.api.business.questionnaires.schemas import (
+    NextQuestionsResponse,
+    SessionAnswersRequest,
+    SessionLanguageUpdateRequest,
+)
 from modelmind.api.business.results.schemas import ResultsResponse, ResultVisibility
+from modelmind.api.responses import ModelResponseRoute
+from modelmind.commands.complete_session import CompleteSessionCommand
 from modelmind.commands.send_result_notification import SendResultNotificationCommand
-from modelmind.config import settings
 from modelmind.db.daos.profiles import ProfilesDAO
 from modelmind.db.daos.results import ResultsDAO
 from modelmind.db.daos.sessions import SessionsDAO
+from modelmind.db.exceptions.sessions import SessionNotInProgress
 from modelmind.db.schemas.profiles import DBProfile
 from modelmind.db.schemas.questionnaires import DBQuestionnaire
 from modelmind.db.schemas.results import DBResult
 from modelmind.db.schemas.sessions import DBSession
+from modelmind.logger import log
 from modelmind.models.questionnaires.base import Questionnaire
 from modelmind.models.results.base import Result
 from modelmind.services.event_notifier import EventNotifier
 
-router = APIRouter(prefix="/questionnaire")
+router = APIRouter(prefix="/questionnaire", route_class=ModelResponseRoute)
+
+# The event loop only keeps weak references to tasks, running ones are kept here until they are done
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _run_in_background(coroutine: Coroutine[Any, Any, Any], name: str) -> None:
+    task = asyncio.create_task(coroutine, name=name)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_task_done)
+
+
+def _background_task_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        log.warning("Background task %s failed: %s", task.get_name(), task.exception())
 
 
 @router.get("/{id}/{language}/session", operation_id="start_questionnaire_session")
@@ -50,15 +78,7 @@ async def questionnaire_session_start(
 ) -> SessionResponse:
     session = await create_session(profile.id, questionnaire.id, language, {}, sessions_dao)
     await profiles_dao.add_session(profile.id, session.id)
-    session_token = create_jwt_session_token(session.id, profile.id)
-    response.set_cookie(
-        key=settings.mm_session_cookie,
-        value=session_token,
-        domain=settings.domain,
-        httponly=True,
-        secure=True,
-        samesite="strict",
-    )
+    set_session_cookie(response, session)
     return SessionResponse(
         profile_id=str(profile.id),
         session_id=str(session.id),
@@ -72,37 +92,81 @@ async def questionnaire_session_start(
 @router.post(
     "/session/questions/next",
     response_model=NextQuestionsResponse,
-    dependencies=[Depends(session_status_in_progress)],
     operation_id="get_questionnaire_session_next_questions",
 )
 async def questionnaire_session_questions_next(
     current_result: Result = Depends(get_result),
     questionnaire: Questionnaire = Depends(initialize_questionnaire_from_session),
-    session: DBSession = Depends(get_session_from_token),
+    claims: SessionClaims = Depends(claims_status_in_progress),
     sessions_dao: SessionsDAO = Depends(sessions_dao_provider),
     results_dao: ResultsDAO = Depends(results_dao_provider),
     profiles_dao: ProfilesDAO = Depends(profiles_dao_provider),
     notifier: EventNotifier = Depends(get_event_notifier),
 ) -> NextQuestionsResponse:
     """Get the next questions for the current session and result"""
+    return await answer_questionnaire(
+        current_result, questionnaire, claims, sessions_dao, results_dao, profiles_dao, notifier
+    )
+
+
+@router.post(
+    "/session/answers",
+    response_model=NextQuestionsResponse,
+    operation_id="submit_questionnaire_session_answers",
+)
+async def questionnaire_session_answers_submit(
+    request: SessionAnswersRequest,
+    questionnaire: Questionnaire = Depends(initialize_questionnaire_from_session),
+    claims: SessionClaims = Depends(claims_status_in_progress),
+    sessions_dao: SessionsDAO = Depends(sessions_dao_provider),
+    results_dao: ResultsDAO = Depends(results_dao_provider),
+    profiles_dao: ProfilesDAO = Depends(profiles_dao_provider),
+    notifier: EventNotifier = Depends(get_event_notifier),
+) -> NextQuestionsResponse:
+    """Store the newly answered questions and get the next questions, from the answers stored for the session"""
+    # Stored answers are scored on every later call, an invalid one would break the session for good
+    invalid_answers = questionnaire.invalid_answers(request.answers)
+    if invalid_answers:
+        raise InvalidAnswersException(invalid_answers)
+    # The stored answers may already include the new ones, the merge write does not depend on the read
+    stored_answers, _ = await asyncio.gather(
+        sessions_dao.get_answers(claims.session_id),
+        sessions_dao.add_answers(claims.session_id, request.answers),
+    )
+    current_result = Result(data={**stored_answers, **request.answers})
+    return await answer_questionnaire(
+        current_result, questionnaire, claims, sessions_dao, results_dao, profiles_dao, notifier
+    )
+
+
+async def answer_questionnaire(
+    current_result: Result,
+    questionnaire: Questionnaire,
+    claims: SessionClaims,
+    sessions_dao: SessionsDAO,
+    results_dao: ResultsDAO,
+    profiles_dao: ProfilesDAO,
+    notifier: EventNotifier,
+) -> NextQuestionsResponse:
+    # Only the answers changed since the previous call on this instance are scored, other calls recompute them all
+    state = questionnaire.update_state(current_result, sessions_dao.get_state(claims.session_id))
 
     if questionnaire.is_completed(current_result):
+        # Completion depends on the current status, claims from the token and cached sessions may be outdated
+        session = await session_status_in_progress(await fetch_session(claims.session_id, sessions_dao, fresh=True))
         current_result.label = questionnaire.get_result_label(current_result)
-        db_result = await results_dao.create(
-            session_id=session.id,
-            questionnaire_id=session.questionnaire_id,
-            profile_id=session.profile_id,
-            data=current_result.data,
-            label=current_result.label,
-            language=session.language,
-        )
-        await profiles_dao.add_result(session.profile_id, db_result.id)
-        await sessions_dao.set_result(session.id, db_result.id)
+        complete_session = CompleteSessionCommand(session, current_result, results_dao, profiles_dao, sessions_dao)
+        try:
+            db_result = await complete_session.run()
+        except SessionNotInProgress as e:
+            # Completed or expired by a concurrent request since the check
+            await session_status_in_progress(e.session)
+            raise
 
         send_result_notifcation = SendResultNotificationCommand(
             questionnaire, current_result, notifier, session.profile_id, profiles_dao
         )
-        asyncio.create_task(send_result_notifcation.run())
+        _run_in_background(send_result_notifcation.run(), f"result-notification-{session.id}")
 
         return NextQuestionsResponse(
             questions=[], completed=current_result.answered_questions_count(), remaining=0, result_id=str(db_result.id)
@@ -112,6 +176,9 @@ async def questionnaire_session_questions_next(
     remaining = await questionnaire.get_remaining_questions_count(current_result)
     completed = current_result.answered_questions_count()
 
+    if state is not None:
+        sessions_dao.set_state(claims.session_id, state)
+
     return NextQuestionsResponse(questions=next_questions, completed=completed, remaining=remaining)
 
 
@@ -154,11 +221,14 @@ async def get_current_session(
 
 @router.put("/session/language", operation_id="update_current_session_language")
 async def update_current_session_language(
+    response: Response,
     update_request: SessionLanguageUpdateRequest,
     session: DBSession = Depends(get_session_from_token),
     sessions_dao: SessionsDAO = Depends(sessions_dao_provider),
 ) -> None:
     await sessions_dao.update_language(session.id, update_request.language)
+    # The language is one of the claims of the session token
+    set_session_cookie(response, session.model_copy(update={"language": update_request.language}))
 
 
 @router.post(
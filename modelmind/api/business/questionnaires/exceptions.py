@@ -1,7 +1,12 @@
-from modelmind.api.exceptions import NotFoundException
+from modelmind.api.exceptions import NotFoundException, UnprocessableEntityException
 
 
 class QuestionnaireNotFoundException(NotFoundException):
     def __init__(self, name: str):
         detail = f"Questionnaire '{name}' not found."
         super().__init__(detail=detail)
+
+
+class InvalidAnswersException(UnprocessableEntityException):
+    def __init__(self, errors: dict[str, str]):
+        super().__init__(detail={"msg": "Invalid answers", "errors": errors})
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Optional
 
 from modelmind.api.business.schemas import BaseResponse
 from modelmind.models.questions.schemas import Question
@@ -16,3 +16,8 @@ class NextQuestionsResponse(BaseResponse):
 
 class SessionLanguageUpdateRequest(BaseResponse):
     language: str
+
+
+class SessionAnswersRequest(BaseResponse):
+    # Only the questions answered since the previous submission
+    answers: dict[str, Any]
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, Path
 from modelmind.api._dependencies.daos.providers import results_dao_provider
 from modelmind.api._dependencies.profile import get_profile_optional
 from modelmind.api._dependencies.results import get_result_from_path, is_result_owner
+from modelmind.api.responses import ModelResponseRoute
 from modelmind.db.daos.results import ResultsDAO
 from modelmind.db.schemas.profiles import DBProfile
 from modelmind.db.schemas.results import DBResult
@@ -10,7 +11,7 @@ from modelmind.db.schemas.results import DBResult
 from .exceptions import ResultAccessForbiddenException
 from .schemas import ResultsResponse, ResultVisibility
 
-router = APIRouter(prefix="/results")
+router = APIRouter(prefix="/results", route_class=ModelResponseRoute)
 
 
 @router.get("/{result_id}", response_model=ResultsResponse, operation_id="get_result")
@@ -36,6 +36,11 @@ class GoneException(HTTPException):
         super().__init__(status_code=410, detail=detail)
 
 
+class UnprocessableEntityException(HTTPException):
+    def __init__(self, detail):
+        super().__init__(status_code=422, detail=detail)
+
+
 class TooManyRequestsException(HTTPException):
     def __init__(self, detail):
         super().__init__(status_code=429, detail=detail)
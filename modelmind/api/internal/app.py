@@ -2,16 +2,18 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 import google.cloud.logging as logging
+import httpx
 from fastapi import APIRouter, FastAPI
 from fastapi.datastructures import State as FastAPIState
-from fastapi.responses import UJSONResponse
 from google.cloud import bigquery, firestore
 from google.cloud.logging import Logger
 
 from modelmind.api.internal import health_router, statistics_router
+from modelmind.api.responses import PydanticJSONResponse
 from modelmind.config import PACKAGE_NAME, settings
 from modelmind.logger import log
 from modelmind.services.firestore.client import initialize_firestore_client
+from modelmind.services.httpx_client import create_async_client
 
 # from modelmind.services.monitoring.cloud_trace import meter_provider, tracer_provider
 # from modelmind.services.monitoring.error_reporting import ErrorReporting
@@ -24,6 +26,7 @@ class InternalAPI(FastAPI):
         bigquery: bigquery.Client
         logging: logging.Client | None
         logger: Logger | None
+        httpx_client: httpx.AsyncClient
 
     state: State
 
@@ -43,6 +46,7 @@ def app() -> InternalAPI:
         # On startup
         log.info("Starting up")
         app.state.firestore = initialize_firestore_client()
+        app.state.httpx_client = create_async_client()
         app.state.bigquery = BigqueryClient()
         app.state.logging = logging.Client()
         app.state.logger = app.state.logging.logger(PACKAGE_NAME)
@@ -51,6 +55,7 @@ def app() -> InternalAPI:
         yield
         # On shutdown
         log.info("Shutting down")
+        await app.state.httpx_client.aclose()
 
     app = InternalAPI(
         title=PACKAGE_NAME + " Internal API",
@@ -58,7 +63,7 @@ def app() -> InternalAPI:
         docs_url=f"{settings.server.prefix}/docs",
         redoc_url=f"{settings.server.prefix}/redoc",
         openapi_url=f"{settings.server.prefix}/openapi.json",
-        default_response_class=UJSONResponse,
+        default_response_class=PydanticJSONResponse,
         lifespan=lifespan,
     )
 
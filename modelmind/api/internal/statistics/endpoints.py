@@ -1,15 +1,20 @@
+import asyncio
+from typing import Optional
+
 from fastapi import APIRouter, Body, Depends
 
 from modelmind.api._dependencies.clients.bigquery import get_bigquery_client
-from modelmind.api._dependencies.daos.providers import questionnaires_dao_provider
+from modelmind.api._dependencies.daos.providers import questionnaires_dao_provider, results_dao_provider
 from modelmind.api._dependencies.notifier import get_event_notifier
-from modelmind.api.internal.statistics.schemas import CalculateStatisticsRequest
+from modelmind.api.internal.statistics.schemas import CalculateStatisticsRequest, ResultsCountsResponse
+from modelmind.api.responses import ModelResponseRoute
 from modelmind.commands.calculate_persony_statistics import CalculatePersonyStatisticsCommand
 from modelmind.db.daos.questionnaires import QuestionnairesDAO
+from modelmind.db.daos.results import ResultsDAO
 from modelmind.services.bigquery.client import BigqueryClient
 from modelmind.services.event_notifier import EventNotifier
 
-router = APIRouter(prefix="/statistics")
+router = APIRouter(prefix="/statistics", route_class=ModelResponseRoute)
 
 
 @router.post("/persony")
@@ -18,10 +23,28 @@ async def calculate_questionnaire_statistics(
     bigquery_client: BigqueryClient = Depends(get_bigquery_client),
     questionnaires_dao: QuestionnairesDAO = Depends(questionnaires_dao_provider),
     event_notifier: EventNotifier = Depends(get_event_notifier),
-) -> None:
+    results_dao: ResultsDAO = Depends(results_dao_provider),
+) -> Optional[ResultsCountsResponse]:
+    if request.mode == "counts":
+        return await count_questionnaire_results(request.questionnaire_id, questionnaires_dao, results_dao)
+
     await CalculatePersonyStatisticsCommand(
         questionnaire_id=request.questionnaire_id,
         bigquery_client=bigquery_client,
         questionnaires_dao=questionnaires_dao,
         event_notifier=event_notifier,
     ).run()
+    return None
+
+
+async def count_questionnaire_results(
+    questionnaire_id: str, questionnaires_dao: QuestionnairesDAO, results_dao: ResultsDAO
+) -> ResultsCountsResponse:
+    languages = await questionnaires_dao.get_available_languages(questionnaire_id)
+    total, *counts = await asyncio.gather(
+        results_dao.count_from_questionnaire(questionnaire_id),
+        *[results_dao.count_from_questionnaire(questionnaire_id, language) for language in languages],
+    )
+    return ResultsCountsResponse(
+        questionnaire_id=questionnaire_id, total=total, by_language=dict(zip(languages, counts))
+    )
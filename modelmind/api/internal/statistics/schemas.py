@@ -1,5 +1,15 @@
+from typing import Dict, Literal
+
 from pydantic import BaseModel
 
 
 class CalculateStatisticsRequest(BaseModel):
     questionnaire_id: str
+    # "counts" only counts the stored results in Firestore, without starting BigQuery jobs or storing statistics
+    mode: Literal["full", "counts"] = "full"
+
+
+class ResultsCountsResponse(BaseModel):
+    questionnaire_id: str
+    total: int
+    by_language: Dict[str, int]
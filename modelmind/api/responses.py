@@ -0,0 +1,148 @@
+import json
+from functools import wraps
+from inspect import Parameter, isclass, iscoroutinefunction, signature
+from typing import Any, Callable, Coroutine, Optional, Type
+
+import pydantic_core
+from fastapi import Request, Response, params
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.dependencies.utils import get_flat_dependant, get_typed_return_annotation
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ValidationError
+
+# Response injected in rendered endpoints, shared with the dependencies setting cookies or headers
+_SUB_RESPONSE = "_rendered_sub_response"
+
+
+class PydanticJSONResponse(JSONResponse):
+    """JSON response rendered in a single pass by pydantic-core, models, datetimes and enums included."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return pydantic_core.to_json(content)
+
+
+class ModelBodyRequest(Request):
+    """Request parsing its JSON body straight into the body model of the route, in a single pass by pydantic-core."""
+
+    def __init__(self, request: Request, body_model: Type[BaseModel]) -> None:
+        super().__init__(request.scope, request.receive)
+        self.body_model = body_model
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            try:
+                self._json = self.body_model.model_validate_json(body)
+            except ValidationError:
+                # FastAPI validates the decoded body again and reports its errors, or the decoding error, as usual
+                self._json = json.loads(body)
+        return self._json
+
+
+class ModelResponseRoute(APIRoute):
+    """
+    Route rendering the response model returned by its endpoint straight to JSON.
+
+    -> FastAPI validates the returned model again, then encodes it to python objects before dumping them.
+        When the endpoint returns an instance of the response model itself, the model is rendered as is.
+    -> Only applies with PydanticJSONResponse and without response_model_* options, other returns go through FastAPI.
+    -> A body made of a single model is also validated straight from the raw JSON, see ModelBodyRequest.
+        FastAPI then gets the model instance, which pydantic does not validate again.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        endpoint = getattr(endpoint, "__rendered_endpoint__", endpoint)
+        response_model = kwargs.get("response_model")
+        if response_model is None or isinstance(response_model, DefaultPlaceholder):
+            response_model = get_typed_return_annotation(endpoint)
+        response_class = kwargs.get("response_class")
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+
+        if (
+            iscoroutinefunction(endpoint)
+            and isclass(response_model)
+            and issubclass(response_model, BaseModel)
+            and isclass(response_class)
+            and issubclass(response_class, PydanticJSONResponse)
+            and not any(kwargs.get(option) for option in _RESPONSE_MODEL_OPTIONS)
+            and kwargs.get("response_model_by_alias", True)
+        ):
+            endpoint = render_model_endpoint(endpoint, response_model, response_class, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        body_model = self.body_model()
+        if body_model is None:
+            return handler
+
+        async def parse_body_handler(request: Request) -> Response:
+            return await handler(ModelBodyRequest(request, body_model))
+
+        return parse_body_handler
+
+    def body_model(self) -> Optional[Type[BaseModel]]:
+        """The model of the body, when it is the single, not embedded, JSON body parameter of the route."""
+        body_field = self.body_field
+        # Several or embedded body parameters are combined into a model of their own, left to FastAPI
+        if body_field is None or not any(
+            body_field is param for param in get_flat_dependant(self.dependant).body_params
+        ):
+            return None
+        if isinstance(body_field.field_info, params.Form):
+            return None
+        body_type = body_field.field_info.annotation
+        return body_type if isclass(body_type) and issubclass(body_type, BaseModel) else None
+
+
+_RESPONSE_MODEL_OPTIONS = (
+    "response_model_include",
+    "response_model_exclude",
+    "response_model_exclude_unset",
+    "response_model_exclude_defaults",
+    "response_model_exclude_none",
+)
+
+
+def render_model_endpoint(
+    endpoint: Callable[..., Coroutine[Any, Any, Any]],
+    response_model: Type[BaseModel],
+    response_class: Type[PydanticJSONResponse],
+    status_code: Optional[int],
+) -> Callable[..., Coroutine[Any, Any, Any]]:
+    endpoint_signature = signature(endpoint)
+    # FastAPI injects a single response, reuse the one of the endpoint if it asks for it
+    response_param = next(
+        (
+            name
+            for name, parameter in endpoint_signature.parameters.items()
+            if isclass(parameter.annotation) and issubclass(parameter.annotation, Response)
+        ),
+        None,
+    )
+
+    @wraps(endpoint)
+    async def rendered(*args: Any, **kwargs: Any) -> Any:
+        sub_response: Response = kwargs[response_param] if response_param else kwargs.pop(_SUB_RESPONSE)
+        content = await endpoint(*args, **kwargs)
+        # A subclass may carry fields the response model leaves out, FastAPI filters them
+        if type(content) is not response_model:
+            return content
+
+        response = response_class(content, status_code=sub_response.status_code or status_code or 200)
+        response.headers.raw.extend(
+            (name, value) for name, value in sub_response.headers.raw if name != b"content-length"
+        )
+        return response
+
+    if response_param is None:
+        sub_response = Parameter(_SUB_RESPONSE, Parameter.KEYWORD_ONLY, annotation=Response)
+        rendered.__signature__ = endpoint_signature.replace(  # type: ignore[attr-defined]
+            parameters=[*endpoint_signature.parameters.values(), sub_response]
+        )
+    rendered.__rendered_endpoint__ = endpoint  # type: ignore[attr-defined]
+    return rendered
@@ -1,3 +1,5 @@
+from typing import Optional
+
 import typer
 import uvicorn
 
@@ -43,3 +45,100 @@ def schedule_calculate_persony_statistics_tasks() -> None:
         await command.run()
 
     asyncio.run(run_command())
+
+
+@cli.command(name="rescore-results")
+def rescore_results(
+    questionnaire_id: str,
+    batch_size: int = 500,
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+    resume_after: Optional[str] = None,
+) -> None:
+    """
+    Recompute the labels of the stored results of a questionnaire, use --workers 0 to score in process.
+    Use --resume-after with the last logged checkpoint to continue an interrupted run.
+    """
+    import asyncio
+
+    from modelmind.commands.rescore_results import RescoreResultsCommand
+    from modelmind.db.daos.questionnaires import QuestionnairesDAO
+    from modelmind.db.daos.results import ResultsDAO
+    from modelmind.services.firestore.client import initialize_firestore_client
+
+    async def run_command() -> None:
+        firestore_client = initialize_firestore_client()
+        command = RescoreResultsCommand(
+            questionnaire_id=questionnaire_id,
+            questionnaires_dao=QuestionnairesDAO(firestore_client),
+            results_dao=ResultsDAO(firestore_client),
+            batch_size=batch_size,
+            workers=workers,
+            dry_run=dry_run,
+            resume_after=resume_after,
+        )
+        report = await command.run()
+        typer.echo(
+            f"{report['total']} results scored in {report['duration']:.2f}s ({report['throughput']:.1f} results/s): "
+            f"{report['updated']} updated, {report['unchanged']} unchanged, {report['failed']} failed"
+            + (" [dry run, nothing written]" if report["dry_run"] else "")
+        )
+        if report["checkpoint"]:
+            typer.echo(f"Checkpoint: {report['checkpoint']}")
+
+    asyncio.run(run_command())
+
+
+@cli.command(name="benchmark-response-rendering")
+def benchmark_response_rendering(questions: int = 100, iterations: int = 2000) -> None:
+    """Compare FastAPI's default rendering of a NextQuestionsResponse with PydanticJSONResponse."""
+    import asyncio
+    from timeit import timeit
+
+    from fastapi.responses import UJSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from pydantic import TypeAdapter
+
+    from modelmind.api.business.questionnaires.schemas import NextQuestionsResponse
+    from modelmind.api.responses import PydanticJSONResponse
+    from modelmind.models.questions.schemas import Question
+
+    response = NextQuestionsResponse(
+        questions=TypeAdapter(list[Question]).validate_python(
+            [
+                {
+                    "id": f"question-{index}",
+                    "category": f"category-{index % 5}",
+                    "language": "en",
+                    "question": {
+                        "type": "scale",
+                        "text": f"How much do you agree with statement {index}?",
+                        "min": 1,
+                        "max": 5,
+                        "interval": 1,
+                        "low_label": "Disagree",
+                        "high_label": "Agree",
+                    },
+                }
+                for index in range(questions)
+            ]
+        ),
+        completed=0,
+        remaining=questions,
+    )
+    response_field = create_response_field(name="response", type_=NextQuestionsResponse)
+
+    async def default() -> bytes:
+        content = await serialize_response(field=response_field, response_content=response)
+        return UJSONResponse(content).body
+
+    loop = asyncio.new_event_loop()
+    default_duration = timeit(lambda: loop.run_until_complete(default()), number=iterations)
+    rendered_duration = timeit(lambda: PydanticJSONResponse(response).body, number=iterations)
+    loop.close()
+
+    typer.echo(f"{questions} questions, {iterations} renders")
+    typer.echo(f"FastAPI + UJSONResponse: {default_duration / iterations * 1e6:.1f}us per response")
+    typer.echo(f"PydanticJSONResponse:    {rendered_duration / iterations * 1e6:.1f}us per response")
+    typer.echo(f"Speedup: {default_duration / rendered_duration:.1f}x")
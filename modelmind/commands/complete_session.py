@@ -0,0 +1,98 @@
+import asyncio
+from typing import Optional
+from uuid import uuid4
+
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition
+
+from modelmind.db.daos.base import RETRYABLE_ERRORS
+from modelmind.db.daos.profiles import ProfilesDAO
+from modelmind.db.daos.results import ResultsDAO
+from modelmind.db.daos.sessions import SessionsDAO
+from modelmind.db.exceptions.sessions import SessionCompletionFailed, SessionNotInProgress
+from modelmind.db.schemas.results import DBResult
+from modelmind.db.schemas.sessions import DBSession, SessionStatus
+from modelmind.logger import log
+from modelmind.models.results.base import Result
+
+from .base import Command
+
+
+class CompleteSessionCommand(Command[DBResult]):
+    """
+    Store the result of a session, link it to the profile and complete the session in a single atomic batch.
+
+    -> The session status is read from Firestore, not from the instance cache, and the batch only commits if the
+        session was not written since. A concurrent completion raises SessionNotInProgress instead of a second result.
+    """
+
+    def __init__(
+        self,
+        session: DBSession,
+        result: Result,
+        results_dao: ResultsDAO,
+        profiles_dao: ProfilesDAO,
+        sessions_dao: SessionsDAO,
+        max_attempts: int = 3,
+        backoff: float = 0.1,
+    ) -> None:
+        self.session = session
+        self.result = result
+        self.results_dao = results_dao
+        self.profiles_dao = profiles_dao
+        self.sessions_dao = sessions_dao
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+    async def _run(self) -> DBResult:
+        # Same id on every attempt so a retry can never create a second result
+        result_id = str(uuid4())
+        db_result: Optional[DBResult] = None
+
+        for attempt in range(1, self.max_attempts + 1):
+            session, update_time = await self.sessions_dao.get_versioned(self.session.id)
+            if db_result is not None and session.result_id == result_id:
+                # A previous attempt was committed even though it reported an error
+                return db_result
+            if session.status != SessionStatus.IN_PROGRESS:
+                raise SessionNotInProgress(f"Session {self.session.id} is {session.status.value}", session)
+
+            batch = self.results_dao.db.batch()
+            db_result = await self.results_dao.create(
+                session_id=self.session.id,
+                questionnaire_id=self.session.questionnaire_id,
+                profile_id=self.session.profile_id,
+                data=self.result.data,
+                label=self.result.label or "",
+                language=self.session.language,
+                id=result_id,
+                batch=batch,
+            )
+            await self.profiles_dao.add_result(self.session.profile_id, result_id, batch=batch)
+            await self.sessions_dao.set_result(self.session.id, result_id, batch=batch, last_update_time=update_time)
+
+            try:
+                await batch.commit()
+            except FailedPrecondition:
+                # Written since it was read, the next attempt checks its status again
+                log.info("Session %s changed during its completion, attempt %s", self.session.id, attempt)
+                continue
+            except AlreadyExists:
+                # The result is only created along with the other writes, a previous attempt committed all of them
+                log.info("Session %s completion already committed with result %s", self.session.id, result_id)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_attempts:
+                    raise SessionCompletionFailed(
+                        f"Session {self.session.id} completion failed after {attempt} attempts: {str(e)}"
+                    )
+                log.warning("Session %s completion attempt %s failed, retrying: %s", self.session.id, attempt, e)
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+                continue
+            except Exception as e:
+                raise SessionCompletionFailed(f"Session {self.session.id} completion failed: {str(e)}")
+
+            self.sessions_dao.update_cached(
+                self.session.id, {"result_id": result_id, "status": SessionStatus.COMPLETED}
+            )
+            return db_result
+
+        raise SessionCompletionFailed(f"Session {self.session.id} completion failed")
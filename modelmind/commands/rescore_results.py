@@ -0,0 +1,216 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from time import perf_counter
+from typing import Any, Optional, TypedDict
+
+from modelmind.community.engines.engine_factory import EngineFactory
+from modelmind.db.daos.questionnaires import QuestionnairesDAO
+from modelmind.db.daos.results import ResultsDAO
+from modelmind.db.exceptions.base import DBBatchWriteFailed
+from modelmind.db.schemas import DBIdentifier
+from modelmind.logger import log
+from modelmind.models.engines.base import Engine
+from modelmind.models.questions.schemas import Question
+from modelmind.models.results import Result
+
+from .base import Command
+
+# Engine compiled once per worker process by the pool initializer
+_worker_engine: Optional[Engine] = None
+
+
+def init_scoring_worker(engine_name: str, questions: list[dict[str, Any]], config: Optional[dict[str, Any]]) -> None:
+    global _worker_engine
+    _worker_engine = EngineFactory.create_engine(
+        engine_name, questions=[Question.model_validate(question) for question in questions], config=config
+    )
+
+
+def score_batch(results_data: list[dict[str, Any]]) -> list[Optional[str]]:
+    """Score a batch of results data in the worker, a result that cannot be scored gets a None label."""
+    if _worker_engine is None:
+        raise RuntimeError("Scoring worker not initialized")
+    try:
+        return list(_worker_engine.score_many(Result(data=data) for data in results_data))
+    except Exception:
+        labels: list[Optional[str]] = []
+        for data in results_data:
+            try:
+                labels.append(_worker_engine.calculate_result_label(Result(data=data)))
+            except Exception as e:
+                log.warning("Rescore: failed to score result: %s", e)
+                labels.append(None)
+        return labels
+
+
+class RescoreReport(TypedDict):
+    questionnaire_id: str
+    dry_run: bool
+    total: int
+    updated: int
+    unchanged: int
+    failed: int
+    # Last result of the pages whose labels are all written, to pass to resume_after
+    checkpoint: Optional[str]
+    duration: float
+    throughput: float
+
+
+class RescoreResultsCommand(Command[RescoreReport]):
+    """Recompute the label of every stored result of a questionnaire with its current engine and questions."""
+
+    def __init__(
+        self,
+        questionnaire_id: str,
+        questionnaires_dao: QuestionnairesDAO,
+        results_dao: ResultsDAO,
+        batch_size: int = 500,
+        workers: Optional[int] = None,
+        dry_run: bool = False,
+        resume_after: Optional[str] = None,
+        max_pending_writes: int = 4,
+    ) -> None:
+        self.questionnaire_id = questionnaire_id
+        self.questionnaires_dao = questionnaires_dao
+        self.results_dao = results_dao
+        self.batch_size = batch_size
+        self.workers = workers
+        self.dry_run = dry_run
+        self.resume_after = resume_after
+        self.max_pending_writes = max_pending_writes
+
+    async def get_questions(self) -> list[dict[str, Any]]:
+        db_questions = await self.questionnaires_dao.get_questions(self.questionnaire_id)
+        # Results only reference question keys, which are shared by every language
+        questions: dict[str, dict[str, Any]] = {}
+        for db_question in db_questions:
+            question = db_question.model_dump()
+            questions.setdefault(question["id"], question)
+        return list(questions.values())
+
+    async def _run(self) -> RescoreReport:
+        db_questionnaire = await self.questionnaires_dao.get_from_id(self.questionnaire_id)
+        questions = await self.get_questions()
+        initargs = (db_questionnaire.engine, questions, db_questionnaire.config.get("engine"))
+
+        report = RescoreReport(
+            questionnaire_id=self.questionnaire_id,
+            dry_run=self.dry_run,
+            total=0,
+            updated=0,
+            unchanged=0,
+            failed=0,
+            checkpoint=self.resume_after,
+            duration=0.0,
+            throughput=0.0,
+        )
+
+        self.start = perf_counter()
+        executor: Optional[Executor] = None
+        if self.workers != 0:
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_scoring_worker, initargs=initargs)
+        else:
+            init_scoring_worker(*initargs)
+
+        try:
+            await self.rescore(executor, report)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        report["duration"] = perf_counter() - self.start
+        report["throughput"] = report["total"] / report["duration"] if report["duration"] > 0 else 0.0
+        log.info(
+            "Rescore of questionnaire %s finished: %s results, %s updated, %s failed in %.2fs (%.1f results/s)%s",
+            self.questionnaire_id,
+            report["total"],
+            report["updated"],
+            report["failed"],
+            report["duration"],
+            report["throughput"],
+            " [dry run]" if self.dry_run else "",
+        )
+        return report
+
+    async def rescore(self, executor: Optional[Executor], report: RescoreReport) -> None:
+        loop = asyncio.get_running_loop()
+        # Write of each page in page order, None when nothing is written, with the last result of the page
+        pending_writes: deque[tuple[Optional[asyncio.Task[bool]], str]] = deque()
+        checkpointed = True
+
+        async for page in self.results_dao.iter_from_questionnaire(
+            self.questionnaire_id, page_size=self.batch_size, resume_after=self.resume_after
+        ):
+            results_data = [db_result.data for db_result in page]
+            if executor:
+                labels = await loop.run_in_executor(executor, score_batch, results_data)
+            else:
+                labels = score_batch(results_data)
+
+            updated_labels = {}
+            for db_result, label in zip(page, labels):
+                if label is None:
+                    report["failed"] += 1
+                elif label != db_result.label:
+                    updated_labels[db_result.id] = label
+                else:
+                    report["unchanged"] += 1
+            report["total"] += len(page)
+
+            write: Optional[asyncio.Task[bool]] = None
+            if updated_labels and not self.dry_run:
+                # Writes of a page overlap with the scoring of the next ones
+                write = asyncio.create_task(self.write_labels(updated_labels, report))
+            else:
+                report["updated"] += len(updated_labels)
+            pending_writes.append((write, str(page[-1].id)))
+
+            checkpointed = await self.checkpoint(pending_writes, self.max_pending_writes, report, checkpointed)
+            log.info(
+                "Rescore: %s results processed (%.1f results/s)",
+                report["total"],
+                report["total"] / (perf_counter() - self.start),
+            )
+
+        await self.checkpoint(pending_writes, 0, report, checkpointed)
+
+    async def checkpoint(
+        self,
+        pending_writes: deque[tuple[Optional[asyncio.Task[bool]], str]],
+        max_pending: int,
+        report: RescoreReport,
+        checkpointed: bool,
+    ) -> bool:
+        """
+        Wait for the oldest writes until at most max_pending are running, then move the checkpoint past the pages
+        whose writes are done. The checkpoint stops at the first page with labels not written.
+        """
+        while pending_writes:
+            write, last_result_id = pending_writes[0]
+            if write is not None and not write.done():
+                if sum(1 for pending, _ in pending_writes if pending is not None) <= max_pending:
+                    break
+                await write
+            pending_writes.popleft()
+
+            if write is not None and not write.result() and checkpointed:
+                log.warning("Rescore: labels not all written, checkpoint kept at %s", report["checkpoint"])
+                checkpointed = False
+            if checkpointed:
+                report["checkpoint"] = last_result_id
+                log.info("Rescore: checkpoint %s", last_result_id)
+        return checkpointed
+
+    async def write_labels(self, labels: dict[DBIdentifier, str], report: RescoreReport) -> bool:
+        """Write the labels of a page, a label is only counted as updated once its write is committed."""
+        try:
+            await self.results_dao.update_labels(labels)
+        except DBBatchWriteFailed as e:
+            written = sum(1 for result in e.results if result.error is None)
+            log.warning("Rescore: %s labels not written: %s", len(labels) - written, e)
+            report["updated"] += written
+            report["failed"] += len(labels) - written
+            return False
+        report["updated"] += len(labels)
+        return True
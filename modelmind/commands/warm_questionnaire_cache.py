@@ -0,0 +1,29 @@
+from google.cloud import firestore
+
+from modelmind.db.daos.questionnaires import QuestionnairesDAO
+from modelmind.db.schemas.settings import SchedulerSettings
+from modelmind.logger import log
+
+from .base import Command
+
+
+class WarmQuestionnaireCacheCommand(Command[None]):
+    """Load the questionnaires listed in the scheduler settings into the questionnaire cache."""
+
+    def __init__(self, firestore_client: firestore.AsyncClient) -> None:
+        self.firestore_client = firestore_client
+        self.questionnaires_dao = QuestionnairesDAO(firestore_client)
+
+    async def get_scheduler_settings(self) -> SchedulerSettings:
+        scheduler_settings_ref = self.firestore_client.collection("settings").document("scheduler")
+        return (await scheduler_settings_ref.get()).to_dict()
+
+    async def _run(self) -> None:
+        try:
+            scheduler_settings = await self.get_scheduler_settings()
+            questionnaire_ids = list(scheduler_settings["statistics"]["persony"])
+        except Exception as e:
+            log.warning("Failed to read the questionnaires to warm from the scheduler settings: %s", e)
+            return
+
+        await self.questionnaires_dao.warm_cache(questionnaire_ids)
@@ -0,0 +1,24 @@
+import asyncio
+
+from google.cloud import firestore
+
+from modelmind.db.daos.questionnaires import QuestionnairesDAO
+from modelmind.logger import log
+
+from .base import Command
+
+
+class WatchQuestionnaireVersionsCommand(Command[None]):
+    """Poll the content versions of the cached questionnaires until cancelled, dropping outdated cache entries."""
+
+    def __init__(self, firestore_client: firestore.AsyncClient, interval: float) -> None:
+        self.questionnaires_dao = QuestionnairesDAO(firestore_client)
+        self.interval = interval
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.questionnaires_dao.poll_content_versions()
+            except Exception as e:
+                log.warning("Failed to poll questionnaire content versions: %s", e)
@@ -1,8 +1,13 @@
+import hashlib
+import json
 from enum import StrEnum
-from typing import Any, Optional, Type
+from typing import Any, Callable, NamedTuple, Optional, Type
 
+from modelmind.config import settings
+from modelmind.logger import log
 from modelmind.models.engines.base import Engine
 from modelmind.models.questions.schemas import Question
+from modelmind.utils.cache import AsyncLRUCache
 
 from .persony import PersonyEngineV1, PersonyEngineV2
 
@@ -12,9 +17,22 @@ class EngineName(StrEnum):
     PERSONY_V2 = "persony-v2"
 
 
+class EngineCacheKey(NamedTuple):
+    questionnaire_id: str
+    language: str
+    engine_name: str
+    config_hash: str
+    content_version: int
+
+
 class EngineFactory:
     engine_map = {EngineName.PERSONY_V1: PersonyEngineV1, EngineName.PERSONY_V2: PersonyEngineV2}
 
+    # Process-wide cache of compiled engines, engines must not hold per-request state to be shared.
+    # Keyed by the content version the questions were loaded with, an engine built from outdated questions
+    # is never served for a newer version.
+    _engines = AsyncLRUCache(max_size=settings.questionnaire_cache.engine_cache_size, ttl=float("inf"))
+
     @classmethod
     def get_engine(cls, engine_name: str) -> Type[Engine]:
         try:
@@ -30,6 +48,62 @@ class EngineFactory:
 
         return engine_class(questions=questions, config=config)
 
+    @classmethod
+    def get_or_create_engine(
+        cls,
+        questionnaire_id: str,
+        language: str,
+        engine_name: str,
+        questions_builder: Callable[[], list[Question]],
+        config: Optional[dict[str, Any]] = None,
+        content_version: int = 0,
+    ) -> Engine:
+        """
+        Get the compiled engine from the cache, questions are only built on a cache miss.
+        content_version is the version of the questionnaire the questions were loaded with.
+        """
+        key = cls.build_cache_key(questionnaire_id, language, engine_name, config, content_version)
+        engine = cls._engines.get(key)
+        if engine is None:
+            log.debug("Engine cache miss for %s", key)
+            engine = cls.create_engine(engine_name, questions=questions_builder(), config=config)
+            cls._engines.set(key, engine)
+        return engine
+
+    @classmethod
+    def build_cache_key(
+        cls,
+        questionnaire_id: str,
+        language: str,
+        engine_name: str,
+        config: Optional[dict[str, Any]] = None,
+        content_version: int = 0,
+    ) -> EngineCacheKey:
+        return EngineCacheKey(
+            questionnaire_id=str(questionnaire_id),
+            language=language,
+            engine_name=engine_name,
+            config_hash=cls.hash_config(config),
+            content_version=content_version,
+        )
+
+    @staticmethod
+    def hash_config(config: Optional[dict[str, Any]] = None) -> str:
+        return hashlib.sha256(json.dumps(config or {}, sort_keys=True, default=str).encode()).hexdigest()
+
+    @classmethod
+    def invalidate(cls, questionnaire_id: str) -> None:
+        """Drop the cached engines of a questionnaire, engines of outdated versions are otherwise only evicted."""
+        questionnaire_id = str(questionnaire_id)
+        cls._engines.invalidate_where(
+            lambda key, engine: isinstance(key, EngineCacheKey) and key.questionnaire_id == questionnaire_id
+        )
+        log.info("Engine cache invalidated for questionnaire %s", questionnaire_id)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._engines.clear()
+
     @classmethod
     def get_available_engine_names(cls) -> list[str]:
         return list(cls.engine_map.keys())
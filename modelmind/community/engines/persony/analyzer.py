@@ -1,95 +1,129 @@
+from typing import TYPE_CHECKING, Optional
+
 from pydantic import BaseModel
 
-from modelmind.community.engines.persony.dimensions import PersonyDimension
-from modelmind.community.theory.jung.functions import JungFunctionsAnalytics
+from modelmind.community.engines.persony.dimensions import PERSONY_DIMENSIONS, PersonyDimensionData
 from modelmind.community.theory.mbti.trait import MBTITraitsAnalytics
 from modelmind.community.theory.mbti.types import MBTIType
-from modelmind.community.theory.neuroticism.trait import NeuroticismAnalytics
 from modelmind.logger import log
 from modelmind.models.analytics.base import BaseAnalytics
 from modelmind.models.questions import QuestionKey
 from modelmind.models.results import Result
 
 from .questions import PersonyQuestion
+from .scores import PersonyScores
+
+if TYPE_CHECKING:
+    from .vectorized import PersonyScoringKernel
 
 
 class PersonyAnalyzer:
+    """Stateless scorer, safe to share between concurrent requests."""
+
     class Config(BaseModel):
         neutral_addition: int = 1
+        vectorized: bool = False
 
     def __init__(self, config: Config, question_key_mapping: dict[QuestionKey, PersonyQuestion]) -> None:
         self.config = config
         self.question_key_mapping = question_key_mapping
-        self.init_analytics()
-
-    def init_analytics(self) -> None:
-        self.base_mbti_analytics = MBTITraitsAnalytics(complexity=MBTITraitsAnalytics.Complexity.basic)
-        self.advanced_mbti_analytics = MBTITraitsAnalytics(complexity=MBTITraitsAnalytics.Complexity.advanced)
-        self.jung_analytics = JungFunctionsAnalytics()
-        self.neuroticism_analytics = NeuroticismAnalytics()
-
-    def _add_traits_and_functions(self, dimension: PersonyDimension, value: int, max_value: int) -> None:
+        self.kernel = self._compile_kernel() if config.vectorized else None
+
+    def _compile_kernel(self) -> Optional["PersonyScoringKernel"]:
+        """Compile the NumPy scoring kernel, fallback to the iterative scoring when NumPy is not installed."""
+        try:
+            from .vectorized import PersonyScoringKernel
+        except ImportError:
+            log.warning("Analyzer: numpy is not installed, falling back to iterative scoring")
+            return None
+        return PersonyScoringKernel(self.question_key_mapping, neutral_addition=self.config.neutral_addition)
+
+    def _add_traits_and_functions(
+        self, scores: PersonyScores, dimension: PersonyDimensionData, value: int, max_value: int, weight: int = 1
+    ) -> None:
         if value < 0:
-            self._handle_negative_value(dimension, value, max_value)
+            self._handle_negative_value(scores, dimension, abs(value) * weight, max_value * weight)
         elif value > 0:
-            self._handle_positive_value(dimension, value, max_value)
+            self._handle_positive_value(scores, dimension, value * weight, max_value * weight)
         else:
-            self._handle_neutral_value(dimension, max_value)
+            self._handle_neutral_value(scores, dimension, max_value * weight, weight)
 
-    def _handle_negative_value(self, dimension: PersonyDimension, value: int, max_value: int) -> None:
+    def _handle_negative_value(
+        self, scores: PersonyScores, dimension: PersonyDimensionData, value: int, max_value: int
+    ) -> None:
         if dimension.low_trait:
             if not dimension.has_function:
-                self.base_mbti_analytics.add(dimension.low_trait, abs(value))
-            self.advanced_mbti_analytics.add(dimension.low_trait, abs(value))
+                scores.base_mbti.add(dimension.low_trait, value)
+            scores.advanced_mbti.add(dimension.low_trait, value)
         if dimension.low_function:
-            self.jung_analytics.add(dimension.low_function, abs(value), max_value=max_value)
+            scores.jung.add(dimension.low_function, value, max_value=max_value)
         if dimension.high_function:
-            self.jung_analytics.add(dimension.high_function, 0, max_value=max_value)
+            scores.jung.add(dimension.high_function, 0, max_value=max_value)
         if dimension.low_neuroticism:
-            self.neuroticism_analytics.add(dimension.low_neuroticism, abs(value), max_value=max_value)
+            scores.neuroticism.add(dimension.low_neuroticism, value, max_value=max_value)
 
-    def _handle_positive_value(self, dimension: PersonyDimension, value: int, max_value: int) -> None:
+    def _handle_positive_value(
+        self, scores: PersonyScores, dimension: PersonyDimensionData, value: int, max_value: int
+    ) -> None:
         if dimension.high_trait:
             if not dimension.has_function:
-                self.base_mbti_analytics.add(dimension.high_trait, value)
-            self.advanced_mbti_analytics.add(dimension.high_trait, value)
+                scores.base_mbti.add(dimension.high_trait, value)
+            scores.advanced_mbti.add(dimension.high_trait, value)
         if dimension.low_function:
-            self.jung_analytics.add(dimension.low_function, 0, max_value=max_value)
+            scores.jung.add(dimension.low_function, 0, max_value=max_value)
         if dimension.high_function:
-            self.jung_analytics.add(dimension.high_function, value, max_value=max_value)
+            scores.jung.add(dimension.high_function, value, max_value=max_value)
         if dimension.high_neuroticism:
-            self.neuroticism_analytics.add(dimension.high_neuroticism, value, max_value=max_value)
+            scores.neuroticism.add(dimension.high_neuroticism, value, max_value=max_value)
 
-    def _handle_neutral_value(self, dimension: PersonyDimension, max_value: int) -> None:
+    def _handle_neutral_value(
+        self, scores: PersonyScores, dimension: PersonyDimensionData, max_value: int, weight: int = 1
+    ) -> None:
+        neutral_addition = self.config.neutral_addition * weight
         if dimension.low_trait and dimension.high_trait:
-            self.advanced_mbti_analytics.add(dimension.low_trait, self.config.neutral_addition)
-            self.advanced_mbti_analytics.add(dimension.high_trait, self.config.neutral_addition)
+            scores.advanced_mbti.add(dimension.low_trait, neutral_addition)
+            scores.advanced_mbti.add(dimension.high_trait, neutral_addition)
             if not dimension.has_function:
-                self.base_mbti_analytics.add(dimension.low_trait, self.config.neutral_addition)
-                self.base_mbti_analytics.add(dimension.high_trait, self.config.neutral_addition)
+                scores.base_mbti.add(dimension.low_trait, neutral_addition)
+                scores.base_mbti.add(dimension.high_trait, neutral_addition)
         if dimension.low_function and dimension.high_function:
-            self.jung_analytics.add(dimension.low_function, self.config.neutral_addition, max_value)
-            self.jung_analytics.add(dimension.high_function, self.config.neutral_addition, max_value)
+            scores.jung.add(dimension.low_function, neutral_addition, max_value)
+            scores.jung.add(dimension.high_function, neutral_addition, max_value)
         if dimension.low_neuroticism and dimension.high_neuroticism:
-            self.neuroticism_analytics.add(dimension.low_neuroticism, self.config.neutral_addition, max_value)
-            self.neuroticism_analytics.add(dimension.high_neuroticism, self.config.neutral_addition, max_value)
+            scores.neuroticism.add(dimension.low_neuroticism, neutral_addition, max_value)
+            scores.neuroticism.add(dimension.high_neuroticism, neutral_addition, max_value)
 
-    def calculate_analytics(self, current_result: Result) -> list[BaseAnalytics]:
-        """Build the analytics for the current result."""
+    def score(self, current_result: Result) -> PersonyScores:
+        """Score the current result into a new scores bundle, without touching the analyzer state."""
+        if self.kernel is not None:
+            return self.kernel.score(current_result)
+        return self.score_iterative(current_result)
 
-        self.init_analytics()
+    def score_iterative(self, current_result: Result) -> PersonyScores:
+        """Score the current result answer by answer."""
+
+        scores = PersonyScores.empty()
 
         for question_key, value in current_result.data.items():
-            question = self.question_key_mapping.get(question_key)
-            if question is None:
-                log.warning("Analyzer: question with key %s not found", question_key)
-                continue
+            self.add_answer(scores, question_key, value)
+
+        return scores
+
+    def add_answer(self, scores: PersonyScores, question_key: QuestionKey, value: int, weight: int = 1) -> bool:
+        """Add the contribution of a single answer to the scores, a weight of -1 removes it."""
+        question = self.question_key_mapping.get(question_key)
+        if question is None:
+            log.warning("Analyzer: question with key %s not found", question_key)
+            return False
 
-            dimension = PersonyDimension(question.category)
-            value = -value if question.question.reversed else value
-            self._add_traits_and_functions(dimension, value, question.question.max)
+        dimension = PERSONY_DIMENSIONS[question.category]
+        value = -value if question.question.reversed else value
+        self._add_traits_and_functions(scores, dimension, value, question.question.max, weight)
+        return True
 
-        return [self.base_mbti_analytics, self.advanced_mbti_analytics, self.jung_analytics, self.neuroticism_analytics]
+    def calculate_analytics(self, current_result: Result) -> list[BaseAnalytics]:
+        """Build the analytics for the current result."""
+        return self.score(current_result).analytics
 
     @staticmethod
     def find_base_analytics(analytics: list[BaseAnalytics]) -> MBTITraitsAnalytics | None:
@@ -116,9 +150,4 @@ class PersonyAnalyzer:
     def calculate_dominants(self, current_result: Result) -> MBTIType:
         """Get the dominant MBTI type from the current result."""
 
-        analytics = self.calculate_analytics(current_result)
-        advanced_analytics = self.find_advanced_analytics(analytics)
-        if advanced_analytics:
-            return advanced_analytics.dominants
-        else:
-            raise ValueError("Advanced MBTI analytics not found")
+        return self.score(current_result).advanced_mbti.dominants
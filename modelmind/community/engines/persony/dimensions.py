@@ -161,37 +161,45 @@ class PersonyDimension(StrEnum):
     def data_neuroticism(self) -> dict[str, NeuroticismTrait]:
         return {k: v for k, v in self.data.items() if isinstance(v, NeuroticismTrait)}
 
+    @property
+    def info(self) -> "PersonyDimensionData":
+        return PERSONY_DIMENSIONS[self]
+
     @property
     def high_trait(self) -> MBTITrait | None:
-        return self.data_traits.get("highTrait")
+        return PERSONY_DIMENSIONS[self].high_trait
 
     @property
     def low_trait(self) -> MBTITrait | None:
-        return self.data_traits.get("lowTrait")
+        return PERSONY_DIMENSIONS[self].low_trait
 
     @property
     def low_function(self) -> JungFunction | None:
-        return self.data_functions.get("lowFunction")
+        return PERSONY_DIMENSIONS[self].low_function
 
     @property
     def high_function(self) -> JungFunction | None:
-        return self.data_functions.get("highFunction")
+        return PERSONY_DIMENSIONS[self].high_function
 
     @property
     def has_function(self) -> bool:
-        return self.low_function is not None or self.high_function is not None
+        return PERSONY_DIMENSIONS[self].has_function
 
     @property
     def low_neuroticism(self) -> NeuroticismTrait | None:
-        return self.data_neuroticism.get("lowNeuroticism")
+        return PERSONY_DIMENSIONS[self].low_neuroticism
 
     @property
     def high_neuroticism(self) -> NeuroticismTrait | None:
-        return self.data_neuroticism.get("highNeuroticism")
+        return PERSONY_DIMENSIONS[self].high_neuroticism
 
     @property
     def has_neuroticism(self) -> bool:
-        return self.low_neuroticism is not None or self.high_neuroticism is not None
+        return PERSONY_DIMENSIONS[self].has_neuroticism
+
+    @property
+    def step(self) -> str:
+        return PERSONY_DIMENSIONS[self].step
 
     @classmethod
     def preferences(cls) -> list[str]:
@@ -236,3 +244,73 @@ class PersonyDimension(StrEnum):
     @classmethod
     def neuroticism(cls) -> list[str]:
         return [cls.NEUROTICISM_1]
+
+
+class PersonyDimensionData:
+    """Flattened and frozen metadata of a dimension, so lookups in the scoring loop are plain attribute reads."""
+
+    __slots__ = (
+        "dimension",
+        "step",
+        "low_trait",
+        "high_trait",
+        "low_function",
+        "high_function",
+        "has_function",
+        "low_neuroticism",
+        "high_neuroticism",
+        "has_neuroticism",
+    )
+
+    dimension: PersonyDimension
+    step: str
+    low_trait: MBTITrait | None
+    high_trait: MBTITrait | None
+    low_function: JungFunction | None
+    high_function: JungFunction | None
+    has_function: bool
+    low_neuroticism: NeuroticismTrait | None
+    high_neuroticism: NeuroticismTrait | None
+    has_neuroticism: bool
+
+    def __init__(self, dimension: PersonyDimension, step: str) -> None:
+        data = dimension.data
+        values: dict[str, object] = {
+            "dimension": dimension,
+            "step": step,
+            "low_trait": data.get("lowTrait"),
+            "high_trait": data.get("highTrait"),
+            "low_function": data.get("lowFunction"),
+            "high_function": data.get("highFunction"),
+            "low_neuroticism": data.get("lowNeuroticism"),
+            "high_neuroticism": data.get("highNeuroticism"),
+        }
+        values["has_function"] = values["low_function"] is not None or values["high_function"] is not None
+        values["has_neuroticism"] = values["low_neuroticism"] is not None or values["high_neuroticism"] is not None
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is frozen")
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.dimension.name})"
+
+
+def _compile_dimensions() -> dict[str, PersonyDimensionData]:
+    steps = {
+        "PREFERENCES": PersonyDimension.preferences(),
+        "LIFESTYLE": PersonyDimension.lifestyles(),
+        "TEMPERAMENT": PersonyDimension.temperaments(),
+        "ATTITUDE": PersonyDimension.attitudes(),
+        "NEUROTICISM": PersonyDimension.neuroticism(),
+    }
+    return {
+        dimension: PersonyDimensionData(PersonyDimension(dimension), step)
+        for step, dimensions in steps.items()
+        for dimension in dimensions
+    }
+
+
+# Dimension metadata compiled once at import, keyed by category value
+PERSONY_DIMENSIONS: dict[str, PersonyDimensionData] = _compile_dimensions()
@@ -5,7 +5,7 @@ from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 from modelmind.community.engines.exceptions import EngineException
-from modelmind.community.engines.persony.dimensions import PersonyDimension
+from modelmind.community.engines.persony.dimensions import PERSONY_DIMENSIONS, PersonyDimension
 from modelmind.community.theory.mbti.trait import MBTITrait
 from modelmind.community.theory.mbti.types import MBTIType
 from modelmind.models.analytics.base import BaseAnalytics
@@ -16,6 +16,8 @@ from modelmind.utils.type_adapter import TypeAdapter
 
 from .analyzer import PersonyAnalyzer
 from .questions import PersonyQuestion
+from .scores import PersonyScores
+from .state import PersonySessionState, PersonyStateTracker, questions_fingerprint
 
 
 class PersonyEngineV2(Engine[PersonyQuestion]):
@@ -29,6 +31,7 @@ class PersonyEngineV2(Engine[PersonyQuestion]):
             "NEUROTICISM": 16,
         }
         max_questions: int = 8
+        vectorized_scoring: bool = False
 
     class Step(StrEnum):
         PREFERENCES = "PREFERENCES"
@@ -40,29 +43,47 @@ class PersonyEngineV2(Engine[PersonyQuestion]):
 
         @classmethod
         def get_step(cls, question_category: PersonyDimension) -> "PersonyEngineV2.Step":
-            if question_category in PersonyDimension.preferences():
-                return cls.PREFERENCES
-            if question_category in PersonyDimension.lifestyles():
-                return cls.LIFESTYLE
-            if question_category in PersonyDimension.temperaments():
-                return cls.TEMPERAMENT
-            if question_category in PersonyDimension.attitudes():
-                return cls.ATTITUDE
-            if question_category in PersonyDimension.neuroticism():
-                return cls.NEUROTICISM
-            raise InvalidQuestionCategory(f"Question category {question_category} not supported.")
+            dimension = PERSONY_DIMENSIONS.get(question_category)
+            if dimension is None or dimension.step not in cls._value2member_map_:
+                raise InvalidQuestionCategory(f"Question category {question_category} not supported.")
+            return cls(dimension.step)
 
     def __init__(self, questions: list[PersonyQuestion], config: dict[str, Any] | None) -> None:
         super().__init__(questions)
-        self.questions = questions
         self.config = self.Config(**config) if config else self.Config()
         self.question_step_mapping = self._create_question_step_mapping(questions)
+        self.question_category_mapping = self._create_question_category_mapping(questions)
         self.analyzer = PersonyAnalyzer(
-            config=PersonyAnalyzer.Config(neutral_addition=self.config.neutral_addition),
+            config=PersonyAnalyzer.Config(
+                neutral_addition=self.config.neutral_addition, vectorized=self.config.vectorized_scoring
+            ),
             question_key_mapping=self.question_key_mapping,
         )
+        self.state_tracker = PersonyStateTracker(
+            self.analyzer, self.Step.get_step, questions_fingerprint(questions, self.config.neutral_addition)
+        )
+
+    def update_state(
+        self, current_result: Result, previous_state: Optional[dict[str, Any]] = None
+    ) -> Optional[dict[str, Any]]:
+        state = self.state_tracker.update(current_result, previous_state)
+        current_result.state = state
+        return state.model_dump()
+
+    def _get_state(self, current_result: Result) -> Optional[PersonySessionState]:
+        state = current_result.state
+        if isinstance(state, PersonySessionState) and state.fingerprint == self.state_tracker.fingerprint:
+            return state
+        return None
+
+    def _score(self, current_result: Result) -> PersonyScores:
+        state = self._get_state(current_result)
+        return state.to_scores() if state else self.analyzer.score(current_result)
 
     def get_questions_counts_by_step(self, current_result: Result) -> dict[Step, int]:
+        state = self._get_state(current_result)
+        if state:
+            return {self.Step(step): count for step, count in state.step_counts.items()}
         counts = dict()  # type: ignore
         for question_key, _ in current_result.data.items():
             question = self.question_key_mapping.get(question_key)
@@ -82,11 +103,9 @@ class PersonyEngineV2(Engine[PersonyQuestion]):
     async def infer_next_questions(
         self, current_result: Result, max_questions: Optional[int], shuffle: bool = True
     ) -> List[Question]:
-        self.build_analytics(current_result)
+        scores = self._score(current_result)
 
-        advanced_mbti_analytics = self.analyzer.advanced_mbti_analytics
-
-        current_dominants = advanced_mbti_analytics.dominants
+        current_dominants = scores.advanced_mbti.dominants
 
         current_step = self.get_current_step(current_result)
 
@@ -110,7 +129,7 @@ class PersonyEngineV2(Engine[PersonyQuestion]):
         return remaining
 
     def calculate_result_label(self, current_result: Result) -> str:
-        return self.analyzer.calculate_dominants(current_result)
+        return self._score(current_result).advanced_mbti.dominants
 
     def get_current_step(self, current_result: Result) -> Step:
         counts = self.get_questions_counts_by_step(current_result)
@@ -163,13 +182,22 @@ class PersonyEngineV2(Engine[PersonyQuestion]):
             step_mapping[step] = step_mapping.get(step, []) + [question]
         return step_mapping
 
+    def _create_question_category_mapping(
+        self, questions: List[PersonyQuestion]
+    ) -> Dict[PersonyDimension, List[PersonyQuestion]]:
+        """Preprocess the questions list to create a category to ordered questions mapping."""
+        category_mapping: Dict[PersonyDimension, List[PersonyQuestion]] = dict()
+        for question in questions:
+            category_mapping.setdefault(question.category, []).append(question)
+        return category_mapping
+
     def _get_remaining_questions_by_category(
         self, category: PersonyDimension, current_result: Result
     ) -> List[PersonyQuestion]:
         return [
             question
-            for question in self.questions
-            if question.category == category and question.key not in current_result.data
+            for question in self.question_category_mapping.get(category, [])
+            if question.key not in current_result.data
         ]
 
     def _get_neuroticism_questions(
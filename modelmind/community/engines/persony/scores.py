@@ -0,0 +1,28 @@
+from typing import NamedTuple
+
+from modelmind.community.theory.jung.functions import JungFunctionsAnalytics
+from modelmind.community.theory.mbti.trait import MBTITraitsAnalytics
+from modelmind.community.theory.neuroticism.trait import NeuroticismAnalytics
+from modelmind.models.analytics.base import BaseAnalytics
+
+
+class PersonyScores(NamedTuple):
+    """Analytics computed for a single result, built fresh on every scoring call."""
+
+    base_mbti: MBTITraitsAnalytics
+    advanced_mbti: MBTITraitsAnalytics
+    jung: JungFunctionsAnalytics
+    neuroticism: NeuroticismAnalytics
+
+    @classmethod
+    def empty(cls) -> "PersonyScores":
+        return cls(
+            base_mbti=MBTITraitsAnalytics(complexity=MBTITraitsAnalytics.Complexity.basic),
+            advanced_mbti=MBTITraitsAnalytics(complexity=MBTITraitsAnalytics.Complexity.advanced),
+            jung=JungFunctionsAnalytics(),
+            neuroticism=NeuroticismAnalytics(),
+        )
+
+    @property
+    def analytics(self) -> list[BaseAnalytics]:
+        return [self.base_mbti, self.advanced_mbti, self.jung, self.neuroticism]
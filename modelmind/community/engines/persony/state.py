@@ -0,0 +1,136 @@
+import hashlib
+import json
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from modelmind.community.theory.mbti.trait import MBTITrait
+from modelmind.logger import log
+from modelmind.models.questions import QuestionKey
+from modelmind.models.results import Result
+
+from .analyzer import PersonyAnalyzer
+from .dimensions import PersonyDimension
+from .questions import PersonyQuestion
+from .scores import PersonyScores
+
+
+def questions_fingerprint(questions: list[PersonyQuestion], neutral_addition: int) -> str:
+    """Hash everything an answer contribution depends on, a running state built with other questions is discarded."""
+    signature = sorted(
+        (question.key, question.category, question.question.reversed, question.question.max) for question in questions
+    )
+    return hashlib.sha256(json.dumps([neutral_addition, signature], default=str).encode()).hexdigest()
+
+
+class PersonySessionState(BaseModel):
+    """
+    Running scores of a session, so each call only applies the answers that changed since the previous one.
+
+    -> The answers it was built from are needed to find the changed ones, the state is only kept in memory so they
+        are not written twice: the answers document of the session is their only copy in Firestore.
+    """
+
+    fingerprint: str
+    answers: dict[QuestionKey, Any] = {}
+    step_counts: dict[str, int] = {}
+    base_mbti: dict[str, int] = {}
+    advanced_mbti: dict[str, int] = {}
+    jung: dict[str, int] = {}
+    jung_max: dict[str, int] = {}
+    neuroticism: dict[str, int] = {}
+
+    @classmethod
+    def from_scores(
+        cls, fingerprint: str, answers: dict[QuestionKey, Any], step_counts: dict[str, int], scores: PersonyScores
+    ) -> "PersonySessionState":
+        return cls(
+            fingerprint=fingerprint,
+            answers=dict(answers),
+            step_counts=step_counts,
+            base_mbti={trait.value: getattr(scores.base_mbti, trait) for trait in MBTITrait},
+            advanced_mbti={trait.value: getattr(scores.advanced_mbti, trait) for trait in MBTITrait},
+            jung={str(function): value for function, value in scores.jung.values.items()},
+            jung_max={str(function): value for function, value in scores.jung.max_values.items()},
+            neuroticism={str(trait): value for trait, value in scores.neuroticism.values.items()},
+        )
+
+    def to_scores(self) -> PersonyScores:
+        scores = PersonyScores.empty()
+        for trait, value in self.base_mbti.items():
+            setattr(scores.base_mbti, trait, value)
+        for trait, value in self.advanced_mbti.items():
+            setattr(scores.advanced_mbti, trait, value)
+        for function in scores.jung.values:
+            scores.jung.values[function] = self.jung.get(function, 0)
+            scores.jung.max_values[function] = self.jung_max.get(function, 0)
+        for trait in scores.neuroticism.values:
+            scores.neuroticism.values[trait] = self.neuroticism.get(trait, 0)
+        return scores
+
+
+class PersonyStateTracker:
+    """Apply answer deltas to the running state of the previous call, recomputing it from scratch when it cannot be trusted."""
+
+    def __init__(
+        self, analyzer: PersonyAnalyzer, get_step: Callable[[PersonyDimension], str], fingerprint: str
+    ) -> None:
+        self.analyzer = analyzer
+        self.get_step = get_step
+        self.fingerprint = fingerprint
+
+    def update(self, current_result: Result, previous_state: Optional[dict[str, Any]]) -> PersonySessionState:
+        state = self.load(previous_state)
+        if state is None:
+            return self.recompute(current_result)
+
+        scores = state.to_scores()
+        step_counts = dict(state.step_counts)
+        answers = current_result.data
+
+        for question_key, value in state.answers.items():
+            if question_key not in answers or answers[question_key] != value:
+                self._apply(scores, step_counts, question_key, value, weight=-1)
+        for question_key, value in answers.items():
+            if question_key not in state.answers or state.answers[question_key] != value:
+                self._apply(scores, step_counts, question_key, value, weight=1)
+
+        return PersonySessionState.from_scores(self.fingerprint, answers, step_counts, scores)
+
+    def recompute(self, current_result: Result) -> PersonySessionState:
+        step_counts: dict[str, int] = {}
+        for question_key in current_result.data:
+            self._count(step_counts, question_key, weight=1)
+        scores = self.analyzer.score(current_result)
+        return PersonySessionState.from_scores(self.fingerprint, current_result.data, step_counts, scores)
+
+    def load(self, previous_state: Optional[dict[str, Any]]) -> Optional[PersonySessionState]:
+        """Load the previous state, None when it is missing, invalid or was built with other questions."""
+        if not previous_state:
+            return None
+        try:
+            state = PersonySessionState.model_validate(previous_state)
+        except ValidationError as e:
+            log.warning("Session state: invalid running state, recomputing: %s", e)
+            return None
+        if state.fingerprint != self.fingerprint:
+            log.debug("Session state: questions changed since the last call, recomputing")
+            return None
+        known_answers = sum(1 for question_key in state.answers if question_key in self.analyzer.question_key_mapping)
+        if sum(state.step_counts.values()) != known_answers:
+            log.warning("Session state: step counts do not match the answers, recomputing")
+            return None
+        return state
+
+    def _apply(
+        self, scores: PersonyScores, step_counts: dict[str, int], question_key: QuestionKey, value: Any, weight: int
+    ) -> None:
+        if self.analyzer.add_answer(scores, question_key, value, weight):
+            self._count(step_counts, question_key, weight)
+
+    def _count(self, step_counts: dict[str, int], question_key: QuestionKey, weight: int) -> None:
+        question = self.analyzer.question_key_mapping.get(question_key)
+        if question is None:
+            return
+        step = str(self.get_step(question.category))
+        step_counts[step] = step_counts.get(step, 0) + weight
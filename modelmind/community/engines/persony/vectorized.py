@@ -0,0 +1,131 @@
+from typing import Any
+
+import numpy as np
+
+from modelmind.community.theory.jung.functions import JungFunction
+from modelmind.community.theory.mbti.trait import MBTITrait
+from modelmind.community.theory.neuroticism.trait import NeuroticismTrait
+from modelmind.logger import log
+from modelmind.models.questions import QuestionKey
+from modelmind.models.results import Result
+
+from .dimensions import PERSONY_DIMENSIONS, PersonyDimensionData
+from .questions import PersonyQuestion
+from .scores import PersonyScores
+
+TRAITS: list[MBTITrait] = list(MBTITrait)
+FUNCTIONS: list[JungFunction] = list(JungFunction)
+NEUROTICISM: list[NeuroticismTrait] = list(NeuroticismTrait)
+
+TRAITS_SLICE = slice(0, len(TRAITS))
+FUNCTIONS_SLICE = slice(TRAITS_SLICE.stop, TRAITS_SLICE.stop + len(FUNCTIONS))
+NEUROTICISM_SLICE = slice(FUNCTIONS_SLICE.stop, FUNCTIONS_SLICE.stop + len(NEUROTICISM))
+
+COLUMNS: dict[Any, int] = {target: index for index, target in enumerate([*TRAITS, *FUNCTIONS, *NEUROTICISM])}
+
+
+class PersonyScoringKernel:
+    """
+    Questionnaire compiled into dense question x (MBTI trait, Jung function, neuroticism) matrices.
+
+    A result is turned into an answer vector and scored with a few matrix products, giving the same
+    numbers as PersonyAnalyzer.score_iterative.
+    """
+
+    def __init__(self, question_key_mapping: dict[QuestionKey, PersonyQuestion], neutral_addition: int) -> None:
+        self.neutral_addition = neutral_addition
+        self.question_index = {key: index for index, key in enumerate(question_key_mapping)}
+
+        shape = (len(self.question_index), len(COLUMNS))
+        # Contribution of the absolute answer value when the answer is negative / positive
+        self.low_weights = np.zeros(shape, dtype=np.int64)
+        self.high_weights = np.zeros(shape, dtype=np.int64)
+        # Columns receiving the neutral addition when the answer is 0
+        self.neutral_weights = np.zeros(shape, dtype=np.int64)
+        # Jung functions max values added for non neutral / neutral answers
+        self.max_weights = np.zeros(shape, dtype=np.int64)
+        self.neutral_max_weights = np.zeros(shape, dtype=np.int64)
+
+        self.signs = np.ones(len(self.question_index), dtype=np.int64)
+        # Basic MBTI analytics only count dimensions without functions
+        self.basic = np.zeros(len(self.question_index), dtype=bool)
+
+        for key, index in self.question_index.items():
+            question = question_key_mapping[key]
+            self._compile_question(index, PERSONY_DIMENSIONS[question.category], question.question.max)
+            self.signs[index] = -1 if question.question.reversed else 1
+
+    def _compile_question(self, index: int, dimension: PersonyDimensionData, max_value: int) -> None:
+        self.basic[index] = not dimension.has_function
+
+        for low, high in (
+            (dimension.low_trait, dimension.high_trait),
+            (dimension.low_function, dimension.high_function),
+            (dimension.low_neuroticism, dimension.high_neuroticism),
+        ):
+            if low:
+                self.low_weights[index, COLUMNS[low]] = 1
+            if high:
+                self.high_weights[index, COLUMNS[high]] = 1
+            if low and high:
+                self.neutral_weights[index, COLUMNS[low]] = 1
+                self.neutral_weights[index, COLUMNS[high]] = 1
+
+        for function in (dimension.low_function, dimension.high_function):
+            if function:
+                self.max_weights[index, COLUMNS[function]] = max_value
+        if dimension.low_function and dimension.high_function:
+            self.neutral_max_weights[index, COLUMNS[dimension.low_function]] = max_value
+            self.neutral_max_weights[index, COLUMNS[dimension.high_function]] = max_value
+
+    def answers_vector(self, current_result: Result) -> tuple[np.ndarray, np.ndarray]:
+        """Turn the result data into an answers vector and an answered mask, in question index order."""
+        indexes = []
+        values = []
+        for question_key, value in current_result.data.items():
+            index = self.question_index.get(question_key)
+            if index is None:
+                log.warning("Analyzer: question with key %s not found", question_key)
+                continue
+            indexes.append(index)
+            values.append(value)
+
+        dtype = np.int64 if all(isinstance(value, int) for value in values) else np.float64
+        answers = np.zeros(len(self.question_index), dtype=dtype)
+        answered = np.zeros(len(self.question_index), dtype=bool)
+        answers[indexes] = values
+        answered[indexes] = True
+        return answers * self.signs, answered
+
+    def score(self, current_result: Result) -> PersonyScores:
+        answers, answered = self.answers_vector(current_result)
+
+        low = np.where(answers < 0, -answers, 0)
+        high = np.where(answers > 0, answers, 0)
+        neutral = answered & (answers == 0)
+        non_neutral = answered & (answers != 0)
+
+        totals = (
+            low @ self.low_weights
+            + high @ self.high_weights
+            + self.neutral_addition * (neutral.astype(np.int64) @ self.neutral_weights)
+        )
+        basic_totals = (
+            (low * self.basic) @ self.low_weights
+            + (high * self.basic) @ self.high_weights
+            + self.neutral_addition * ((neutral & self.basic).astype(np.int64) @ self.neutral_weights)
+        )
+        max_totals = (
+            non_neutral.astype(np.int64) @ self.max_weights + neutral.astype(np.int64) @ self.neutral_max_weights
+        )
+
+        scores = PersonyScores.empty()
+        for trait, value, basic_value in zip(
+            TRAITS, totals[TRAITS_SLICE].tolist(), basic_totals[TRAITS_SLICE].tolist()
+        ):
+            setattr(scores.advanced_mbti, trait, value)
+            setattr(scores.base_mbti, trait, basic_value)
+        scores.jung.values = dict(zip(FUNCTIONS, totals[FUNCTIONS_SLICE].tolist()))
+        scores.jung.max_values = dict(zip(FUNCTIONS, max_totals[FUNCTIONS_SLICE].tolist()))
+        scores.neuroticism.values = dict(zip(NEUROTICISM, totals[NEUROTICISM_SLICE].tolist()))
+        return scores
@@ -41,6 +41,13 @@ class LoggingSettings(BaseModel):
 class FirestoreSettings(BaseSettings):
     prefix: str = ""
     database: str = ""
+    # A Firestore write batch holds at most 500 operations
+    batch_size: int = 500
+    batch_concurrency: int = 4
+    batch_max_attempts: int = 3
+    batch_backoff: float = 0.2
+    # Fraction of the documents of trusted DAOs still fully validated, to notice schema drift
+    trusted_validation_sample_rate: float = 0.01
 
 
 class SentrySettings(BaseSettings):
@@ -56,12 +63,52 @@ class DiscordSettings(BaseSettings):
     notifications_webhook_id: str = ""
 
 
+class HttpClientSettings(BaseSettings):
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+    write_timeout: float = 10.0
+    pool_timeout: float = 5.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+
+
+class QuestionnaireCacheSettings(BaseSettings):
+    max_size: int = 512
+    # Served as is until soft_ttl, then served stale while refreshed in background until ttl
+    soft_ttl: float = 3600
+    ttl: float = 86400
+    warm_on_startup: bool = True
+    # Seconds startup waits for the cache to warm before serving with whatever was loaded
+    warm_timeout: float = 10
+    # Seconds between two checks of the content versions of the cached questionnaires, 0 disables it
+    version_poll_interval: float = 30
+    # Compiled engines kept in memory, one per questionnaire, language, config and content version
+    engine_cache_size: int = 64
+
+
+class SessionCacheSettings(BaseSettings):
+    max_size: int = 4096
+    # Kept short, sessions are also written by other instances
+    ttl: float = 60
+    # Running scores of the sessions answered on this instance, only kept in memory
+    state_max_size: int = 4096
+    state_ttl: float = 3600
+
+
 class JWTSettings(BaseSettings):
     next_secret: str = ""
     next_cookie_name: str = "next-auth.session-token"
     next_cookie_prefix: str = "__Secure-"
     secret_key: str = "secret"
     algorithm: str = "HS256"
+    # Decoded NextAuth tokens kept until they expire, at most next_token_cache_ttl seconds
+    next_token_cache_size: int = 1024
+    next_token_cache_ttl: float = 3600
+    # Embed the session questionnaire, language and status in the session token, trusted for at most max_age seconds
+    session_claims: bool = False
+    session_claims_max_age: float = 900
 
 
 class CloudTasksQueueSettings(BaseSettings):
@@ -131,6 +178,9 @@ class Settings(BaseSettings):
     sentry: SentrySettings = SentrySettings()
     jwt: JWTSettings = JWTSettings()
     discord: DiscordSettings = DiscordSettings()
+    http_client: HttpClientSettings = HttpClientSettings()
+    questionnaire_cache: QuestionnaireCacheSettings = QuestionnaireCacheSettings()
+    session_cache: SessionCacheSettings = SessionCacheSettings()
     tasks_queue_calculate_statistics: CloudTasksQueueSettings = CloudTasksQueueSettings()
 
     @property
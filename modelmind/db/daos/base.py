@@ -1,17 +1,36 @@
+import asyncio
 from abc import ABC
+from datetime import datetime
+from enum import Enum
+from inspect import isclass
+from random import random
 from time import perf_counter
 from typing import (
     Any,
+    AsyncIterable,
     AsyncIterator,
+    ClassVar,
     Dict,
     Generic,
+    Hashable,
+    Iterable,
     List,
     Literal,
+    NamedTuple,
     Optional,
+    Sequence,
+    Tuple,
     Type,
     TypeVar,
+    get_args,
 )
 
+from google.api_core.exceptions import (
+    Aborted,
+    DeadlineExceeded,
+    InternalServerError,
+    ServiceUnavailable,
+)
 from google.cloud.firestore import (
     AsyncClient,
     AsyncCollectionReference,
@@ -21,14 +40,40 @@ from google.cloud.firestore import (
     Query,
 )
 from google.cloud.firestore_v1.types import write
+from pydantic import BaseModel, create_model
 
-from modelmind.db.exceptions.base import DBObjectNotFound
+from modelmind.config import settings
+from modelmind.db.exceptions.base import DBBatchWriteFailed, DBObjectNotFound
+from modelmind.db.reads import record_reads
 from modelmind.db.schemas import DBIdentifier, DBObject
 from modelmind.logger import log
+from modelmind.utils.cache import AsyncLRUCache
 
 # Generic type for documents stored in Firestore
 T = TypeVar("T", bound=DBObject)
 
+# Transient errors worth retrying a commit for
+RETRYABLE_ERRORS = (Aborted, DeadlineExceeded, InternalServerError, ServiceUnavailable)
+
+# Partial models built for projections, by model and selected fields
+_partial_models: Dict[Tuple[Type[BaseModel], frozenset], Any] = {}
+# Enum fields of the models built without validation
+_enum_fields_cache: Dict[Type[BaseModel], Dict[str, Type[Enum]]] = {}
+
+DocumentWrite = Tuple[AsyncDocumentReference, Dict[str, Any]]
+
+
+class BatchWriteResult(NamedTuple):
+    document_id: str
+    update_time: Optional[datetime]
+    error: Optional[Exception] = None
+
+
+class GetManyResult(NamedTuple, Generic[T]):
+    # Found documents in the order of the requested ids, and the ids without a document
+    documents: List[T]
+    missing: List[str]
+
 
 class FirestoreDAO(Generic[T], ABC):
     """
@@ -45,6 +90,22 @@ class FirestoreDAO(Generic[T], ABC):
     _collection_name: str = ""
     # Specify the type of the Pydantic model for deserialization
     model: Type[T]
+    # Optional process wide cache of documents by cache_key, read by get_many
+    cache: ClassVar[Optional[AsyncLRUCache]] = None
+    # Documents of trusted collections are only written by this service, see validate
+    trusted: ClassVar[bool] = False
+    # Sampled trusted documents that failed validation
+    schema_drifts: ClassVar[int] = 0
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.trusted and hasattr(cls, "model"):
+            nested = _nested_model_fields(cls.model)
+            if nested:
+                raise TypeError(
+                    f"{cls.__name__} is trusted but {cls.model.__name__} nests models in {', '.join(nested)}, "
+                    "they would be left as dicts when built without validation"
+                )
 
     def __init__(self, client: AsyncClient) -> None:
         self.db = client
@@ -65,23 +126,89 @@ class FirestoreDAO(Generic[T], ABC):
         """Get a reference to a specific document in the collection."""
         return self.collection().document(str(document_id))
 
-    def validate(self, document_id: DBIdentifier, data: Any) -> T:
-        """Validate the input data and return the model."""
+    @classmethod
+    def partial_model(cls, fields: Sequence[str]) -> Type[T]:
+        """Subclass of the model where the fields left out of a projection are optional and default to None."""
+        key = (cls.model, frozenset(fields))
+        if key not in _partial_models:
+            omitted: Dict[str, Any] = {
+                name: (Optional[field.annotation], None)
+                for name, field in cls.model.model_fields.items()
+                if name not in fields and name != DBObject.id_name()
+            }
+            _partial_models[key] = create_model(  # type: ignore[call-overload]
+                f"Partial{cls.model.__name__}", __base__=cls.model, **omitted
+            )
+        return _partial_models[key]
+
+    def validate(
+        self,
+        document_id: DBIdentifier,
+        data: Any,
+        fields: Optional[Sequence[str]] = None,
+        trusted: Optional[bool] = None,
+    ) -> T:
+        """
+        Validate the input data and return the model, or its partial model if only some fields were read.
+
+        -> Trusted data, by default the documents of a trusted DAO, is built without validation.
+            Only top level enums are converted, so trusted models must not nest models (checked on subclassing).
+        -> A sample of the trusted data is still validated. A failure is logged and counted as schema drift,
+            and the document is built without validation like the unsampled ones.
+        """
+        model = self.partial_model(fields) if fields is not None else self.model
+        data = {DBObject.id_name(): document_id, **data}
+        trusted = self.trusted if trusted is None else trusted
+        if trusted and random() >= settings.firestore.trusted_validation_sample_rate:
+            return _construct(model, data)
         try:
-            return self.model.model_validate({DBObject.id_name(): document_id, **data})
+            return model.model_validate(data)
         except Exception as e:
-            log.error(f"Validation failed for document with ID {document_id} in {self.collection_name()}. {e}")
-            raise e
-
-    async def get(self, document_id: DBIdentifier) -> T:
-        """Fetch a single document and parse it into the model."""
+            if not trusted:
+                log.error(f"Validation failed for document with ID {document_id} in {self.collection_name()}. {e}")
+                raise e
+            type(self).schema_drifts += 1
+            log.error(f"Schema drift: sampled document {document_id} of {self.collection_name()} is invalid. {e}")
+            return _construct(model, data)
+
+    async def get(self, document_id: DBIdentifier, fields: Optional[Sequence[str]] = None) -> T:
+        """Fetch a single document and parse it into the model, only the given fields if any."""
         doc_ref: AsyncDocumentReference = self.document_ref(document_id)
-        doc: DocumentSnapshot = await doc_ref.get()
+        doc: DocumentSnapshot = await doc_ref.get(field_paths=fields)
+        record_reads(self.collection_name())
         if not doc.exists:
             log.debug(f"Document with ID {document_id} not found in {self.collection_name()}.")
             raise DBObjectNotFound(f"Document with ID {document_id} not found in {self.collection_name()}.")
         log.debug(f"Document with ID {document_id} retrieved from {self.collection_name()}.")
-        return self.validate(document_id, doc.to_dict())
+        return self.validate(document_id, doc.to_dict(), fields)
+
+    def cache_key(self, document_id: DBIdentifier) -> Hashable:
+        return ("id", str(document_id))
+
+    async def get_many(self, document_ids: Iterable[DBIdentifier], use_cache: bool = True) -> GetManyResult[T]:
+        """Fetch several documents in a single batched read, documents found in the cache are not read again."""
+        ids = [str(document_id) for document_id in document_ids]
+        documents: Dict[str, T] = {}
+
+        if use_cache and self.cache is not None:
+            for document_id in ids:
+                cached = self.cache.get(self.cache_key(document_id))
+                if cached is not None:
+                    documents[document_id] = cached
+
+        to_read = list(dict.fromkeys(document_id for document_id in ids if document_id not in documents))
+        if to_read:
+            start = perf_counter()
+            async for doc in self.db.get_all([self.document_ref(document_id) for document_id in to_read]):
+                if doc.exists:
+                    documents[doc.id] = self.validate(doc.id, doc.to_dict())
+            record_reads(self.collection_name(), len(to_read))
+            log.info(f"Batched read of {len(to_read)} documents took {perf_counter() - start} seconds.")
+
+        missing = [document_id for document_id in ids if document_id not in documents]
+        if missing:
+            log.debug(f"Documents with IDs {missing} not found in {self.collection_name()}.")
+        return GetManyResult([documents[document_id] for document_id in ids if document_id in documents], missing)
 
     async def add(self, document_data: Dict[str, Any], document_id: Optional[DBIdentifier] = None) -> T:
         """Add a new document to the collection."""
@@ -106,9 +233,10 @@ class FirestoreDAO(Generic[T], ABC):
         limit: Optional[int] = None,
         order_by: Optional[str] = None,
         direction: Literal["ASCENDING"] | Literal["DESCENDING"] = Query.ASCENDING,
+        fields: Optional[Sequence[str]] = None,
     ) -> List[T]:
         """
-        List all documents in the collection.
+        List all documents in the collection, only the given fields if any.
         """
         query: AsyncCollectionReference = self.collection()
         if order_by:
@@ -117,6 +245,9 @@ class FirestoreDAO(Generic[T], ABC):
         if limit:
             query = query.limit(limit)
 
+        if fields is not None:
+            query = query.select(fields)
+
         docs: AsyncIterator[DocumentSnapshot] = query.stream()
 
         result: List[T] = []
@@ -124,12 +255,46 @@ class FirestoreDAO(Generic[T], ABC):
         start = perf_counter()
 
         async for doc in docs:
-            result.append(self.validate(doc.id, doc.to_dict()))
+            result.append(self.validate(doc.id, doc.to_dict(), fields))
             log.debug(f"Document with ID {doc.id} retrieved from {self.collection_name()}.")
 
+        record_reads(self.collection_name(), len(result))
         log.info(f"Query took {perf_counter() - start} seconds.")
         return result
 
+    async def count(
+        self, filters: Optional[List[FieldFilter]] = None, collection_ref: Optional[AsyncCollectionReference] = None
+    ) -> int:
+        """Count the documents matching the filters with an aggregation query, documents are not downloaded."""
+        query = self._aggregation_source(filters, collection_ref).count(alias="count")
+        return int(await self._aggregate(query, collection_ref) or 0)
+
+    async def sum(
+        self,
+        field: str,
+        filters: Optional[List[FieldFilter]] = None,
+        collection_ref: Optional[AsyncCollectionReference] = None,
+    ) -> float:
+        """Sum a numeric field over the documents matching the filters with an aggregation query."""
+        query = self._aggregation_source(filters, collection_ref).sum(field, alias="sum")
+        return await self._aggregate(query, collection_ref) or 0
+
+    def _aggregation_source(
+        self, filters: Optional[List[FieldFilter]], collection_ref: Optional[AsyncCollectionReference]
+    ) -> Any:
+        query: Any = collection_ref or self.collection()
+        for filter in filters or []:
+            query = query.where(filter=filter)
+        return query
+
+    async def _aggregate(self, query: Any, collection_ref: Optional[AsyncCollectionReference]) -> Any:
+        start = perf_counter()
+        results = await query.get()
+        # Billed one read per batch of up to 1000 index entries
+        record_reads(collection_ref.id if collection_ref else self.collection_name())
+        log.info(f"Aggregation query took {perf_counter() - start} seconds.")
+        return results[0][0].value if results and results[0] else None
+
     async def search(
         self,
         filters: List[FieldFilter],
@@ -138,9 +303,10 @@ class FirestoreDAO(Generic[T], ABC):
         direction: Literal["ASCENDING"] | Literal["DESCENDING"] = Query.ASCENDING,
         start_after: Optional[DocumentSnapshot | dict | List | tuple] = None,
         end_before: Optional[DocumentSnapshot | dict | List | tuple] = None,
+        fields: Optional[Sequence[str]] = None,
     ) -> List[T]:
         """
-        Query the collection based on provided parameters.
+        Query the collection based on provided parameters, only the given fields are read if any.
         """
 
         query: AsyncCollectionReference = self.collection()
@@ -159,6 +325,9 @@ class FirestoreDAO(Generic[T], ABC):
         if limit:
             query = query.limit(limit)
 
+        if fields is not None:
+            query = query.select(fields)
+
         docs: AsyncIterator[DocumentSnapshot] = query.stream()
 
         result: List[T] = []
@@ -166,9 +335,10 @@ class FirestoreDAO(Generic[T], ABC):
         start = perf_counter()
 
         async for doc in docs:
-            result.append(self.validate(doc.id, doc.to_dict()))
+            result.append(self.validate(doc.id, doc.to_dict(), fields))
             log.debug(f"Document with ID {doc.id} retrieved from {self.collection_name()}.")
 
+        record_reads(self.collection_name(), len(result))
         log.info(f"Query took {perf_counter() - start} seconds.")
         return result
 
@@ -178,6 +348,7 @@ class FirestoreDAO(Generic[T], ABC):
         limit: Optional[int] = None,
         order_by: Optional[str] = None,
         direction: Literal["ASCENDING"] | Literal["DESCENDING"] = Query.ASCENDING,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict[DBIdentifier, T]:
         """
         Query the collection based on provided parameters and return as dictionaries with document_id as key.
@@ -194,6 +365,9 @@ class FirestoreDAO(Generic[T], ABC):
         if limit:
             query = query.limit(limit)
 
+        if fields is not None:
+            query = query.select(fields)
+
         docs: AsyncIterator[DocumentSnapshot] = query.stream()
 
         result: Dict[DBIdentifier, T] = {}
@@ -201,70 +375,224 @@ class FirestoreDAO(Generic[T], ABC):
         start = perf_counter()
 
         async for doc in docs:
-            result[doc.id] = self.validate(doc.id, doc.to_dict())
+            result[doc.id] = self.validate(doc.id, doc.to_dict(), fields)
             log.debug(f"Document with ID {doc.id} retrieved from {self.collection_name()}.")
 
+        record_reads(self.collection_name(), len(result))
         log.info(f"Query took {perf_counter() - start} seconds.")
         return result
 
+    async def iter_list(
+        self,
+        order_by: Optional[str] = None,
+        direction: Literal["ASCENDING"] | Literal["DESCENDING"] = Query.ASCENDING,
+        page_size: int = 500,
+        resume_after: Optional[DBIdentifier] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[T]:
+        """Stream all documents in the collection, see iter_search."""
+        async for document in self.iter_search([], order_by, direction, page_size, resume_after, fields):
+            yield document
+
+    async def iter_search(
+        self,
+        filters: List[FieldFilter],
+        order_by: Optional[str] = None,
+        direction: Literal["ASCENDING"] | Literal["DESCENDING"] = Query.ASCENDING,
+        page_size: int = 500,
+        resume_after: Optional[DBIdentifier] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[T]:
+        """
+        Stream the documents matching the filters, validated one by one as they are read.
+
+        -> Documents are read in pages of page_size, each page starts after the last snapshot of the previous one.
+        -> Only one page of snapshots is held at a time, memory use does not depend on the collection size.
+        -> The id of the last processed document is a checkpoint, pass it as resume_after to continue from there.
+        """
+        query: AsyncCollectionReference = self.collection()
+        for filter in filters:
+            query = query.where(filter=filter)
+
+        if order_by:
+            query = query.order_by(order_by, direction=direction)
+
+        if fields is not None:
+            # The cursor needs the order_by field of the last snapshot
+            query = query.select(list(dict.fromkeys([*fields, *([order_by] if order_by else [])])))
+
+        cursor: Optional[DocumentSnapshot] = None
+        if resume_after:
+            cursor = await self.document_ref(resume_after).get()
+            record_reads(self.collection_name())
+            if not cursor.exists:
+                raise DBObjectNotFound(f"Checkpoint {resume_after} not found in {self.collection_name()}.")
+
+        start = perf_counter()
+        total = 0
+        while True:
+            page = query.start_after(cursor) if cursor else query
+            count = 0
+            async for doc in page.limit(page_size).stream():
+                count += 1
+                cursor = doc
+                yield self.validate(doc.id, doc.to_dict(), fields)
+
+            total += count
+            record_reads(self.collection_name(), count)
+            if count < page_size:
+                break
+
+        log.info(f"Streamed {total} documents from {self.collection_name()} in {perf_counter() - start} seconds.")
+
     async def batch_set(
         self,
         data: Dict[DBIdentifier, Dict[str, Any]],
         merge: bool = True,
         collection_ref: Optional[AsyncCollectionReference] = None,
-    ) -> None:
+        raise_on_error: bool = True,
+    ) -> List[BatchWriteResult]:
         """
-        Batch set multiple documents in the collection.
+        Batch set multiple documents in the collection, see bulk_write.
         """
-        batch = self.db.batch()
-        for doc_id, doc_data in data.items():
-            if collection_ref:
-                doc_ref = collection_ref.document(doc_id)
-            else:
-                doc_ref = self.collection().document(doc_id)
-            batch.set(doc_ref, doc_data, merge=merge)
-
-        start = perf_counter()
-
-        write_results: list[write.WriteResult] = await batch.commit()
-        log.info(f"Batch set took {perf_counter() - start} seconds.")
-
-        for i, write_result in enumerate(write_results):
-            log.debug(
-                f"Document with ID {write_result.update_time} from {self.collection_name()}"
-                f"updated at {write_result.update_time}"
-            )
-            if not write_result.update_time:
-                raise Exception(
-                    f"Document with ID {write_result.update_time} from {self.collection_name()} not updated"
-                )
+        collection_ref = collection_ref or self.collection()
+        writes = [(collection_ref.document(str(doc_id)), doc_data) for doc_id, doc_data in data.items()]
+        return await self.bulk_write(writes, merge=merge, raise_on_error=raise_on_error)
 
     async def batch_add(
         self,
         data: List[Dict[str, Any]],
         collection_ref: Optional[AsyncCollectionReference] = None,
         doc_ids: Optional[List[str]] = None,
-    ) -> None:
+        raise_on_error: bool = True,
+    ) -> List[BatchWriteResult]:
         """
-        Batch add multiple documents to the collection.
+        Batch add multiple documents to the collection, see bulk_write.
         """
-        batch = self.db.batch()
         collection_ref = collection_ref or self.collection()
-        for doc_data, doc_id in zip(data, doc_ids or [None] * len(data)):  # type: ignore
-            doc_ref = collection_ref.document(doc_id) if doc_id else collection_ref.document()
-            batch.set(doc_ref, doc_data)
+        # References are built once so a retried chunk writes the same generated ids
+        writes = [
+            (collection_ref.document(doc_id) if doc_id else collection_ref.document(), doc_data)
+            for doc_data, doc_id in zip(data, doc_ids or [None] * len(data))  # type: ignore
+        ]
+        return await self.bulk_write(writes, merge=False, raise_on_error=raise_on_error)
+
+    async def bulk_write(
+        self,
+        writes: Iterable[DocumentWrite] | AsyncIterable[DocumentWrite],
+        merge: bool = False,
+        raise_on_error: bool = True,
+    ) -> List[BatchWriteResult]:
+        """
+        Set documents in chunks of batch_size, committing up to batch_concurrency chunks at once.
 
+        -> Writes can be streamed, at most batch_concurrency chunks are buffered at any time.
+        -> Each chunk is atomic but chunks are not, a failed chunk does not roll back the others.
+        -> Results are returned in input order, raise DBBatchWriteFailed if any chunk failed and raise_on_error is set.
+        """
+        semaphore = asyncio.Semaphore(settings.firestore.batch_concurrency)
+        commits: List[asyncio.Task[List[BatchWriteResult]]] = []
         start = perf_counter()
 
-        write_results: list[write.WriteResult] = await batch.commit()
-        log.info(f"Batch add took {perf_counter() - start} seconds.")
-
-        for i, write_result in enumerate(write_results):
-            log.debug(
-                f"Document with ID {write_result.update_time} from {self.collection_name()}"
-                f"updated at {write_result.update_time}"
+        async def commit(chunk: List[DocumentWrite]) -> List[BatchWriteResult]:
+            try:
+                return await self._commit_chunk(chunk, merge)
+            finally:
+                semaphore.release()
+
+        async def flush(chunk: List[DocumentWrite]) -> None:
+            await semaphore.acquire()
+            commits.append(asyncio.create_task(commit(chunk)))
+
+        chunk: List[DocumentWrite] = []
+        async for document_write in _aiter(writes):
+            chunk.append(document_write)
+            if len(chunk) == settings.firestore.batch_size:
+                await flush(chunk)
+                chunk = []
+        if chunk:
+            await flush(chunk)
+
+        results = [result for chunk_results in await asyncio.gather(*commits) for result in chunk_results]
+        failed = [result for result in results if result.error is not None]
+
+        elapsed = perf_counter() - start
+        log.info(
+            f"Bulk write of {len(results)} documents to {self.collection_name()} in {len(commits)} chunks "
+            f"took {elapsed:.3f} seconds ({len(results) / elapsed if elapsed else 0:.0f} docs/s), {len(failed)} failed."
+        )
+        if failed and raise_on_error:
+            raise DBBatchWriteFailed(
+                f"{len(failed)} of {len(results)} documents from {self.collection_name()} not written: {failed[0].error}",
+                results,
             )
-            if not write_result.update_time:
-                raise Exception(
-                    f"Document with ID {write_result.update_time} from {self.collection_name()} not updated"
-                )
+        return results
+
+    async def _commit_chunk(self, chunk: List[DocumentWrite], merge: bool) -> List[BatchWriteResult]:
+        """Commit a chunk in a single batch, retrying transient errors with exponential backoff."""
+        for attempt in range(1, settings.firestore.batch_max_attempts + 1):
+            batch = self.db.batch()
+            for doc_ref, doc_data in chunk:
+                batch.set(doc_ref, doc_data, merge=merge)
+            try:
+                write_results: list[write.WriteResult] = await batch.commit()
+                return [
+                    BatchWriteResult(doc_ref.id, write_result.update_time)
+                    for (doc_ref, _), write_result in zip(chunk, write_results)
+                ]
+            except RETRYABLE_ERRORS as e:
+                if attempt == settings.firestore.batch_max_attempts:
+                    error: Exception = e
+                    break
+                log.warning(f"Batch of {len(chunk)} documents to {self.collection_name()} failed, retrying: {e}")
+                await asyncio.sleep(settings.firestore.batch_backoff * 2 ** (attempt - 1))
+            except Exception as e:
+                error = e
+                break
+        log.error(
+            f"Batch of {len(chunk)} documents to {self.collection_name()} failed after {attempt} attempts: {error}"
+        )
+        return [BatchWriteResult(doc_ref.id, None, error) for doc_ref, _ in chunk]
+
+
+def _enum_fields(model: Type[BaseModel]) -> Dict[str, Type[Enum]]:
+    if model not in _enum_fields_cache:
+        enum_fields: Dict[str, Type[Enum]] = {}
+        for name, field in model.model_fields.items():
+            for annotation in (field.annotation, *get_args(field.annotation)):
+                if isclass(annotation) and issubclass(annotation, Enum):
+                    enum_fields[name] = annotation
+        _enum_fields_cache[model] = enum_fields
+    return _enum_fields_cache[model]
+
+
+def _nested_model_fields(model: Type[BaseModel]) -> List[str]:
+    def annotations(annotation: Any) -> Iterable[Any]:
+        yield annotation
+        for arg in get_args(annotation):
+            yield from annotations(arg)
+
+    return [
+        name
+        for name, field in model.model_fields.items()
+        if any(
+            isclass(annotation) and issubclass(annotation, BaseModel) for annotation in annotations(field.annotation)
+        )
+    ]
+
+
+def _construct(model: Type[T], data: Dict[str, Any]) -> T:
+    for name, enum in _enum_fields(model).items():
+        value = data.get(name)
+        if value is not None and not isinstance(value, enum):
+            data[name] = enum(value)
+    return model.model_construct(**data)
+
+
+async def _aiter(items: Iterable[Any] | AsyncIterable[Any]) -> AsyncIterator[Any]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import uuid4
 
-from google.cloud.firestore import ArrayUnion, AsyncClient
+from google.cloud.firestore import ArrayUnion, AsyncClient, AsyncWriteBatch
 
 from modelmind.db.exceptions.profiles import DBProfileCreationFailed, DBProfileNotFound
 from modelmind.db.schemas.profiles import Biographics, DBIdentifier, DBProfile
@@ -34,7 +34,12 @@ class ProfilesDAO(FirestoreDAO[DBProfile]):
         except Exception:
             raise DBProfileNotFound()
 
-    async def add_result(self, profile_id: DBIdentifier, result_id: DBIdentifier) -> None:
+    async def add_result(
+        self, profile_id: DBIdentifier, result_id: DBIdentifier, batch: Optional[AsyncWriteBatch] = None
+    ) -> None:
+        if batch:
+            batch.update(self.document_ref(profile_id), {"results": ArrayUnion([result_id])})
+            return
         try:
             await self.document_ref(profile_id).update({"results": ArrayUnion([result_id])})
         except Exception as e:
@@ -1,18 +1,25 @@
+import asyncio
+import hashlib
+import json
 from datetime import datetime
-from typing import Any, AsyncIterator, List, Literal, Optional
+from time import perf_counter
+from typing import Any, AsyncIterator, ClassVar, Hashable, List, Literal, Optional, Sequence
 
-from aiocache import Cache, cached
-from aiocache.serializers import PickleSerializer
-from google.cloud.firestore import AsyncClient, AsyncCollectionReference, DocumentSnapshot
+from google.cloud.firestore import DELETE_FIELD, AsyncClient, AsyncCollectionReference, DocumentSnapshot, Increment
+from google.cloud.firestore_v1.field_path import FieldPath
 from google.cloud.firestore_v1.types import write
 from shortuuid import uuid
 
+from modelmind.community.engines.engine_factory import EngineFactory
+from modelmind.config import settings
 from modelmind.db.exceptions.questionnaires import DBQuestionnaireNotFound
+from modelmind.db.reads import record_reads
 from modelmind.db.schemas import DBIdentifier
-from modelmind.db.schemas.questionnaires import DBQuestionnaire
+from modelmind.db.schemas.questionnaires import DBQuestionnaire, QuestionnaireLanguage
 from modelmind.db.schemas.questions import DBQuestion
 from modelmind.db.schemas.statistics import StatisticsData
 from modelmind.logger import log
+from modelmind.utils.cache import AsyncLRUCache
 
 from .base import FieldFilter, FirestoreDAO
 
@@ -21,6 +28,15 @@ class QuestionnairesDAO(FirestoreDAO[DBQuestionnaire]):
     _collection_name = "questionnaires"
     model = DBQuestionnaire
 
+    # Shared by every DAO instance of the process, a DAO is built per request
+    cache: ClassVar[AsyncLRUCache] = AsyncLRUCache(
+        max_size=settings.questionnaire_cache.max_size,
+        ttl=settings.questionnaire_cache.ttl,
+        soft_ttl=settings.questionnaire_cache.soft_ttl,
+    )
+    # Content version of each questionnaire when its cached content was loaded
+    content_versions: ClassVar[dict[str, int]] = {}
+
     def __init__(self, client: AsyncClient) -> None:
         super().__init__(client)
 
@@ -30,24 +46,120 @@ class QuestionnairesDAO(FirestoreDAO[DBQuestionnaire]):
     def statistics_collection(self, questionnaire_id: DBIdentifier) -> AsyncCollectionReference:
         return self.document_ref(questionnaire_id).collection("statistics")
 
-    @cached(ttl=3600, cache=Cache.MEMORY, serializer=PickleSerializer())
+    @classmethod
+    def invalidate_cache(cls, questionnaire_id: DBIdentifier, name: Optional[str] = None) -> None:
+        """Drop every cached entry of a questionnaire, by id or by name."""
+
+        def belongs_to_questionnaire(key: Hashable, value: Any) -> bool:
+            if not isinstance(key, tuple):
+                return False
+            if key[0] == "name":
+                return key[1] == name or (isinstance(value, DBQuestionnaire) and str(value.id) == str(questionnaire_id))
+            return key[1] == str(questionnaire_id)
+
+        cls.cache.invalidate_where(belongs_to_questionnaire)
+        cls.content_versions.pop(str(questionnaire_id), None)
+
+    async def poll_content_versions(self) -> List[str]:
+        """Fetch the content version of every cached questionnaire in one batch and drop the outdated ones."""
+        if not self.content_versions:
+            return []
+        refs = [self.document_ref(questionnaire_id) for questionnaire_id in list(self.content_versions)]
+
+        outdated: List[str] = []
+        async for snapshot in self.db.get_all(refs, field_paths=["content_version"]):
+            version = (snapshot.to_dict() or {}).get("content_version", 0) if snapshot.exists else None
+            if snapshot.id in self.content_versions and version != self.content_versions[snapshot.id]:
+                outdated.append(snapshot.id)
+        record_reads(self.collection_name(), len(refs))
+
+        for questionnaire_id in outdated:
+            log.info("Questionnaire %s content changed, invalidating cache", questionnaire_id)
+            self.invalidate_cache(questionnaire_id)
+            EngineFactory.invalidate(questionnaire_id)
+        return outdated
+
+    async def bump_content_version(
+        self,
+        questionnaire_id: DBIdentifier,
+        languages: Optional[dict[str, QuestionnaireLanguage]] = None,
+        removed_languages: Sequence[str] = (),
+    ) -> None:
+        """Increment the content version, along with the summaries of the changed and removed languages."""
+        data: dict[str, Any] = {"content_version": Increment(1), "updated_at": datetime.now()}
+        for language, summary in (languages or {}).items():
+            data[FieldPath("languages", language).to_api_repr()] = summary
+        for language in removed_languages:
+            data[FieldPath("languages", language).to_api_repr()] = DELETE_FIELD
+        await self.update(questionnaire_id, data)
+        self.invalidate_cache(questionnaire_id)
+        EngineFactory.invalidate(str(questionnaire_id))
+
+    def _record_content_version(self, questionnaire: DBQuestionnaire) -> None:
+        questionnaire_id = str(questionnaire.id)
+        known_version = self.content_versions.get(questionnaire_id)
+        if known_version is not None and known_version != questionnaire.content_version:
+            # Reloaded after a change the poll has not seen yet, the rest of the cached content is outdated
+            self.invalidate_cache(questionnaire_id)
+            EngineFactory.invalidate(questionnaire_id)
+        self.content_versions[questionnaire_id] = questionnaire.content_version
+
+    async def _track_content_version(self, questionnaire_id: DBIdentifier) -> None:
+        """Record the content version before loading content, so a concurrent change is caught by the next poll."""
+        try:
+            await self.get_from_id(questionnaire_id)
+        except DBQuestionnaireNotFound:
+            pass
+
+    async def warm_cache(self, questionnaire_ids: Sequence[DBIdentifier]) -> None:
+        """Load questionnaires and their questions in every language into the cache."""
+
+        async def warm(questionnaire_id: DBIdentifier) -> None:
+            await self.get_from_id(questionnaire_id)
+            languages = await self.get_available_languages(questionnaire_id)
+            await asyncio.gather(*[self.get_questions(questionnaire_id, language) for language in languages])
+
+        start = perf_counter()
+        results = await asyncio.gather(
+            *[warm(questionnaire_id) for questionnaire_id in questionnaire_ids], return_exceptions=True
+        )
+        for questionnaire_id, result in zip(questionnaire_ids, results):
+            if isinstance(result, Exception):
+                log.warning("Failed to warm cache for questionnaire %s: %s", questionnaire_id, result)
+        log.info(f"Cache warmed for {len(questionnaire_ids)} questionnaires in {perf_counter() - start} seconds.")
+
     async def get_from_id(self, questionnaire_id: DBIdentifier) -> DBQuestionnaire:
+        return await self.cache.get_or_load(("id", str(questionnaire_id)), lambda: self._get_from_id(questionnaire_id))
+
+    async def _get_from_id(self, questionnaire_id: DBIdentifier) -> DBQuestionnaire:
         try:
             log.info("Searching for questionnaire with id %s", questionnaire_id)
-            return await self.get(questionnaire_id)
+            questionnaire = await self.get(questionnaire_id)
         except Exception:
             raise DBQuestionnaireNotFound("Questionnaire with id %s not found" % questionnaire_id)
+        self._record_content_version(questionnaire)
+        return questionnaire
 
-    @cached(ttl=3600, cache=Cache.MEMORY, serializer=PickleSerializer())
     async def get_from_name(self, name: str) -> DBQuestionnaire:
+        return await self.cache.get_or_load(("name", name), lambda: self._get_from_name(name))
+
+    async def _get_from_name(self, name: str) -> DBQuestionnaire:
         try:
             log.info("Searching for questionnaire with name %s", name)
-            return (await self.search([FieldFilter("name", "==", name)], limit=1))[0]
+            questionnaire = (await self.search([FieldFilter("name", "==", name)], limit=1))[0]
         except Exception:
             raise DBQuestionnaireNotFound("Questionnaire with name %s not found" % name)
+        self._record_content_version(questionnaire)
+        return questionnaire
 
-    @cached(ttl=900, cache=Cache.MEMORY, serializer=PickleSerializer())
     async def get_questions(self, questionnaire_id: DBIdentifier, language: Optional[str] = None) -> List[DBQuestion]:
+        return await self.cache.get_or_load(
+            ("questions", str(questionnaire_id), language),
+            lambda: self._get_questions(questionnaire_id, language),
+        )
+
+    async def _get_questions(self, questionnaire_id: DBIdentifier, language: Optional[str] = None) -> List[DBQuestion]:
+        await self._track_content_version(questionnaire_id)
         questions = self.questions_collection(questionnaire_id)
 
         if language:
@@ -58,27 +170,89 @@ class QuestionnairesDAO(FirestoreDAO[DBQuestionnaire]):
         db_questions: list[DBQuestion] = []
         async for question in questions_iterator:
             db_questions.append(DBQuestion.model_validate({"id": question.id, **question.to_dict()}))
+        record_reads("questions", len(db_questions))
 
         return db_questions
 
-    @cached(ttl=300, cache=Cache.MEMORY, serializer=PickleSerializer())
     async def get_available_languages(self, questionnaire_id: DBIdentifier) -> List[str]:
-        # TODO: optimize this, maybe we can store the available languages in the questionnaire document
+        try:
+            questionnaire = await self.get_from_id(questionnaire_id)
+        except DBQuestionnaireNotFound:
+            return []
+        if questionnaire.languages:
+            return [language for language, summary in questionnaire.languages.items() if summary["count"] > 0]
+        # Questionnaires without a languages map, until refresh_languages runs on them
+        return await self.cache.get_or_load(
+            ("languages", str(questionnaire_id)), lambda: self._get_available_languages(questionnaire_id)
+        )
+
+    async def _get_available_languages(self, questionnaire_id: DBIdentifier) -> List[str]:
         questions = self.questions_collection(questionnaire_id)
 
         questions_iterator: AsyncIterator[DocumentSnapshot] = questions.stream()
         languages = set()
+        count = 0
         async for question in questions_iterator:
             languages.add(question.get("language"))
+            count += 1
+        record_reads("questions", count)
         return list(languages)
 
-    @cached(ttl=300, cache=Cache.MEMORY, serializer=PickleSerializer())
     async def is_language_available(self, questionnaire_id: DBIdentifier, language: str) -> bool:
         """Check if questionnaire has at least one question in specified language."""
-        questions = self.questions_collection(questionnaire_id).where("language", "==", language).limit(1)
-        async for _ in questions.stream():
-            return True
-        return False
+        try:
+            questionnaire = await self.get_from_id(questionnaire_id)
+        except DBQuestionnaireNotFound:
+            return False
+        if questionnaire.languages:
+            return language in questionnaire.languages and questionnaire.languages[language]["count"] > 0
+        return await self.count_questions(questionnaire_id, language) > 0
+
+    async def count_questions(self, questionnaire_id: DBIdentifier, language: Optional[str] = None) -> int:
+        filters = [FieldFilter("language", "==", language)] if language else []
+        return await self.count(filters, collection_ref=self.questions_collection(questionnaire_id))
+
+    async def refresh_languages(self, questionnaire_id: DBIdentifier, languages: Optional[List[str]] = None) -> None:
+        """Recompute the languages map from the stored questions, of every language by default."""
+        questions = self.questions_collection(questionnaire_id)
+        if languages is not None and len(languages) == 1:
+            questions = questions.where("language", "==", languages[0])
+
+        stored_questions: dict[str, dict[str, Any]] = {}
+        async for question in questions.stream():
+            stored_questions[question.id] = question.to_dict()
+        record_reads("questions", len(stored_questions))
+
+        summaries = self.summarize_languages(stored_questions)
+        if languages is None:
+            try:
+                known_languages = list((await self.get_from_id(questionnaire_id)).languages)
+            except DBQuestionnaireNotFound:
+                known_languages = []
+        else:
+            known_languages = languages
+        await self.bump_content_version(
+            questionnaire_id,
+            {language: summary for language, summary in summaries.items() if not languages or language in languages},
+            # Languages left without questions are removed, not kept with a count of 0
+            [language for language in known_languages if language not in summaries],
+        )
+
+    @staticmethod
+    def summarize_languages(questions: dict[str, dict[str, Any]]) -> dict[str, QuestionnaireLanguage]:
+        """Count and hash questions by language, questions are keyed by document id."""
+        by_language: dict[str, list[tuple[str, dict[str, Any]]]] = {}
+        for doc_id, question in sorted(questions.items()):
+            by_language.setdefault(question["language"], []).append((doc_id, question))
+        return {
+            language: QuestionnaireLanguage(
+                count=len(language_questions),
+                content_hash=hashlib.sha256(
+                    json.dumps(language_questions, sort_keys=True, default=str).encode()
+                ).hexdigest(),
+            )
+            for language, language_questions in by_language.items()
+        }
 
     async def create_questionnaire(
         self,
@@ -91,14 +265,19 @@ class QuestionnairesDAO(FirestoreDAO[DBQuestionnaire]):
         description: str = "",
     ) -> DBQuestionnaire:
         try:
-            # TODO: maybe we should bypass cache here
-            await self.get_from_name(name)
+            await self._get_from_name(name)
             raise ValueError("Questionnaire with name %s already exists" % name)
         except DBQuestionnaireNotFound:
             pass
 
         questionnare_id = str(uuid()[:8])
 
+        doc_ids = [
+            self.build_question_doc_id(questionnare_id, question["id"], question["language"]) for question in questions
+        ]
+        for question in questions:
+            question["questionnaire_id"] = questionnare_id
+
         questionnaire_data = {
             "id": questionnare_id,
             "name": name,
@@ -107,6 +286,8 @@ class QuestionnairesDAO(FirestoreDAO[DBQuestionnaire]):
             "config": config,
             "owner": owner,
             "visibility": visibility,
+            "content_version": 0,
+            "languages": self.summarize_languages(dict(zip(doc_ids, questions))),
             "created_at": datetime.now(),
             "updated_at": datetime.now(),
         }
@@ -114,15 +295,8 @@ class QuestionnairesDAO(FirestoreDAO[DBQuestionnaire]):
         try:
             questionnaire = await self.add(questionnaire_data, questionnare_id)
             questions_collection_ref = self.questions_collection(questionnaire.id)
-
-            doc_ids = [
-                self.build_question_doc_id(questionnaire.id, question["id"], question["language"])
-                for question in questions
-            ]
-            for question in questions:
-                question["questionnaire_id"] = questionnaire.id
-
             await self.batch_add(questions, questions_collection_ref, doc_ids)
+            self.invalidate_cache(questionnaire.id, name)
 
             return questionnaire
 
@@ -138,12 +312,14 @@ class QuestionnairesDAO(FirestoreDAO[DBQuestionnaire]):
 
         questions_collection = self.questions_collection(questionnaire_id)
         await self.batch_add(questions, questions_collection, doc_ids)
+        await self.refresh_languages(questionnaire_id, sorted({question["language"] for question in questions}))
 
     async def update_question(self, questionnaire_id: DBIdentifier, question: dict[str, Any]) -> None:
         question_ref = self.questions_collection(questionnaire_id).document(
             self.build_question_doc_id(questionnaire_id, question["id"], question["language"])
         )
         write_result: write.WriteResult = await question_ref.update(question)
+        await self.refresh_languages(questionnaire_id, [question["language"]])
         log.debug(
             f"Question {question["id"]} from questionnaire {questionnaire_id} updated at {write_result.update_time}"
         )
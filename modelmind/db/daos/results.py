@@ -1,18 +1,22 @@
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 from uuid import uuid4
 
-from google.cloud.firestore import AsyncClient
+from google.cloud.firestore import AsyncClient, AsyncWriteBatch
 
 from modelmind.db.schemas import DBIdentifier
-from modelmind.db.schemas.results import DBResult
+from modelmind.db.schemas.results import DBResult, DBResultSummary
+from modelmind.logger import log
 
 from .base import FieldFilter, FirestoreDAO
 
+SUMMARY_FIELDS = list(DBResultSummary.model_fields)
+
 
 class ResultsDAO(FirestoreDAO[DBResult]):
     _collection_name = "results"
     model = DBResult
+    trusted = True
 
     def __init__(self, client: AsyncClient) -> None:
         super().__init__(client)
@@ -25,8 +29,10 @@ class ResultsDAO(FirestoreDAO[DBResult]):
         data: dict[str, Any],
         label: str,
         language: str | None = None,
+        id: Optional[DBIdentifier] = None,
+        batch: Optional[AsyncWriteBatch] = None,
     ) -> DBResult:
-        result_id = str(uuid4())
+        result_id = str(id or uuid4())
 
         result_data = {
             "id": result_id,
@@ -40,6 +46,11 @@ class ResultsDAO(FirestoreDAO[DBResult]):
             "updated_at": datetime.now(),
         }
 
+        if batch:
+            # Staged only, the result exists once the caller commits the batch
+            batch.create(self.document_ref(result_id), result_data)
+            return self.validate(result_id, result_data)
+
         try:
             return await self.add(result_data)
         except Exception as e:
@@ -54,14 +65,44 @@ class ResultsDAO(FirestoreDAO[DBResult]):
             raise e
 
     async def get_results_from_questionnaire(
-        self, questionnaire_id: DBIdentifier, limit: Optional[int] = None
+        self,
+        questionnaire_id: DBIdentifier,
+        limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = SUMMARY_FIELDS,
     ) -> List[DBResult]:
+        """Results without their answers unless fields is None, see DBResultSummary."""
         try:
-            return await self.search(filters=[FieldFilter("questionnaire_id", "==", questionnaire_id)], limit=limit)
+            return await self.search(
+                filters=[FieldFilter("questionnaire_id", "==", questionnaire_id)], limit=limit, fields=fields
+            )
         except Exception as e:
             # TODO: custom exception
             raise e
 
+    async def count_from_questionnaire(self, questionnaire_id: DBIdentifier, language: Optional[str] = None) -> int:
+        filters = [FieldFilter("questionnaire_id", "==", questionnaire_id)]
+        if language:
+            filters.append(FieldFilter("language", "==", language))
+        return await self.count(filters)
+
+    async def iter_from_questionnaire(
+        self, questionnaire_id: DBIdentifier, page_size: int = 500, resume_after: Optional[DBIdentifier] = None
+    ) -> AsyncIterator[List[DBResult]]:
+        """Stream the results of a questionnaire page by page, ordered by creation date."""
+        page: List[DBResult] = []
+        async for db_result in self.iter_search(
+            filters=[FieldFilter("questionnaire_id", "==", questionnaire_id)],
+            order_by="created_at",
+            page_size=page_size,
+            resume_after=resume_after,
+        ):
+            page.append(db_result)
+            if len(page) == page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
     async def get_from_id(self, result_id: DBIdentifier) -> DBResult:
         try:
             return await self.get(result_id)
@@ -69,6 +110,13 @@ class ResultsDAO(FirestoreDAO[DBResult]):
             # TODO: custom exception
             raise e
 
+    async def get_from_ids(self, result_ids: List[DBIdentifier]) -> List[DBResult]:
+        """Fetch the results in the given order, ids without a result are skipped."""
+        result = await self.get_many(result_ids)
+        if result.missing:
+            log.warning(f"Results {result.missing} not found")
+        return result.documents
+
     async def update_visibility(self, result_id: DBIdentifier, visibility: DBResult.Visibility) -> None:
         try:
             await self.update(result_id, {"visibility": visibility})
@@ -76,15 +124,30 @@ class ResultsDAO(FirestoreDAO[DBResult]):
             # TODO: custom exception
             raise e
 
+    async def update_labels(self, labels: Dict[DBIdentifier, str]) -> None:
+        try:
+            await self.batch_set(
+                {str(result_id): {"label": label, "updated_at": datetime.now()} for result_id, label in labels.items()}
+            )
+        except Exception as e:
+            # TODO: custom exception
+            raise e
+
     async def list_from_profile(
-        self, profile_id: DBIdentifier, limit: Optional[int] = None, start_after: Optional[datetime] = None
+        self,
+        profile_id: DBIdentifier,
+        limit: Optional[int] = None,
+        start_after: Optional[datetime] = None,
+        fields: Optional[Sequence[str]] = SUMMARY_FIELDS,
     ) -> List[DBResult]:
+        """Results without their answers unless fields is None, see DBResultSummary."""
         try:
             return await self.search(
                 filters=[FieldFilter("profile_id", "==", profile_id)],
                 order_by="created_at",
                 start_after={"created_at": start_after} if start_after else None,
                 limit=limit,
+                fields=fields,
             )
         except Exception as e:
             # TODO: custom exception
@@ -1,19 +1,38 @@
 from datetime import datetime
-from typing import Optional
+from typing import ClassVar, List, Optional, Tuple
 from uuid import uuid4
 
-from google.cloud.firestore import AsyncClient
+from google.cloud.firestore import AsyncClient, AsyncDocumentReference, AsyncWriteBatch
 
+from modelmind.config import settings
+from modelmind.db.exceptions.base import DBObjectNotFound
 from modelmind.db.exceptions.sessions import SessionNotFound
+from modelmind.db.reads import record_reads
 from modelmind.db.schemas import DBIdentifier
 from modelmind.db.schemas.sessions import DBSession, DBUpdateSession, SessionStatus
+from modelmind.logger import log
+from modelmind.utils.cache import AsyncLRUCache
 
 from .base import FirestoreDAO
 
 
 class SessionsDAO(FirestoreDAO[DBSession]):
+    """
+    -> Sessions are cached per instance for a short time, the writes of this DAO update the cached session.
+    -> Cached sessions are shared between requests and must not be mutated, use model_copy.
+    """
+
     _collection_name = "sessions"
     model = DBSession
+    trusted = True
+
+    cache: ClassVar[AsyncLRUCache] = AsyncLRUCache(
+        max_size=settings.session_cache.max_size, ttl=settings.session_cache.ttl
+    )
+    # Running engine states by session id, they are not written to Firestore, see get_state
+    states: ClassVar[AsyncLRUCache] = AsyncLRUCache(
+        max_size=settings.session_cache.state_max_size, ttl=settings.session_cache.state_ttl
+    )
 
     def __init__(self, client: AsyncClient) -> None:
         super().__init__(client)
@@ -30,7 +49,7 @@ class SessionsDAO(FirestoreDAO[DBSession]):
         if not id:
             id = str(uuid4())
         try:
-            return await self.add(
+            session = await self.add(
                 {
                     "id": id,
                     "profile_id": profile_id,
@@ -42,24 +61,102 @@ class SessionsDAO(FirestoreDAO[DBSession]):
                     "updated_at": datetime.now(),
                 }
             )
+            self.cache.set(self.cache_key(session.id), session)
+            return session
         except Exception as e:
             # TODO: custom exception
             raise e
 
-    async def update_status(self, session_id: DBIdentifier, status: SessionStatus) -> None:
+    async def get_from_id(self, session_id: DBIdentifier) -> DBSession:
         try:
-            await self.update(session_id, DBUpdateSession(status=status).model_dump())
-        except Exception as e:
-            raise SessionNotFound(f"Session {session_id} not found: {str(e)}")
+            return await self.cache.get_or_load(self.cache_key(session_id), lambda: self.get(session_id))
+        except DBObjectNotFound as e:
+            raise SessionNotFound(f"Session {session_id} not found") from e
+
+    async def get_fresh(self, session_id: DBIdentifier) -> DBSession:
+        """Read the session from Firestore, for checks that must see the writes of the other instances."""
+        session, _ = await self.get_versioned(session_id)
+        return session
+
+    async def get_versioned(self, session_id: DBIdentifier) -> Tuple[DBSession, datetime]:
+        """Read the session from Firestore with its update time, to use as a write precondition. Refreshes the cache."""
+        doc = await self.document_ref(session_id).get()
+        record_reads(self.collection_name())
+        if not doc.exists:
+            raise SessionNotFound(f"Session {session_id} not found")
+        session = self.validate(session_id, doc.to_dict())
+        key = self.cache_key(session_id)
+        self.cache.invalidate(key)
+        self.cache.set(key, session)
+        return session, doc.update_time
+
+    def update_cached(self, session_id: DBIdentifier, changes: dict) -> None:
+        """Apply committed changes to the cached session, if any."""
+        key = self.cache_key(session_id)
+        cached = self.cache.get(key)
+        # Also keeps a load started before the write from caching the previous session
+        self.cache.invalidate(key)
+        if cached is not None:
+            self.cache.set(key, cached.model_copy(update=changes))
+
+    async def get_from_ids(self, session_ids: List[DBIdentifier]) -> List[DBSession]:
+        """Fetch the sessions in the given order, ids without a session are skipped."""
+        result = await self.get_many(session_ids)
+        if result.missing:
+            log.warning(f"Sessions {result.missing} not found")
+        return result.documents
+
+    async def update_status(self, session_id: DBIdentifier, status: SessionStatus) -> None:
+        await self._update(session_id, DBUpdateSession(status=status).model_dump())
 
     async def update_language(self, session_id: DBIdentifier, language: str) -> None:
-        try:
-            await self.update(session_id, {"language": language})
-        except Exception as e:
-            raise SessionNotFound(f"Session {session_id} not found: {str(e)}")
+        await self._update(session_id, {"language": language})
+
+    def get_state(self, session_id: DBIdentifier) -> Optional[dict]:
+        """
+        The running state left by the previous call answered on this instance.
+
+        -> Only saves work, a call answered on another instance or after eviction recomputes the state from the answers.
+        """
+        return self.states.get(str(session_id))
+
+    def set_state(self, session_id: DBIdentifier, state: dict) -> None:
+        self.states.set(str(session_id), state)
 
-    async def set_result(self, session_id: DBIdentifier, result_id: DBIdentifier) -> None:
+    async def _update(self, session_id: DBIdentifier, changes: dict) -> None:
         try:
-            await self.update(session_id, {"result_id": result_id, "status": SessionStatus.COMPLETED})
+            await self.update(session_id, changes)
         except Exception as e:
             raise SessionNotFound(f"Session {session_id} not found: {str(e)}")
+        self.update_cached(session_id, changes)
+
+    def answers_ref(self, session_id: DBIdentifier) -> AsyncDocumentReference:
+        """Document holding the answers submitted so far, apart from the session which is read far more often."""
+        return self.document_ref(session_id).collection("progress").document("answers")
+
+    async def get_answers(self, session_id: DBIdentifier) -> dict:
+        doc = await self.answers_ref(session_id).get()
+        record_reads("progress")
+        return (doc.to_dict() or {}).get("answers", {}) if doc.exists else {}
+
+    async def add_answers(self, session_id: DBIdentifier, answers: dict) -> None:
+        """Merge newly answered questions into the stored answers, the previous answers are not sent again."""
+        await self.answers_ref(session_id).set({"answers": answers, "updated_at": datetime.now()}, merge=True)
+
+    async def set_result(
+        self,
+        session_id: DBIdentifier,
+        result_id: DBIdentifier,
+        batch: Optional[AsyncWriteBatch] = None,
+        last_update_time: Optional[datetime] = None,
+    ) -> None:
+        """
+        With a batch, call update_cached with the same changes once it is committed.
+        With last_update_time, the batch fails with FailedPrecondition if the session was written since then.
+        """
+        changes = {"result_id": result_id, "status": SessionStatus.COMPLETED}
+        if batch:
+            option = self.db.write_option(last_update_time=last_update_time) if last_update_time else None
+            batch.update(self.document_ref(session_id), changes, option=option)
+            return
+        await self._update(session_id, changes)
@@ -8,3 +8,9 @@ class DBObjectNotFound(DBException):
 
 class DBOBjectCreationFailed(DBException):
     pass
+
+
+class DBBatchWriteFailed(DBException):
+    def __init__(self, message: str, results: list) -> None:
+        super().__init__(message)
+        self.results = results
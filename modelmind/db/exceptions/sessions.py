@@ -1,5 +1,17 @@
+from typing import Any
+
 from .base import DBException
 
 
 class SessionNotFound(DBException):
     pass
+
+
+class SessionCompletionFailed(DBException):
+    pass
+
+
+class SessionNotInProgress(DBException):
+    def __init__(self, message: str, session: Any) -> None:
+        super().__init__(message)
+        self.session = session
@@ -0,0 +1,22 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# Reads per collection of the current request, shared by the tasks spawned while handling it
+_reads: ContextVar[Optional[dict[str, int]]] = ContextVar("firestore_reads", default=None)
+
+
+def track_reads() -> dict[str, int]:
+    """Start counting the Firestore reads of the current context and return the live counter."""
+    counter: dict[str, int] = {}
+    _reads.set(counter)
+    return counter
+
+
+def record_reads(collection: str, count: int = 1) -> None:
+    counter = _reads.get()
+    if counter is not None:
+        counter[collection] = counter.get(collection, 0) + count
+
+
+def total_reads(counter: Optional[dict[str, int]]) -> int:
+    return sum(counter.values()) if counter else 0
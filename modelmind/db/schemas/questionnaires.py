@@ -7,6 +7,11 @@ class QuestionnaireConfig(TypedDict, total=False):
     engine: dict
 
 
+class QuestionnaireLanguage(TypedDict):
+    count: int
+    content_hash: str
+
+
 class DBQuestionnaire(DBObject):
     name: str
     description: Optional[str]
@@ -16,3 +21,8 @@ class DBQuestionnaire(DBObject):
 
     owner: str
     visibility: str
+
+    # Incremented on every content change, polled by instances to invalidate their caches
+    content_version: int = 0
+    # Question count and content hash per language, kept in sync with the questions subcollection
+    languages: dict[str, QuestionnaireLanguage] = {}
@@ -19,3 +19,14 @@ class DBResult(DBObject):
     visibility: Visibility = Visibility.PRIVATE
     label: str
     language: str | None = None
+
+
+class DBResultSummary(DBObject):
+    """A result without its answers, for listings."""
+
+    questionnaire_id: DBIdentifier
+    session_id: DBIdentifier
+    profile_id: DBIdentifier = Field(default_factory=lambda: "unknown")
+    visibility: DBResult.Visibility = DBResult.Visibility.PRIVATE
+    label: str
+    language: str | None = None
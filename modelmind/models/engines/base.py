@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Generic, List, Optional, TypeVar
+from typing import Any, Dict, Generic, Iterable, List, Optional, TypeVar
 
 from modelmind.models.analytics.base import BaseAnalytics
 from modelmind.models.questions.schemas import Question
@@ -9,9 +9,11 @@ QuestionType = TypeVar("QuestionType", bound=Question)
 
 
 class BaseEngine(Generic[QuestionType], ABC):
+    questions: List[QuestionType]
     question_key_mapping: Dict[QuestionKey, QuestionType]
 
     def __init__(self, questions: list[QuestionType]) -> None:
+        self.questions = questions
         self.question_key_mapping: Dict[QuestionKey, QuestionType] = self._createquestion_key_mapping(questions)
         super().__init__()
 
@@ -31,11 +33,8 @@ class BaseEngine(Generic[QuestionType], ABC):
 
 
 class Engine(BaseEngine, Generic[QuestionType]):
-    _analytics: list[BaseAnalytics]
-
     def __init__(self, questions: list[QuestionType], config: Optional[Any] = None) -> None:
         super().__init__(questions)
-        self._analytics: list[BaseAnalytics] = []
 
     def is_completed(self, current_result: Result) -> bool:
         return current_result.is_empty()
@@ -49,12 +48,20 @@ class Engine(BaseEngine, Generic[QuestionType]):
         return []
 
     def get_analytics(self, results: Result) -> list[BaseAnalytics]:
-        if not self._analytics:
-            self._analytics = self.build_analytics(results)
-        return self._analytics
+        return self.build_analytics(results)
 
     def calculate_result_label(self, results: Result) -> str:
         return ""
 
+    def update_state(
+        self, current_result: Result, previous_state: Optional[dict[str, Any]] = None
+    ) -> Optional[dict[str, Any]]:
+        """Sync the running state of a session with the current result, None when the engine has no running state."""
+        return None
+
+    def score_many(self, results: Iterable[Result]) -> list[str]:
+        """Calculate the labels of many results, the engine holds no per-result state so it can be reused."""
+        return [self.calculate_result_label(result) for result in results]
+
     async def calculate_remaining_questions_count(self, results: Result) -> int:
         return 0
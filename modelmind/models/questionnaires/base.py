@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Generic, Optional, TypeVar
+from typing import Any, Generic, Optional, TypeVar
 
 from modelmind.models.analytics.base import Analytics
 from modelmind.models.analytics.transformations import combine_analytics_to_schema
@@ -51,11 +51,26 @@ class Questionnaire(BaseQuestionnaire[Question, Engine, Result]):
     ) -> bool:
         return self.engine.is_completed(results)
 
+    def update_state(
+        self, results: Result, previous_state: Optional[dict[str, Any]] = None
+    ) -> Optional[dict[str, Any]]:
+        return self.engine.update_state(results, previous_state)
+
     def get_analytics(self, results: Result) -> list[Analytics]:
         analytics_list = self.engine.get_analytics(results)
 
         return combine_analytics_to_schema(analytics_list)
 
+    def invalid_answers(self, answers: dict[str, Any]) -> dict[str, str]:
+        """Why each invalid answer is rejected, by question key, answers to unknown questions included."""
+        errors = {}
+        for question_key, value in answers.items():
+            question = self.engine.question_key_mapping.get(question_key)
+            error = "unknown question" if question is None else question.question.answer_error(value)
+            if error:
+                errors[question_key] = error
+        return errors
+
     def get_result_label(self, results: Result) -> str:
         return self.engine.calculate_result_label(results)
 
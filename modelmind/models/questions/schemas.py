@@ -1,5 +1,5 @@
 from abc import ABC
-from typing import Literal, Union
+from typing import Any, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -13,6 +13,10 @@ class QuestionType(BaseModel, ABC):
     type: Literal["choice", "text", "scale"]
     answer_type: AnswerType = "string"
 
+    def answer_error(self, value: Any) -> Optional[str]:
+        """Why the value is not a valid answer to the question, None when it is."""
+        return None
+
 
 class ChoiceQuestion(QuestionType):
     type: Literal["choice"]
@@ -23,12 +27,20 @@ class ChoiceQuestion(QuestionType):
     shuffle: bool
     answer_type: AnswerType = "string"
 
+    def answer_error(self, value: Any) -> Optional[str]:
+        values = value if self.multiple and isinstance(value, list) else [value]
+        invalid = [option for option in values if option not in self.options]
+        return f"{invalid} not in the options" if invalid else None
+
 
 class TextQuestion(QuestionType):
     type: Literal["text"]
     text: str
     answer_type: AnswerType = "string"
 
+    def answer_error(self, value: Any) -> Optional[str]:
+        return None if isinstance(value, str) else "expected a text"
+
 
 class ScaleQuestion(QuestionType):
     type: Literal["scale"]
@@ -42,6 +54,13 @@ class ScaleQuestion(QuestionType):
     reversed: bool = False
     answer_type: AnswerType = "number"
 
+    def answer_error(self, value: Any) -> Optional[str]:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return "expected a number"
+        if not self.min <= value <= self.max:
+            return f"expected a number between {self.min} and {self.max}"
+        return None
+
 
 class Question(BaseModel):
     id: QuestionID
@@ -26,7 +26,10 @@ class BaseResult(ABC):
 
 class Result(BaseResult):
     label: Optional[str] = None
+    # Engine specific running state synced with the data, see Engine.update_state
+    state: Optional[Any] = None
 
-    def __init__(self, data: ResultData, label: Optional[str] = None, **kwargs):
+    def __init__(self, data: ResultData, label: Optional[str] = None, state: Optional[Any] = None, **kwargs):
         super().__init__(data=data, **kwargs)
         self.label = label
+        self.state = state
@@ -1,12 +1,16 @@
+from typing import Optional
+
+import httpx
+
 from modelmind.services.httpx_client import HttpxClient
 
 from .schemas import WebhookBody
 
 
 class DiscordWebhookClient(HttpxClient):
-    def __init__(self, base_url: str, webhook_id: str, timeout: int = 8000) -> None:
+    def __init__(self, base_url: str, webhook_id: str, client: Optional[httpx.AsyncClient] = None) -> None:
         self.webhook_id = webhook_id
-        super().__init__(base_url, timeout)
+        super().__init__(base_url, client=client)
 
     async def send_embed_message(self, webhook_body: WebhookBody) -> None:
         await self.request("POST", f"{self.webhook_id}", json=webhook_body)
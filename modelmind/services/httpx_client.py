@@ -1,5 +1,6 @@
 from abc import ABC
 from contextlib import asynccontextmanager
+from importlib.util import find_spec
 from typing import Any, AsyncGenerator, Optional
 
 import httpx
@@ -15,18 +16,50 @@ from httpx._types import (
     URLTypes,
 )
 
+from modelmind.config import HttpClientSettings, settings
+
+
+def create_async_client(client_settings: Optional[HttpClientSettings] = None) -> httpx.AsyncClient:
+    """Create a pooled client meant to live as long as the app, connections are kept alive between requests."""
+    client_settings = client_settings or settings.http_client
+    return httpx.AsyncClient(
+        # HTTP/2 needs the optional h2 package (httpx[http2])
+        http2=client_settings.http2 and find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=client_settings.max_connections,
+            max_keepalive_connections=client_settings.max_keepalive_connections,
+            keepalive_expiry=client_settings.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            connect=client_settings.connect_timeout,
+            read=client_settings.read_timeout,
+            write=client_settings.write_timeout,
+            pool=client_settings.pool_timeout,
+        ),
+    )
+
 
 class HttpxClient(ABC):
-    def __init__(self, base_url: str, timeout: int = 8000, bearer_token: Optional[str] = None) -> None:
+    """
+    Base API client.
+
+    -> With a shared client (see create_async_client) requests reuse its connection pool, the client is not closed.
+    -> Without one, a short lived client is opened for each request.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        bearer_token: Optional[str] = None,
+    ) -> None:
         self.bearer_token = bearer_token
         self.base_url = base_url
+        self.client = client
         self.timeout = timeout
         self._headers = self._default_headers
 
-    @staticmethod
-    async def _raise_on_4xx_5xx(response: httpx.Response) -> None:
-        response.raise_for_status()
-
     @property
     def _default_headers(self) -> dict:
         default_headers = {"content-type": "application/json"}
@@ -37,14 +70,18 @@ class HttpxClient(ABC):
     def set_header(self, key: str, value: str) -> None:
         self._headers[key] = value
 
+    def _build_url(self, url: URLTypes) -> httpx.URL:
+        url = httpx.URL(url)
+        if url.is_absolute_url:
+            return url
+        return httpx.URL(f"{self.base_url.rstrip('/')}/{str(url).lstrip('/')}")
+
     @asynccontextmanager
     async def _aclient(self) -> AsyncGenerator[httpx.AsyncClient, None]:
-        async with httpx.AsyncClient(
-            base_url=self.base_url,
-            event_hooks={"response": [self._raise_on_4xx_5xx]},
-            headers=self._headers,
-            timeout=self.timeout,
-        ) as client:
+        if self.client is not None:
+            yield self.client
+            return
+        async with create_async_client() as client:
             yield client
 
     async def request(
@@ -61,16 +98,23 @@ class HttpxClient(ABC):
         cookies: Optional[CookieTypes] = None,
         extensions: Optional[RequestExtensions] = None,
     ) -> Response:
+        request_headers = httpx.Headers(self._headers)
+        if headers:
+            request_headers.update(headers)
+
         async with self._aclient() as client:
-            return await client.request(
+            response = await client.request(
                 method,
-                url,
+                self._build_url(url),
                 content=content,
                 data=data,
                 files=files,
                 json=json,
                 params=params,
-                headers=headers,
+                headers=request_headers,
                 cookies=cookies,
+                timeout=self.timeout if self.timeout is not None else httpx.USE_CLIENT_DEFAULT,
                 extensions=extensions,
             )
+            response.raise_for_status()
+            return response
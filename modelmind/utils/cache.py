@@ -1,4 +1,9 @@
-from typing import Any, Dict, Optional
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, NamedTuple, Optional
+
+from modelmind.logger import log
 
 
 class SimpleCache:
@@ -10,3 +15,161 @@ class SimpleCache:
 
     def set(self, key: str, value: Any):
         self._cache[key] = value
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    stale_at: float
+    expires_at: float
+
+
+class AsyncLRUCache:
+    """
+    Bounded in-process cache for async loaders.
+
+    -> Values are stored as is, a hit returns the cached object itself so callers must not mutate it.
+    -> Least recently used entries are evicted once max_size is reached, expired entries are reloaded.
+    -> Past soft_ttl an entry is still served while a single background task refreshes it, until ttl expires it.
+    -> Concurrent misses on the same key share a single load, failed loads are not cached.
+    -> A load still running when entries are invalidated is returned to its callers but not stored.
+    """
+
+    def __init__(self, max_size: int, ttl: float, soft_ttl: Optional[float] = None) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.soft_ttl = soft_ttl
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future[Any]] = {}
+        # Predicates of the invalidate_where calls made during a load, checked against the loaded value
+        self._loading_invalidations: Dict[Hashable, List[Callable[[Hashable, Any], bool]]] = {}
+        # Only bumped by clear, invalidations of some keys leave the loads of the other keys untouched
+        self._epoch = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refresh_failures = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, soft_ttl: Optional[float] = None) -> None:
+        now = monotonic()
+        ttl = ttl if ttl is not None else self.ttl
+        soft_ttl = soft_ttl if soft_ttl is not None else self.soft_ttl
+        stale_at = now + min(soft_ttl, ttl) if soft_ttl is not None else now + ttl
+        self._entries[key] = CacheEntry(value, stale_at, now + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        soft_ttl: Optional[float] = None,
+    ) -> Any:
+        now = monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            if entry.stale_at <= now:
+                self.stale_hits += 1
+                self._start_load(key, loader, ttl, soft_ttl, background=True)
+            return entry.value
+
+        self.misses += 1
+        return await asyncio.shield(self._start_load(key, loader, ttl, soft_ttl))
+
+    def _start_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float],
+        soft_ttl: Optional[float],
+        background: bool = False,
+    ) -> "asyncio.Future[Any]":
+        loading = self._loading.get(key)
+        if loading is None:
+            loading = asyncio.ensure_future(self._load(key, loader, ttl, soft_ttl, self._epoch))
+            self._loading[key] = loading
+            # Nobody awaits a background refresh, its failure is reported once here
+            if background:
+                loading.add_done_callback(self._log_refresh_failure)
+        return loading
+
+    def _log_refresh_failure(self, refresh: "asyncio.Future[Any]") -> None:
+        if not refresh.cancelled() and refresh.exception() is not None:
+            self.refresh_failures += 1
+            log.warning("Cache: background refresh failed, serving stale value: %s", refresh.exception())
+
+    async def _load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float],
+        soft_ttl: Optional[float],
+        epoch: int,
+    ) -> Any:
+        try:
+            value = await loader()
+            # An invalidated load is no longer registered, or was matched by invalidate_where once loaded
+            if (
+                epoch == self._epoch
+                and self._loading.get(key) is asyncio.current_task()
+                and not any(predicate(key, value) for predicate in self._loading_invalidations.get(key, ()))
+            ):
+                self.set(key, value, ttl, soft_ttl)
+            return value
+        finally:
+            if self._loading.get(key) is asyncio.current_task():
+                del self._loading[key]
+                self._loading_invalidations.pop(key, None)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        self._loading.pop(key, None)
+        self._loading_invalidations.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry matching the predicate, return the number of dropped entries."""
+        for key in self._loading:
+            self._loading_invalidations.setdefault(key, []).append(predicate)
+        keys = [key for key, entry in self._entries.items() if predicate(key, entry.value)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._loading.clear()
+        self._loading_invalidations.clear()
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "refresh_failures": self.refresh_failures,
+        }
@@ -0,0 +1,102 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import jwt
+import pytest
+from fastapi import Response
+from jose import jwe
+
+from modelmind.api._dependencies.session import get
+from modelmind.api._dependencies.session.create import create_jwt_session_token
+from modelmind.api.business.auth.exceptions import JWTInvalidException
+from modelmind.config import settings
+from modelmind.db.schemas.sessions import DBSession, SessionStatus
+
+SECRET = "next-secret"
+
+
+def encrypt(payload: dict) -> str:
+    key = getattr(get, "__next_encryption_key")(SECRET)
+    return jwe.encrypt(json.dumps(payload), key).decode("utf-8")
+
+
+@pytest.fixture
+def decrypts(monkeypatch: pytest.MonkeyPatch) -> list:
+    get._next_payloads.clear()
+    calls: list = []
+
+    def counting_decrypt(*args: Any) -> Any:
+        calls.append(args)
+        return jwe.decrypt(*args)
+
+    monkeypatch.setattr(get, "decrypt", counting_decrypt)
+    return calls
+
+
+def test_decoded_payloads_are_cached_until_they_expire(decrypts: list) -> None:
+    valid = encrypt({"profileId": "p", "exp": datetime.now().timestamp() + 60})
+    expired = encrypt({"profileId": "p", "exp": datetime.now().timestamp() - 60})
+
+    first = get.decode_next_jwe(valid, SECRET)
+    first["profileId"] = "mutated"
+    assert get.decode_next_jwe(valid, SECRET)["profileId"] == "p"
+    assert len(decrypts) == 1
+
+    get.decode_next_jwe(expired, SECRET)
+    get.decode_next_jwe(expired, SECRET)
+    assert len(decrypts) == 3
+
+    with pytest.raises(Exception):
+        get.decode_next_jwe(valid, "other-secret")
+
+
+def test_invalid_tokens_are_rejected(decrypts: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get, "decrypt", lambda *args: None)
+
+    with pytest.raises(JWTInvalidException):
+        get.decode_next_jwe("token", SECRET)
+
+
+def build_session(**changes: Any) -> DBSession:
+    fields: dict[str, Any] = {
+        "id": "s",
+        "profile_id": "p",
+        "questionnaire_id": "q",
+        "status": SessionStatus.IN_PROGRESS,
+        "language": "en",
+        "created_at": datetime.now(),
+        "updated_at": datetime.now(),
+    }
+    return DBSession(**{**fields, **changes})
+
+
+def test_session_claims_come_from_the_token_until_stale(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.jwt, "session_claims", True)
+    sessions_dao = MagicMock()
+    sessions_dao.get_from_id = AsyncMock(return_value=build_session(language="fr"))
+    fresh = jwt.decode(create_jwt_session_token("s", "p", build_session()), options={"verify_signature": False})
+    stale = {**fresh, "claims": {**fresh["claims"], "stale_at": datetime.now().timestamp() - 1}}
+    response = Response()
+
+    claims = asyncio.run(get.get_session_claims(response, fresh, sessions_dao))
+    assert (claims.questionnaire_id, claims.language, claims.status) == ("q", "en", SessionStatus.IN_PROGRESS)
+    assert sessions_dao.get_from_id.await_count == 0
+    assert "set-cookie" not in response.headers
+
+    claims = asyncio.run(get.get_session_claims(response, stale, sessions_dao))
+    assert claims.language == "fr"
+    assert sessions_dao.get_from_id.await_count == 1
+    assert "set-cookie" in response.headers
+
+
+def test_session_claims_go_stale_when_the_session_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.jwt, "session_claims", True)
+    expires_at = datetime.now() + timedelta(seconds=10)
+
+    token = create_jwt_session_token("s", "p", build_session(expires_at=expires_at))
+
+    claims = jwt.decode(token, options={"verify_signature": False})["claims"]
+    assert claims["stale_at"] == expires_at.timestamp()
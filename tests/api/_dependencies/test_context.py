@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime
+from typing import Any, List
+
+import pytest
+
+from modelmind.api._dependencies.context import QuestionnaireContext
+from modelmind.api.business.questionnaires.exceptions import QuestionnaireNotFoundException
+from modelmind.db.exceptions.questionnaires import DBQuestionnaireNotFound
+from modelmind.db.reads import record_reads, total_reads, track_reads
+from modelmind.db.schemas.questionnaires import DBQuestionnaire
+from modelmind.db.schemas.questions import DBQuestion
+
+
+class FakeQuestionnairesDAO:
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _load(self, name: str) -> None:
+        self.calls.append(name)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        record_reads(name)
+
+    async def get_from_id(self, questionnaire_id: str) -> DBQuestionnaire:
+        await self._load("questionnaires")
+        return DBQuestionnaire.model_construct(id=questionnaire_id, created_at=datetime.now())
+
+    async def get_questions(self, questionnaire_id: str, language: Any = None) -> List[DBQuestion]:
+        await self._load("questions")
+        return []
+
+
+def test_context_loads_each_document_once_and_in_parallel() -> None:
+    dao = FakeQuestionnairesDAO()
+
+    async def handle_request() -> dict[str, int]:
+        reads = track_reads()
+        context = QuestionnaireContext("questionnaire", "en", dao)  # type: ignore[arg-type]
+        await asyncio.gather(
+            context.db_questionnaire(), context.db_questions(), context.db_questionnaire(), context.db_questions()
+        )
+        await context.db_questionnaire()
+        return reads
+
+    reads = asyncio.run(handle_request())
+
+    assert sorted(dao.calls) == ["questionnaires", "questions"]
+    assert dao.max_in_flight == 2
+    assert reads == {"questionnaires": 1, "questions": 1}
+    assert total_reads(reads) == 2
+
+
+def test_failed_load_cancels_the_other_one() -> None:
+    dao = FakeQuestionnairesDAO()
+    questions_cancelled = asyncio.Event()
+
+    async def get_from_id(questionnaire_id: str) -> DBQuestionnaire:
+        raise DBQuestionnaireNotFound(questionnaire_id)
+
+    async def get_questions(questionnaire_id: str, language: Any = None) -> List[DBQuestion]:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            questions_cancelled.set()
+            raise
+        return []
+
+    dao.get_from_id = get_from_id  # type: ignore[method-assign]
+    dao.get_questions = get_questions  # type: ignore[method-assign]
+
+    async def handle_request() -> None:
+        context = QuestionnaireContext("questionnaire", "en", dao)  # type: ignore[arg-type]
+        with pytest.raises(QuestionnaireNotFoundException):
+            await context.questionnaire()
+        assert questions_cancelled.is_set()
+
+    asyncio.run(handle_request())
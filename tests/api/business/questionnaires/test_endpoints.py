@@ -0,0 +1,166 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from modelmind.api._dependencies.notifier import get_event_notifier
+from modelmind.api._dependencies.session.create import create_jwt_session_token
+from modelmind.api.business.questionnaires import endpoints
+from modelmind.api.responses import PydanticJSONResponse
+from modelmind.community.engines.engine_factory import EngineFactory, EngineName
+from modelmind.community.engines.persony.engine_v2 import PersonyEngineV2
+from modelmind.config import settings
+from modelmind.db.daos.questionnaires import QuestionnairesDAO
+from modelmind.db.daos.sessions import SessionsDAO
+from modelmind.db.schemas.sessions import DBSession, SessionStatus
+from tests.community.engines.persony.conftest import build_persony_questions
+from tests.conftest import get_route_path
+from tests.db.conftest import FakeAsyncFirestore
+
+PERSONY_STEPS = [step.value for step in PersonyEngineV2.Step if step != PersonyEngineV2.Step.COMPLETED]
+
+
+def test_background_tasks_are_kept_until_done_and_failures_logged(monkeypatch: pytest.MonkeyPatch) -> None:
+    log = MagicMock()
+    monkeypatch.setattr(endpoints, "log", log)
+    sessions_dao = SessionsDAO(FakeAsyncFirestore())  # type: ignore[arg-type]
+
+    async def run() -> int:
+        endpoints._run_in_background(
+            sessions_dao.update_status("missing", SessionStatus.COMPLETED), "session-status-missing"
+        )
+        running = len(endpoints._background_tasks)
+        await asyncio.sleep(0.01)
+        return running
+
+    assert asyncio.run(run()) == 1
+    assert endpoints._background_tasks == set()
+    assert log.warning.call_args.args[1] == "session-status-missing"
+
+
+QUESTIONS = build_persony_questions(per_category=2)
+
+
+def build_client(db: FakeAsyncFirestore) -> TestClient:
+    EngineFactory.clear_cache()
+    QuestionnairesDAO.cache.clear()
+    SessionsDAO.cache.clear()
+    SessionsDAO.states.clear()
+    db.write(("profiles", "p"), {"sessions": ["s"], "results": []}, merge=False)
+    db.write(
+        ("questionnaires", "answers-q"),
+        {
+            "name": "persony",
+            "description": "",
+            "engine": EngineName.PERSONY_V2.value,
+            "config": {"engine": {"questions_count": {step: 1 for step in PERSONY_STEPS}}},
+            "owner": "modelmind",
+            "visibility": "public",
+            "created_at": datetime.now(),
+            "updated_at": datetime.now(),
+        },
+        merge=False,
+    )
+    for question in QUESTIONS:
+        db.write(("questionnaires", "answers-q", "questions", question.id), question.model_dump(), merge=False)
+    db.write(
+        ("sessions", "s"),
+        {
+            "profile_id": "p",
+            "questionnaire_id": "answers-q",
+            "status": "in_progress",
+            "language": "en",
+            "created_at": datetime.now(),
+            "updated_at": datetime.now(),
+        },
+        merge=False,
+    )
+
+    app = FastAPI(default_response_class=PydanticJSONResponse)
+    app.include_router(endpoints.router)
+    app.state.firestore = db
+    app.dependency_overrides[get_event_notifier] = lambda: MagicMock()
+    client = TestClient(app)
+    client.cookies.set(settings.mm_session_cookie, create_jwt_session_token("s", "p"))
+    return client
+
+
+def submit(client: TestClient, answers: dict) -> Any:
+    return client.post(get_route_path(client.app, "questionnaire_session_answers_submit"), json={"answers": answers})
+
+
+def test_answers_are_stored_and_resumed() -> None:
+    db = FakeAsyncFirestore()
+    client = build_client(db)
+    first = QUESTIONS[0].key
+
+    submitted = submit(client, {first: 3})
+    resumed = submit(client, {})
+
+    assert submitted.status_code == resumed.status_code == 200
+    assert submitted.json()["completed"] == resumed.json()["completed"] == 1
+    assert db.documents[("sessions", "s", "progress", "answers")]["answers"] == {first: 3}
+
+
+def test_running_state_is_kept_in_memory_between_calls(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Claims from the token, the session itself is not read or cached by the answer calls
+    monkeypatch.setattr(settings.jwt, "session_claims", True)
+    db = FakeAsyncFirestore()
+    client = build_client(db)
+    session = DBSession.model_validate({"id": "s", **db.documents[("sessions", "s")]})
+    client.cookies.set(settings.mm_session_cookie, create_jwt_session_token("s", "p", session))
+    first, second = QUESTIONS[0].key, QUESTIONS[1].key
+
+    submit(client, {first: 3})
+    SessionsDAO.cache.clear()
+    response = submit(client, {second: -3})
+
+    assert response.json()["completed"] == 2
+    assert SessionsDAO.states.get("s")["answers"] == {first: 3, second: -3}
+    assert "state" not in db.documents[("sessions", "s")]
+
+
+def test_submission_writes_the_answers_once() -> None:
+    db = FakeAsyncFirestore()
+    client = build_client(db)
+    session = dict(db.documents[("sessions", "s")])
+    writes = db.write_count
+
+    submit(client, {QUESTIONS[0].key: 3})
+    submit(client, {QUESTIONS[1].key: -3})
+
+    assert db.write_count == writes + 2
+    assert list(db.documents[("sessions", "s", "progress", "answers")]["answers"]) == [QUESTIONS[0].key, QUESTIONS[1].key]
+    assert db.documents[("sessions", "s")] == session
+
+
+def test_invalid_answers_are_rejected_before_being_stored() -> None:
+    db = FakeAsyncFirestore()
+    client = build_client(db)
+    first = QUESTIONS[0].key
+
+    for answers in ({"unknown": 1}, {first: "agree"}, {first: 10}):
+        response = submit(client, answers)
+        assert response.status_code == 422
+        assert list(response.json()["detail"]["errors"]) == list(answers)
+
+    assert ("sessions", "s", "progress", "answers") not in db.documents
+    assert submit(client, {}).status_code == 200
+
+
+def test_session_is_completed_through_answers() -> None:
+    db = FakeAsyncFirestore()
+    client = build_client(db)
+
+    submit(client, {QUESTIONS[0].key: 3})
+    response = submit(client, {question.key: -3 for question in QUESTIONS[1:]})
+
+    result_id = response.json()["result_id"]
+    assert response.status_code == 200 and result_id
+    assert db.documents[("results", result_id)]["data"][QUESTIONS[0].key] == 3
+    assert db.documents[("sessions", "s")]["status"] == "completed"
+    assert submit(client, {}).status_code == 409
@@ -0,0 +1,127 @@
+import json
+from datetime import datetime, timezone
+from enum import Enum
+from uuid import UUID
+
+from unittest.mock import patch
+
+from fastapi import APIRouter, Body, FastAPI, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.testclient import TestClient
+
+from modelmind.api.responses import ModelResponseRoute, PydanticJSONResponse
+
+
+class Status(str, Enum):
+    DONE = "done"
+
+
+class Item(BaseModel):
+    id: UUID
+    status: Status
+    created_at: datetime
+
+
+class DetailedItem(Item):
+    secret: str
+
+
+ITEM = Item(
+    id=UUID("12345678-1234-5678-1234-567812345678"),
+    status=Status.DONE,
+    created_at=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+)
+
+
+def build_client() -> TestClient:
+    router = APIRouter(route_class=ModelResponseRoute)
+
+    @router.get("/item")
+    async def get_item(response: Response) -> Item:
+        response.set_cookie("session", "token")
+        return ITEM
+
+    @router.post("/item", status_code=201)
+    async def create_item() -> Item:
+        return ITEM
+
+    @router.get("/detailed")
+    async def get_detailed() -> Item:
+        return DetailedItem(**ITEM.model_dump(), secret="hidden")
+
+    @router.put("/item")
+    async def replace_item(item: Item) -> Item:
+        return item
+
+    @router.put("/items")
+    async def replace_items(first: Item, second: Item = Body()) -> list[Item]:
+        return [first, second]
+
+    app = FastAPI(default_response_class=PydanticJSONResponse)
+    app.include_router(router)
+    return TestClient(app)
+
+
+def build_default_client() -> TestClient:
+    app = FastAPI()
+
+    @app.put("/item")
+    async def replace_item(item: Item) -> Item:
+        return item
+
+    return TestClient(app)
+
+
+def test_render_matches_default_encoding() -> None:
+    rendered = json.loads(PydanticJSONResponse(ITEM).body)
+    assert rendered == jsonable_encoder(ITEM)
+    assert json.loads(PydanticJSONResponse({"items": [ITEM]}).body) == jsonable_encoder({"items": [ITEM]})
+
+
+def test_route_renders_model_with_cookies_and_status() -> None:
+    client = build_client()
+
+    response = client.get("/item")
+    assert response.status_code == 200
+    assert response.json() == jsonable_encoder(ITEM)
+    assert response.cookies["session"] == "token"
+
+    assert client.post("/item").status_code == 201
+
+
+def test_route_filters_subclasses_through_fastapi() -> None:
+    response = build_client().get("/detailed")
+    assert response.status_code == 200
+    assert "secret" not in response.json()
+
+
+def test_body_model_is_validated_from_the_raw_json() -> None:
+    client = build_client()
+    body = jsonable_encoder(ITEM)
+
+    with patch.object(Item, "model_validate_json", wraps=Item.model_validate_json) as validate_json:
+        response = client.put("/item", json=body)
+
+    assert response.status_code == 200
+    assert response.json() == body
+    assert validate_json.call_count == 1
+
+
+def test_invalid_body_gets_the_default_errors() -> None:
+    client, default_client = build_client(), build_default_client()
+
+    for content in ('{"id": "not-a-uuid", "status": "done"}', '{"id": ', "[]"):
+        response = client.put("/item", content=content, headers={"content-type": "application/json"})
+        expected = default_client.put("/item", content=content, headers={"content-type": "application/json"})
+        assert response.status_code == expected.status_code == 422
+        assert response.json() == expected.json()
+
+
+def test_combined_bodies_are_left_to_fastapi() -> None:
+    body = jsonable_encoder(ITEM)
+
+    response = build_client().put("/items", json={"first": body, "second": body})
+
+    assert response.status_code == 200
+    assert response.json() == [body, body]
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from google.api_core.exceptions import AlreadyExists, ServiceUnavailable
+
+from modelmind.commands.complete_session import CompleteSessionCommand
+from modelmind.db.daos.profiles import ProfilesDAO
+from modelmind.db.daos.results import ResultsDAO
+from modelmind.db.daos.sessions import SessionsDAO
+from modelmind.db.exceptions.sessions import SessionCompletionFailed, SessionNotInProgress
+from modelmind.db.schemas.sessions import DBSession, SessionStatus
+from modelmind.models.results import Result
+from tests.db.conftest import FakeAsyncFirestore
+
+
+def build_command(commit_errors: list) -> tuple[CompleteSessionCommand, list[MagicMock]]:
+    batches: list[MagicMock] = []
+
+    def new_batch() -> MagicMock:
+        batch = MagicMock()
+        error = commit_errors.pop(0) if commit_errors else None
+
+        async def commit() -> None:
+            if error:
+                raise error
+
+        batch.commit = commit
+        batches.append(batch)
+        return batch
+
+    session = DBSession(
+        id="session",
+        profile_id="profile",
+        questionnaire_id="questionnaire",
+        status=SessionStatus.IN_PROGRESS,
+        language="en",
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+    snapshot = MagicMock(exists=True, update_time=datetime.now())
+    snapshot.to_dict.return_value = session.model_dump(exclude={"id"})
+    client = MagicMock()
+    client.batch.side_effect = new_batch
+    client.collection.return_value.document.return_value.get = AsyncMock(return_value=snapshot)
+    command = CompleteSessionCommand(
+        session,
+        Result(data={"P-IE-0": 1}, label="INTJ"),
+        ResultsDAO(client),
+        ProfilesDAO(client),
+        SessionsDAO(client),
+        backoff=0,
+    )
+    return command, batches
+
+
+def test_completion_writes_everything_in_one_batch() -> None:
+    command, batches = build_command([])
+
+    db_result = asyncio.run(command.run())
+
+    assert len(batches) == 1
+    assert batches[0].create.call_count == 1
+    assert batches[0].update.call_count == 2
+    assert db_result.session_id == "session"
+    assert db_result.label == "INTJ"
+
+
+def test_completion_retries_with_the_same_result_id() -> None:
+    command, batches = build_command([ServiceUnavailable("unavailable"), AlreadyExists("exists")])
+
+    db_result = asyncio.run(command.run())
+
+    assert len(batches) == 2
+    created_refs = [batch.create.call_args.args[0] for batch in batches]
+    assert created_refs[0] == created_refs[1]
+    assert db_result.id == batches[0].create.call_args.args[1]["id"]
+
+
+def test_completion_fails_after_max_attempts() -> None:
+    command, batches = build_command([ServiceUnavailable("unavailable")] * 3)
+
+    with pytest.raises(SessionCompletionFailed):
+        asyncio.run(command.run())
+    assert len(batches) == 3
+
+
+def test_completion_by_another_instance_is_not_completed_again() -> None:
+    db = FakeAsyncFirestore()
+    db.documents[("profiles", "profile")] = {"results": []}
+    session_data = {
+        "profile_id": "profile",
+        "questionnaire_id": "questionnaire",
+        "status": "in_progress",
+        "language": "en",
+        "created_at": datetime.now(),
+        "updated_at": datetime.now(),
+    }
+    db.write(("sessions", "session"), session_data, merge=False)
+    sessions_dao = SessionsDAO(db)  # type: ignore[arg-type]
+    get_versioned = sessions_dao.get_versioned
+
+    async def completed_after_read(session_id: str) -> Any:
+        read = await get_versioned(session_id)
+        if db.documents[("sessions", "session")]["status"] == "in_progress":
+            # Another instance completes the session between the read and the commit
+            db.update(("sessions", "session"), {"status": "completed", "result_id": "other"})
+        return read
+
+    sessions_dao.get_versioned = completed_after_read  # type: ignore[method-assign]
+    session = asyncio.run(sessions_dao.get_from_id("session"))
+    command = CompleteSessionCommand(
+        session,
+        Result(data={"P-IE-0": 1}, label="INTJ"),
+        ResultsDAO(db),  # type: ignore[arg-type]
+        ProfilesDAO(db),  # type: ignore[arg-type]
+        sessions_dao,
+    )
+
+    with pytest.raises(SessionNotInProgress) as error:
+        asyncio.run(command.run())
+
+    assert error.value.session.result_id == "other"
+    assert not [path for path in db.documents if path[0] == "results"]
+    assert SessionsDAO.cache.get(sessions_dao.cache_key("session")).status == SessionStatus.COMPLETED
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+
+from google.api_core.exceptions import PermissionDenied
+
+from modelmind.commands.rescore_results import RescoreResultsCommand, init_scoring_worker, score_batch
+from modelmind.community.engines.engine_factory import EngineFactory, EngineName
+from modelmind.db.daos.questionnaires import QuestionnairesDAO
+from modelmind.db.daos.results import ResultsDAO
+from modelmind.db.exceptions.base import DBBatchWriteFailed
+from modelmind.models.results import Result
+from tests.community.engines.persony.conftest import build_persony_questions
+from tests.db.conftest import FakeAsyncFirestore
+
+QUESTIONS = build_persony_questions(per_category=2)
+ENGINE = EngineFactory.create_engine(EngineName.PERSONY_V2, questions=QUESTIONS)
+ANSWERS = [{question.key: 3 for question in QUESTIONS}, {question.key: -3 for question in QUESTIONS}]
+
+
+def seed(db: FakeAsyncFirestore, labels: list[str]) -> None:
+    QuestionnairesDAO.cache.clear()
+    db.documents[("questionnaires", "q")] = {
+        "name": "persony",
+        "description": "",
+        "engine": EngineName.PERSONY_V2.value,
+        "owner": "modelmind",
+        "visibility": "public",
+        "created_at": datetime.now(),
+        "updated_at": datetime.now(),
+    }
+    for question in QUESTIONS:
+        db.documents[("questionnaires", "q", "questions", question.id)] = question.model_dump()
+    for i, label in enumerate(labels):
+        db.documents[("results", f"r{i}")] = {
+            "session_id": "s",
+            "questionnaire_id": "q",
+            "data": ANSWERS[i % 2] if label != "invalid" else {QUESTIONS[0].key: "invalid"},
+            "label": label,
+            "created_at": datetime(2024, 1, 1 + i),
+            "updated_at": datetime(2024, 1, 1 + i),
+        }
+
+
+def build_command(db: FakeAsyncFirestore, **kwargs: Any) -> RescoreResultsCommand:
+    return RescoreResultsCommand(
+        "q", QuestionnairesDAO(db), ResultsDAO(db), batch_size=2, workers=0, **kwargs  # type: ignore[arg-type]
+    )
+
+
+def test_score_many_matches_single_scoring() -> None:
+    results = [Result(data=answers) for answers in ANSWERS]
+
+    assert ENGINE.score_many(results) == [ENGINE.calculate_result_label(result) for result in results]
+
+
+def test_score_batch_gives_none_to_results_that_cannot_be_scored() -> None:
+    init_scoring_worker(EngineName.PERSONY_V2, [question.model_dump() for question in QUESTIONS], None)
+
+    labels = score_batch([ANSWERS[0], {QUESTIONS[0].key: "invalid"}])
+
+    assert labels == [ENGINE.calculate_result_label(Result(data=ANSWERS[0])), None]
+
+
+def test_rescore_updates_changed_labels_in_process() -> None:
+    db = FakeAsyncFirestore()
+    current = ENGINE.calculate_result_label(Result(data=ANSWERS[0]))
+    seed(db, [current, "outdated", "invalid"])
+
+    report = asyncio.run(build_command(db).run())
+
+    assert (report["total"], report["updated"], report["unchanged"], report["failed"]) == (3, 1, 1, 1)
+    assert report["checkpoint"] == "r2"
+    assert db.documents[("results", "r1")]["label"] == ENGINE.calculate_result_label(Result(data=ANSWERS[1]))
+    assert db.documents[("results", "r2")]["label"] == "invalid"
+
+
+def test_rescore_dry_run_writes_nothing() -> None:
+    db = FakeAsyncFirestore()
+    seed(db, ["outdated", "outdated"])
+
+    report = asyncio.run(build_command(db, dry_run=True).run())
+
+    assert report["updated"] == 2
+    assert db.commits == []
+    assert db.documents[("results", "r0")]["label"] == "outdated"
+
+
+def test_rescore_counts_failed_writes_as_failed() -> None:
+    db = FakeAsyncFirestore()
+    seed(db, ["outdated", "outdated"])
+    db.commit_errors.append(PermissionDenied("denied"))
+
+    report = asyncio.run(build_command(db).run())
+
+    assert (report["updated"], report["failed"]) == (0, 2)
+    assert db.documents[("results", "r0")]["label"] == "outdated"
+
+
+def test_rescore_checkpoint_stops_before_unwritten_pages() -> None:
+    db = FakeAsyncFirestore()
+    seed(db, ["outdated"] * 6)
+    command = build_command(db)
+    update_labels = command.results_dao.update_labels
+
+    async def fail_second_page(labels: dict) -> None:
+        if "r2" in labels:
+            raise DBBatchWriteFailed("denied", [])
+        await update_labels(labels)
+
+    command.results_dao.update_labels = fail_second_page  # type: ignore[method-assign]
+    report = asyncio.run(command.run())
+
+    assert (report["updated"], report["failed"]) == (4, 2)
+    assert report["checkpoint"] == "r1"
+    assert db.documents[("results", "r5")]["label"] != "outdated"
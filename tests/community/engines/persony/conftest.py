@@ -0,0 +1,35 @@
+from typing import List
+
+import pytest
+
+from modelmind.community.engines.persony.dimensions import PersonyDimension
+from modelmind.models.questions.schemas import Question, ScaleQuestion
+
+
+def build_persony_questions(per_category: int = 8, language: str = "en") -> List[Question]:
+    questions = []
+    for dimension in PersonyDimension:
+        for i in range(per_category):
+            questions.append(
+                Question(
+                    id=f"{dimension.value}-{i}",
+                    category=dimension.value,
+                    language=language,
+                    question=ScaleQuestion(
+                        type="scale",
+                        text=f"{dimension.value} question {i}",
+                        min=-3,
+                        max=3,
+                        interval=1,
+                        low_label="Disagree",
+                        high_label="Agree",
+                        reversed=i % 3 == 0,
+                    ),
+                )
+            )
+    return questions
+
+
+@pytest.fixture
+def persony_questions() -> List[Question]:
+    return build_persony_questions()
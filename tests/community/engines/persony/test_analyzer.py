@@ -0,0 +1,55 @@
+import random
+from typing import List
+
+import pytest
+
+from modelmind.community.engines.persony import PersonyEngineV2
+from modelmind.models.questions.schemas import Question
+from modelmind.models.results import Result
+
+
+def test_score_returns_fresh_scores(persony_questions: List[Question]) -> None:
+    engine = PersonyEngineV2(questions=persony_questions, config=None)
+    introvert = Result(data={f"P-IE-{i}": -3 for i in range(1, 3)})
+    extravert = Result(data={f"P-IE-{i}": 3 for i in range(1, 3)})
+
+    first = engine.analyzer.score(introvert)
+    second = engine.analyzer.score(extravert)
+
+    assert first is not second
+    assert (first.advanced_mbti.I, first.advanced_mbti.E) == (6, 0)
+    assert (second.advanced_mbti.I, second.advanced_mbti.E) == (0, 6)
+    assert engine.analyzer.score(introvert).advanced_mbti.I == first.advanced_mbti.I
+
+
+def test_analytics_are_not_cached_across_results(persony_questions: List[Question]) -> None:
+    engine = PersonyEngineV2(questions=persony_questions, config=None)
+
+    introvert = engine.get_analytics(Result(data={"P-IE-1": -3}))
+    extravert = engine.get_analytics(Result(data={"P-IE-1": 3}))
+
+    assert introvert is not extravert
+    assert engine.calculate_result_label(Result(data={"P-IE-1": -3})).startswith("I")
+    assert engine.calculate_result_label(Result(data={"P-IE-1": 3})).startswith("E")
+
+
+@pytest.mark.parametrize("neutral_addition", [1, 2])
+def test_vectorized_scoring_matches_iterative_scoring(persony_questions: List[Question], neutral_addition: int) -> None:
+    pytest.importorskip("numpy")
+    engine = PersonyEngineV2(
+        questions=persony_questions, config={"neutral_addition": neutral_addition, "vectorized_scoring": True}
+    )
+    assert engine.analyzer.kernel is not None
+    rng = random.Random(42)
+
+    for _ in range(50):
+        answered = rng.sample(persony_questions, rng.randint(0, len(persony_questions)))
+        result = Result(data={question.key: rng.randint(-3, 3) for question in answered})
+        result.data["unknown-question"] = 2
+
+        vectorized = engine.analyzer.score(result)
+        iterative = engine.analyzer.score_iterative(result)
+
+        assert [analytic.to_schema() for analytic in vectorized.analytics] == [
+            analytic.to_schema() for analytic in iterative.analytics
+        ]
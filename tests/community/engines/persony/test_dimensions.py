@@ -0,0 +1,39 @@
+import pytest
+
+from modelmind.community.engines.persony import PersonyEngineV1, PersonyEngineV2
+from modelmind.community.engines.persony.dimensions import PERSONY_DIMENSIONS, PersonyDimension
+from modelmind.community.engines.persony.engine_v1 import InvalidQuestionCategory as InvalidQuestionCategoryV1
+from modelmind.community.engines.persony.engine_v2 import InvalidQuestionCategory as InvalidQuestionCategoryV2
+from modelmind.community.theory.jung.functions import JungFunction
+from modelmind.community.theory.mbti.trait import MBTITrait
+
+
+def test_dimensions_table_covers_every_dimension() -> None:
+    assert set(PERSONY_DIMENSIONS) == set(PersonyDimension)
+
+    for dimension in PersonyDimension:
+        data = PERSONY_DIMENSIONS[dimension]
+        assert data.low_trait == dimension.data.get("lowTrait")
+        assert data.high_function == dimension.data.get("highFunction")
+        assert data.has_function == bool(dimension.data_functions)
+        assert data.has_neuroticism == bool(dimension.data_neuroticism)
+
+
+def test_dimension_data_is_frozen() -> None:
+    data = PERSONY_DIMENSIONS[PersonyDimension.LIFESTYLE_NINE]
+
+    assert (data.low_trait, data.high_trait) == (MBTITrait.J, MBTITrait.P)
+    assert (data.low_function, data.high_function) == (JungFunction.Ni, JungFunction.Ne)
+    with pytest.raises(AttributeError):
+        data.low_trait = MBTITrait.I  # type: ignore
+
+
+def test_get_step_from_dimensions_table() -> None:
+    assert PersonyEngineV2.Step.get_step("P-IE") == PersonyEngineV2.Step.PREFERENCES
+    assert PersonyEngineV2.Step.get_step(PersonyDimension.ATTITUDE_ESP) == PersonyEngineV2.Step.ATTITUDE
+    assert PersonyEngineV2.Step.get_step("NEUR-1") == PersonyEngineV2.Step.NEUROTICISM
+
+    with pytest.raises(InvalidQuestionCategoryV1):
+        PersonyEngineV1.Step.get_step("NEUR-1")
+    with pytest.raises(InvalidQuestionCategoryV2):
+        PersonyEngineV2.Step.get_step("unknown")
@@ -0,0 +1,32 @@
+from typing import List
+
+from modelmind.community.engines.persony import PersonyEngineV1, PersonyEngineV2
+from modelmind.community.engines.persony.dimensions import PersonyDimension
+from modelmind.models.questions.schemas import Question
+from modelmind.models.results import Result
+
+
+def test_remaining_questions_by_category_keeps_order(persony_questions: List[Question]) -> None:
+    engine = PersonyEngineV2(questions=persony_questions, config=None)
+    result = Result(data={"P-IE-0": 1, "P-IE-2": -1, "P-NS-1": 0})
+
+    remaining = engine._get_remaining_questions_by_category(PersonyDimension.PREFERENCE_IE, result)
+
+    assert [question.key for question in remaining] == [f"P-IE-{i}" for i in (1, 3, 4, 5, 6, 7)]
+
+
+def test_remaining_questions_by_category_matches_full_scan(persony_questions: List[Question]) -> None:
+    v1_questions = [q for q in persony_questions if q.category not in PersonyDimension.neuroticism()]
+    result = Result(data={question.key: 1 for question in persony_questions[::3]})
+
+    for engine_class, questions in ((PersonyEngineV1, v1_questions), (PersonyEngineV2, persony_questions)):
+        engine = engine_class(questions=questions, config=None)
+        for category in PersonyDimension:
+            expected = [q for q in questions if q.category == category and q.key not in result.data]
+            assert engine._get_remaining_questions_by_category(category, result) == expected
+
+
+def test_remaining_questions_by_unknown_category_is_empty(persony_questions: List[Question]) -> None:
+    engine = PersonyEngineV2(questions=persony_questions[:8], config=None)
+
+    assert engine._get_remaining_questions_by_category(PersonyDimension.NEUROTICISM_1, Result(data={})) == []
@@ -0,0 +1,41 @@
+import random
+from typing import List
+
+from modelmind.community.engines.persony import PersonyEngineV2
+from modelmind.models.questions.schemas import Question
+from modelmind.models.results import Result
+
+
+def test_incremental_state_matches_full_recompute(persony_questions: List[Question]) -> None:
+    engine = PersonyEngineV2(questions=persony_questions, config=None)
+    rng = random.Random(7)
+    data: dict = {}
+    state = None
+
+    for _ in range(12):
+        for question in rng.sample(persony_questions, 6):
+            data[question.key] = rng.randint(-3, 3)
+        if data and rng.random() < 0.3:
+            data.pop(rng.choice(list(data)))
+
+        incremental = Result(data=dict(data))
+        state = engine.update_state(incremental, state)
+        expected = Result(data=dict(data))
+
+        assert engine.get_questions_counts_by_step(incremental) == engine.get_questions_counts_by_step(expected)
+        assert [a.to_schema() for a in engine._score(incremental).analytics] == [
+            a.to_schema() for a in engine.analyzer.score(expected).analytics
+        ]
+        assert engine.calculate_result_label(incremental) == engine.calculate_result_label(expected)
+
+
+def test_state_from_other_questions_is_recomputed(persony_questions: List[Question]) -> None:
+    engine = PersonyEngineV2(questions=persony_questions, config=None)
+    other_engine = PersonyEngineV2(questions=persony_questions, config={"neutral_addition": 2})
+    data = {question.key: 0 for question in persony_questions[:10]}
+
+    stale_state = other_engine.update_state(Result(data=dict(data)))
+    result = Result(data=dict(data))
+    engine.update_state(result, stale_state)
+
+    assert engine._score(result).advanced_mbti.to_schema() == engine.analyzer.score(result).advanced_mbti.to_schema()
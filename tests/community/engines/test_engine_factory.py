@@ -0,0 +1,64 @@
+from typing import List
+
+from modelmind.community.engines.engine_factory import EngineFactory, EngineName
+from modelmind.models.questions.schemas import Question
+from tests.community.engines.persony.conftest import build_persony_questions
+
+
+def test_get_or_create_engine_reuses_compiled_engine() -> None:
+    EngineFactory.clear_cache()
+    builds: List[int] = []
+
+    def questions_builder() -> List[Question]:
+        builds.append(1)
+        return build_persony_questions(per_category=2)
+
+    first = EngineFactory.get_or_create_engine("q1", "en", EngineName.PERSONY_V2, questions_builder, None)
+    second = EngineFactory.get_or_create_engine("q1", "en", EngineName.PERSONY_V2, questions_builder, None)
+    other_language = EngineFactory.get_or_create_engine("q1", "fr", EngineName.PERSONY_V2, questions_builder, None)
+    other_config = EngineFactory.get_or_create_engine(
+        "q1", "en", EngineName.PERSONY_V2, questions_builder, {"max_questions": 4}
+    )
+
+    assert first is second
+    assert other_language is not first
+    assert other_config is not first
+    assert len(builds) == 3
+
+
+def test_invalidate_drops_questionnaire_engines() -> None:
+    EngineFactory.clear_cache()
+    engine = EngineFactory.get_or_create_engine(
+        "q1", "en", EngineName.PERSONY_V2, lambda: build_persony_questions(per_category=2)
+    )
+    other = EngineFactory.get_or_create_engine(
+        "q2", "en", EngineName.PERSONY_V2, lambda: build_persony_questions(per_category=2)
+    )
+
+    EngineFactory.invalidate("q1")
+
+    rebuilt = EngineFactory.get_or_create_engine(
+        "q1", "en", EngineName.PERSONY_V2, lambda: build_persony_questions(per_category=2)
+    )
+    assert rebuilt is not engine
+    assert EngineFactory.get_or_create_engine("q2", "en", EngineName.PERSONY_V2, lambda: []) is other
+
+
+def test_engines_are_keyed_by_the_loaded_content_version() -> None:
+    EngineFactory.clear_cache()
+    EngineFactory.invalidate("q1")
+
+    # A request that loaded its questions before the change builds its engine after the invalidation
+    stale = EngineFactory.get_or_create_engine(
+        "q1", "en", EngineName.PERSONY_V2, lambda: build_persony_questions(per_category=1), content_version=0
+    )
+    current = EngineFactory.get_or_create_engine(
+        "q1", "en", EngineName.PERSONY_V2, lambda: build_persony_questions(per_category=2), content_version=1
+    )
+
+    assert current is not stale
+    assert len(current.questions) == 2 * len(stale.questions)
+    assert (
+        EngineFactory.get_or_create_engine("q1", "en", EngineName.PERSONY_V2, lambda: [], content_version=1)
+        is current
+    )
@@ -0,0 +1,293 @@
+import re
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import uuid4
+
+import pytest
+from google.api_core.exceptions import FailedPrecondition
+from google.cloud.firestore import DELETE_FIELD, Increment
+
+from modelmind.db.daos.questionnaires import QuestionnairesDAO
+from modelmind.db.daos.sessions import SessionsDAO
+
+Path = Tuple[str, ...]
+
+
+def select(data: Optional[Dict[str, Any]], field_paths: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+    if data is None or field_paths is None:
+        return data
+    return {field: data[field] for field in field_paths if field in data}
+
+
+def merge_fields(document: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge like a set with merge=True, nested maps are merged too."""
+    merged = dict(document)
+    for field, value in data.items():
+        if isinstance(value, Increment):
+            merged[field] = merged.get(field, 0) + value.value
+        elif isinstance(value, dict) and isinstance(merged.get(field), dict):
+            merged[field] = merge_fields(merged[field], value)
+        else:
+            merged[field] = value
+    return merged
+
+
+class FakeSnapshot:
+    def __init__(self, path: Path, data: Optional[Dict[str, Any]], update_time: Optional[datetime] = None) -> None:
+        self.id = path[-1]
+        self.reference_path = path
+        self._data = data
+        self.update_time = update_time
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return dict(self._data) if self._data is not None else None
+
+    def get(self, field: str) -> Any:
+        return (self._data or {}).get(field)
+
+
+class FakeWriteResult:
+    def __init__(self) -> None:
+        self.update_time = datetime.now()
+
+
+class FakeDocumentReference:
+    def __init__(self, db: "FakeAsyncFirestore", path: Path) -> None:
+        self.db = db
+        self.path = path
+        self.id = path[-1]
+
+    def collection(self, name: str) -> "FakeCollectionReference":
+        return FakeCollectionReference(self.db, self.path + (name,))
+
+    async def get(self, field_paths: Optional[List[str]] = None) -> FakeSnapshot:
+        self.db.reads += 1
+        data = select(self.db.documents.get(self.path), field_paths)
+        return FakeSnapshot(self.path, data, self.db.update_times.get(self.path))
+
+    async def set(self, data: Dict[str, Any], merge: bool = False) -> FakeWriteResult:
+        self.db.write(self.path, data, merge=merge)
+        return FakeWriteResult()
+
+    async def update(self, data: Dict[str, Any]) -> FakeWriteResult:
+        self.db.update(self.path, data)
+        return FakeWriteResult()
+
+
+class FakeQuery:
+    def __init__(self, db: "FakeAsyncFirestore", path: Path, filters: Optional[List[Tuple[str, Any]]] = None) -> None:
+        self.db = db
+        self.path = path
+        self.filters = filters or []
+        self._limit: Optional[int] = None
+        self._order_by: Optional[str] = None
+        self._start_after: Optional[FakeSnapshot] = None
+        self._select: Optional[List[str]] = None
+
+    def _copy(self, **changes: Any) -> "FakeQuery":
+        query = FakeQuery(self.db, self.path, self.filters)
+        query._limit, query._order_by, query._start_after = self._limit, self._order_by, self._start_after
+        query._select = self._select
+        for name, value in changes.items():
+            setattr(query, f"_{name}", value)
+        return query
+
+    def where(
+        self, field: Optional[str] = None, op: Optional[str] = None, value: Any = None, filter: Any = None
+    ) -> "FakeQuery":
+        if filter is not None:
+            field, op, value = filter.field_path, filter.op_string, filter.value
+        assert op == "==", "only equality filters are supported"
+        query = self._copy()
+        query.filters = self.filters + [(field, value)]  # type: ignore[list-item]
+        return query
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "FakeQuery":
+        assert direction == "ASCENDING", "only ascending order is supported"
+        return self._copy(order_by=field)
+
+    def start_after(self, snapshot: FakeSnapshot) -> "FakeQuery":
+        return self._copy(start_after=snapshot)
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self._copy(limit=count)
+
+    def count(self, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return FakeAggregationQuery(self, lambda documents: len(documents))
+
+    def sum(self, field: str, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return FakeAggregationQuery(self, lambda documents: sum(document.get(field) or 0 for document in documents))
+
+    def select(self, field_paths: List[str]) -> "FakeQuery":
+        return self._copy(select=list(field_paths))
+
+    def _sort_key(self, path: Path, data: Dict[str, Any]) -> Tuple[Any, Path]:
+        # Firestore orders by the order_by field, then by document name
+        return (data.get(self._order_by) if self._order_by else None, path)
+
+    async def stream(self) -> AsyncIterator[FakeSnapshot]:
+        documents = sorted(
+            (
+                (path, data)
+                for path, data in self.db.documents.items()
+                if path[:-1] == self.path and all(data.get(field) == value for field, value in self.filters)
+            ),
+            key=lambda document: self._sort_key(*document),
+        )
+        if self._start_after is not None:
+            cursor = self._sort_key(self._start_after.reference_path, self._start_after.to_dict() or {})
+            documents = [document for document in documents if self._sort_key(*document) > cursor]
+        for path, data in documents[: self._limit]:
+            self.db.reads += 1
+            yield FakeSnapshot(path, select(data, self._select))
+
+
+class FakeAggregationResult:
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+class FakeAggregationQuery:
+    def __init__(self, query: FakeQuery, aggregate: Any) -> None:
+        self.query = query
+        self.aggregate = aggregate
+
+    async def get(self) -> List[List[FakeAggregationResult]]:
+        # Aggregations are billed as a single read, documents are not counted in reads
+        reads = self.query.db.reads
+        documents = [snapshot.to_dict() async for snapshot in self.query.stream()]
+        self.query.db.reads = reads + 1
+        return [[FakeAggregationResult(self.aggregate(documents))]]
+
+
+class FakeCollectionReference(FakeQuery):
+    @property
+    def id(self) -> str:
+        return self.path[-1]
+
+    def document(self, document_id: Optional[str] = None) -> FakeDocumentReference:
+        return FakeDocumentReference(self.db, self.path + (document_id or uuid4().hex,))
+
+    async def add(self, data: Dict[str, Any], document_id: Optional[str] = None) -> Tuple[datetime, Any]:
+        document_ref = self.document(document_id)
+        await document_ref.set(data)
+        return datetime.now(), document_ref
+
+
+class FakeWriteOption(NamedTuple):
+    last_update_time: datetime
+
+
+class FakeWriteBatch:
+    def __init__(self, db: "FakeAsyncFirestore") -> None:
+        self.db = db
+        self.writes: List[Any] = []
+
+    def set(self, reference: FakeDocumentReference, data: Dict[str, Any], merge: bool = False) -> None:
+        self.writes.append(lambda: self.db.write(reference.path, data, merge=merge))
+
+    def create(self, reference: FakeDocumentReference, data: Dict[str, Any]) -> None:
+        def create() -> None:
+            if reference.path in self.db.documents:
+                raise KeyError(f"Document {reference.path} already exists")
+            self.db.write(reference.path, data, merge=False)
+
+        self.writes.append(create)
+
+    def update(
+        self, reference: FakeDocumentReference, data: Dict[str, Any], option: Optional[FakeWriteOption] = None
+    ) -> None:
+        def update() -> None:
+            if option is not None and self.db.update_times.get(reference.path) != option.last_update_time:
+                raise FailedPrecondition(f"Document {reference.path} was written since {option.last_update_time}")
+            self.db.update(reference.path, data)
+
+        self.writes.append(update)
+
+    async def commit(self) -> List[FakeWriteResult]:
+        self.db.commits.append(len(self.writes))
+        if self.db.commit_errors:
+            raise self.db.commit_errors.pop(0)
+        snapshot = {path: dict(data) for path, data in self.db.documents.items()}
+        update_times = dict(self.db.update_times)
+        try:
+            for write in self.writes:
+                write()
+        except Exception:
+            self.db.documents, self.db.update_times = snapshot, update_times
+            raise
+        return [FakeWriteResult() for _ in self.writes]
+
+
+class FakeAsyncFirestore:
+    """In-memory stand-in for the parts of the async Firestore client used by the DAOs."""
+
+    def __init__(self) -> None:
+        self.documents: Dict[Path, Dict[str, Any]] = {}
+        # Distinct update time of every write, for the write preconditions
+        self.update_times: Dict[Path, datetime] = {}
+        self.write_count = 0
+        self.reads = 0
+        # Sizes of the committed batches, and errors raised by the next commits
+        self.commits: List[int] = []
+        self.commit_errors: List[Exception] = []
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, (name,))
+
+    def write(self, path: Path, data: Dict[str, Any], merge: bool) -> None:
+        self.documents[path] = merge_fields(self.documents.get(path, {}) if merge else {}, data)
+        self.touch(path)
+
+    def touch(self, path: Path) -> None:
+        self.write_count += 1
+        self.update_times[path] = datetime(2024, 1, 1) + timedelta(microseconds=self.write_count)
+
+    def update(self, path: Path, data: Dict[str, Any]) -> None:
+        """Apply an update, keys are field paths like in Firestore."""
+        if path not in self.documents:
+            raise KeyError(f"Document {path} not found")
+        document = self.documents[path]
+        for field_path, value in data.items():
+            *parents, field = [quoted or plain for quoted, plain in re.findall(r"`([^`]*)`|([^.]+)", field_path)]
+            target = document
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            if value is DELETE_FIELD:
+                target.pop(field, None)
+            else:
+                target[field] = target.get(field, 0) + value.value if isinstance(value, Increment) else value
+        self.touch(path)
+
+    @staticmethod
+    def write_option(last_update_time: datetime) -> FakeWriteOption:
+        return FakeWriteOption(last_update_time)
+
+    def batch(self) -> "FakeWriteBatch":
+        return FakeWriteBatch(self)
+
+    async def get_all(
+        self, references: Iterable[FakeDocumentReference], field_paths: Optional[List[str]] = None
+    ) -> AsyncIterator[FakeSnapshot]:
+        for reference in references:
+            self.reads += 1
+            yield FakeSnapshot(reference.path, select(self.documents.get(reference.path), field_paths))
+
+
+@pytest.fixture
+def fake_firestore() -> FakeAsyncFirestore:
+    return FakeAsyncFirestore()
+
+
+@pytest.fixture(autouse=True)
+def clear_questionnaire_cache() -> Iterable[None]:
+    QuestionnairesDAO.cache.clear()
+    QuestionnairesDAO.content_versions.clear()
+    SessionsDAO.cache.clear()
+    yield
+    QuestionnairesDAO.cache.clear()
+    QuestionnairesDAO.content_versions.clear()
@@ -0,0 +1,153 @@
+import asyncio
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+
+import pytest
+from google.api_core.exceptions import InvalidArgument, ServiceUnavailable
+from pydantic import ValidationError
+
+from modelmind.config import settings
+from modelmind.db.daos.base import FirestoreDAO
+from modelmind.db.daos.results import ResultsDAO
+from modelmind.db.daos.sessions import SessionsDAO
+from modelmind.db.exceptions.base import DBBatchWriteFailed
+from modelmind.db.schemas.results import DBResult
+from modelmind.db.schemas.sessions import DBSession, SessionStatus
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.firestore, "batch_size", 2)
+    monkeypatch.setattr(settings.firestore, "batch_concurrency", 2)
+    monkeypatch.setattr(settings.firestore, "batch_backoff", 0)
+
+
+def test_batch_add_splits_into_chunks_and_keeps_order(fake_firestore: Any) -> None:
+    dao = ResultsDAO(fake_firestore)
+    fake_firestore.commit_errors = [ServiceUnavailable("unavailable")]
+
+    results = asyncio.run(dao.batch_add([{"index": i} for i in range(5)], doc_ids=[f"r{i}" for i in range(5)]))
+
+    assert [result.document_id for result in results] == [f"r{i}" for i in range(5)]
+    assert all(result.error is None and result.update_time for result in results)
+    # The first chunk failed once and was retried
+    assert sorted(fake_firestore.commits) == [1, 2, 2, 2]
+    assert len(fake_firestore.documents) == 5
+
+
+def test_bulk_write_reports_failed_documents(fake_firestore: Any) -> None:
+    dao = ResultsDAO(fake_firestore)
+    fake_firestore.commit_errors = [InvalidArgument("invalid")]
+
+    async def writes() -> AsyncIterator[Any]:
+        for i in range(3):
+            yield dao.collection().document(f"r{i}"), {"index": i}
+
+    with pytest.raises(DBBatchWriteFailed) as error:
+        asyncio.run(dao.bulk_write(writes()))
+
+    failed = [result.document_id for result in error.value.results if result.error is not None]
+    assert failed == ["r0", "r1"]
+    assert list(fake_firestore.documents) == [("results", "r2")]
+
+
+def seed_results(fake_firestore: Any, count: int) -> None:
+    for i in range(count):
+        fake_firestore.documents[("results", f"r{i + 1}")] = {
+            "session_id": "s",
+            "questionnaire_id": "q",
+            "profile_id": "p",
+            "data": {},
+            "label": "INTJ",
+            "language": "en",
+            # Ties on created_at must not skip documents between pages
+            "created_at": datetime(2024, 1, 1 + i // 2),
+            "updated_at": datetime(2024, 1, 1),
+        }
+
+
+def test_get_many_keeps_input_order_and_reports_missing(fake_firestore: Any) -> None:
+    dao = ResultsDAO(fake_firestore)
+    seed_results(fake_firestore, 2)
+
+    result = asyncio.run(dao.get_many(["r2", "unknown", "r1", "r2"]))
+
+    assert [document.id for document in result.documents] == ["r2", "r1", "r2"]
+    assert result.missing == ["unknown"]
+    assert fake_firestore.reads == 3
+
+
+def test_iter_from_questionnaire_pages_through_cursors_and_resumes(fake_firestore: Any) -> None:
+    dao = ResultsDAO(fake_firestore)
+    seed_results(fake_firestore, 5)
+    fake_firestore.documents[("results", "r1")]["questionnaire_id"] = "other"
+
+    async def collect(resume_after: Any = None) -> list[list[str]]:
+        return [
+            [db_result.id for db_result in page]
+            async for page in dao.iter_from_questionnaire("q", page_size=2, resume_after=resume_after)
+        ]
+
+    assert asyncio.run(collect()) == [["r2", "r3"], ["r4", "r5"]]
+    assert asyncio.run(collect(resume_after="r3")) == [["r4", "r5"]]
+
+
+def test_projections_validate_into_partial_models(fake_firestore: Any) -> None:
+    dao = ResultsDAO(fake_firestore)
+    seed_results(fake_firestore, 2)
+    fake_firestore.documents[("results", "r1")]["data"] = {"P-IE-0": 1}
+
+    summaries = asyncio.run(dao.list_from_profile("p"))
+    full = asyncio.run(dao.list_from_profile("p", fields=None))
+    labels_only = asyncio.run(dao.get("r1", fields=["label"]))
+
+    assert [summary.id for summary in summaries] == ["r1", "r2"]
+    assert all(isinstance(summary, DBResult) and summary.data is None for summary in summaries)
+    assert summaries[0].label == "INTJ" and summaries[0].created_at == datetime(2024, 1, 1)
+    assert full[0].data == {"P-IE-0": 1}
+    assert labels_only.label == "INTJ" and labels_only.questionnaire_id is None
+
+
+def test_count_and_sum_use_aggregation_queries(fake_firestore: Any) -> None:
+    dao = ResultsDAO(fake_firestore)
+    seed_results(fake_firestore, 3)
+    fake_firestore.documents[("results", "r3")]["language"] = "fr"
+    for i, result_id in enumerate(("r1", "r2", "r3")):
+        fake_firestore.documents[("results", result_id)]["score"] = i
+
+    total = asyncio.run(dao.count_from_questionnaire("q"))
+    french = asyncio.run(dao.count_from_questionnaire("q", language="fr"))
+    score = asyncio.run(dao.sum("score"))
+
+    assert (total, french, score) == (3, 1, 3)
+    assert fake_firestore.reads == 3
+
+
+def test_trusted_daos_skip_validation_except_for_samples(fake_firestore: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    dao = SessionsDAO(fake_firestore)
+    data = {"profile_id": "p", "questionnaire_id": "q", "status": "completed", "language": "en", "created_at": "now"}
+
+    monkeypatch.setattr(settings.firestore, "trusted_validation_sample_rate", 0)
+    session = dao.validate("s", data)
+    assert session.status is SessionStatus.COMPLETED
+    assert session.created_at == "now"  # type: ignore[comparison-overlap]
+
+    monkeypatch.setattr(settings.firestore, "trusted_validation_sample_rate", 1)
+    monkeypatch.setattr(SessionsDAO, "schema_drifts", 0)
+    drifted = dao.validate("s", data)
+    assert drifted.status is SessionStatus.COMPLETED
+    assert SessionsDAO.schema_drifts == 1
+    with pytest.raises(ValidationError):
+        dao.validate("s", data, trusted=False)
+    assert SessionsDAO.schema_drifts == 1
+
+
+def test_trusted_daos_cannot_nest_models() -> None:
+    class DBNested(DBSession):
+        result: Optional[DBResult] = None
+
+    with pytest.raises(TypeError, match="result"):
+
+        class NestedDAO(FirestoreDAO[DBNested]):
+            model = DBNested
+            trusted = True
@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+
+import pytest
+from google.cloud.firestore import Increment
+
+from modelmind.db.daos.questionnaires import QuestionnairesDAO
+
+
+def seed_questionnaire(db: Any) -> None:
+    db.documents[("questionnaires", "q1")] = {
+        "name": "persony",
+        "description": "",
+        "engine": "persony-v2",
+        "owner": "modelmind",
+        "visibility": "public",
+        "content_version": 0,
+        "created_at": datetime.now(),
+        "updated_at": datetime.now(),
+    }
+    db.documents[("questionnaires", "q1", "questions", "q1_P-IE-0_en")] = {"language": "en", "text": "Before"}
+
+
+def test_content_version_change_from_another_instance_invalidates_cache(fake_firestore: Any) -> None:
+    seed_questionnaire(fake_firestore)
+    dao = QuestionnairesDAO(fake_firestore)  # type: ignore[arg-type]
+
+    async def run() -> tuple[list, list, list, list]:
+        before = await dao.get_questions("q1", "en")
+        unchanged = await dao.poll_content_versions()
+
+        # Another instance edits the question and bumps the version, this process cache is untouched
+        fake_firestore.write(("questionnaires", "q1", "questions", "q1_P-IE-0_en"), {"text": "After"}, merge=True)
+        fake_firestore.write(("questionnaires", "q1"), {"content_version": Increment(1)}, merge=True)
+        cached = await dao.get_questions("q1", "en")
+
+        outdated = await dao.poll_content_versions()
+        after = await dao.get_questions("q1", "en")
+        return unchanged, outdated, [q.text for q in before + cached], [q.text for q in after]
+
+    unchanged, outdated, before, after = asyncio.run(run())
+
+    assert unchanged == []
+    assert before == ["Before", "Before"]
+    assert outdated == ["q1"]
+    assert after == ["After"]
+    assert QuestionnairesDAO.content_versions == {"q1": 1}
+
+
+def test_update_question_bumps_content_version(fake_firestore: Any) -> None:
+    seed_questionnaire(fake_firestore)
+    dao = QuestionnairesDAO(fake_firestore)  # type: ignore[arg-type]
+
+    async def run() -> list:
+        await dao.get_questions("q1", "en")
+        await dao.update_question("q1", {"id": "P-IE-0", "language": "en", "text": "After"})
+        return await dao.get_questions("q1", "en")
+
+    assert [q.text for q in asyncio.run(run())] == ["After"]
+    assert fake_firestore.documents[("questionnaires", "q1")]["content_version"] == 1
+
+
+def test_languages_map_is_kept_in_sync_and_used_for_validation(fake_firestore: Any) -> None:
+    seed_questionnaire(fake_firestore)
+    dao = QuestionnairesDAO(fake_firestore)  # type: ignore[arg-type]
+
+    async def run() -> tuple[list, bool, bool, int]:
+        await dao.add_questions(
+            "q1",
+            [
+                {"id": "P-IE-0", "language": "fr", "text": "Avant"},
+                {"id": "P-IE-1", "language": "pt-BR", "text": "Antes"},
+            ],
+        )
+        await dao.refresh_languages("q1", ["en"])
+        reads = fake_firestore.reads
+        languages = await dao.get_available_languages("q1")
+        available = await dao.is_language_available("q1", "pt-BR")
+        unavailable = await dao.is_language_available("q1", "de")
+        return sorted(languages), available, unavailable, fake_firestore.reads - reads
+
+    languages, available, unavailable, reads = asyncio.run(run())
+
+    stored = fake_firestore.documents[("questionnaires", "q1")]["languages"]
+    assert languages == ["en", "fr", "pt-BR"]
+    assert available and not unavailable
+    assert reads == 1
+    assert stored["fr"]["count"] == 1 and stored["en"]["count"] == 1
+    assert stored["fr"]["content_hash"] != stored["en"]["content_hash"]
+
+
+def test_languages_without_questions_are_not_available(fake_firestore: Any) -> None:
+    seed_questionnaire(fake_firestore)
+    fake_firestore.documents[("questionnaires", "q1", "questions", "q1_P-IE-0_fr")] = {"language": "fr", "text": "Avant"}
+    fake_firestore.documents[("questionnaires", "q1")]["languages"] = {"de": {"count": 0, "content_hash": ""}}
+    dao = QuestionnairesDAO(fake_firestore)  # type: ignore[arg-type]
+
+    async def run() -> tuple[bool, list, bool]:
+        stored_empty = await dao.is_language_available("q1", "de")
+        await dao.refresh_languages("q1")
+        del fake_firestore.documents[("questionnaires", "q1", "questions", "q1_P-IE-0_fr")]
+        await dao.refresh_languages("q1", ["fr"])
+        return stored_empty, await dao.get_available_languages("q1"), await dao.is_language_available("q1", "fr")
+
+    stored_empty, languages, fr_available = asyncio.run(run())
+
+    assert not stored_empty
+    assert languages == ["en"]
+    assert not fr_available
+    assert list(fake_firestore.documents[("questionnaires", "q1")]["languages"]) == ["en"]
+
+
+def test_questions_are_served_stale_while_refreshed(fake_firestore: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    seed_questionnaire(fake_firestore)
+    dao = QuestionnairesDAO(fake_firestore)  # type: ignore[arg-type]
+    monkeypatch.setattr(QuestionnairesDAO.cache, "soft_ttl", 0)
+
+    async def run() -> list:
+        before = await dao.get_questions("q1", "en")
+        fake_firestore.write(("questionnaires", "q1", "questions", "q1_P-IE-0_en"), {"text": "After"}, merge=True)
+        stale = await dao.get_questions("q1", "en")
+        await asyncio.sleep(0.01)
+        return [q.text for q in before + stale + await dao.get_questions("q1", "en")]
+
+    assert asyncio.run(run()) == ["Before", "Before", "After"]
+    # Questions follow the cache settings, they are not expired before the hard ttl
+    entry = QuestionnairesDAO.cache._entries[("questions", "q1", "en")]
+    assert entry.expires_at - entry.stale_at == pytest.approx(QuestionnairesDAO.cache.ttl)
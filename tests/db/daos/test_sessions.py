@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any
+
+from modelmind.api._dependencies.session.get import fetch_session
+from modelmind.db.daos.sessions import SessionsDAO
+from modelmind.db.schemas.sessions import SessionStatus
+
+
+def test_sessions_are_cached_and_kept_up_to_date_by_writes(fake_firestore: Any) -> None:
+    dao = SessionsDAO(fake_firestore)
+    hits = SessionsDAO.cache.hits
+
+    async def run() -> Any:
+        session = await dao.create("p", "q", SessionStatus.IN_PROGRESS, "en", id="s")
+        await dao.update_language("s", "fr")
+        await dao.set_result("s", "r")
+        return session, await dao.get_from_id("s")
+
+    created, cached = asyncio.run(run())
+
+    assert fake_firestore.reads == 0
+    assert created.language == "en"
+    assert (cached.language, cached.result_id, cached.status) == ("fr", "r", SessionStatus.COMPLETED)
+    assert SessionsDAO.cache.hits - hits == 1
+
+
+def test_fetch_session_expires_through_the_cache(fake_firestore: Any) -> None:
+    dao = SessionsDAO(fake_firestore)
+    hits, misses = SessionsDAO.cache.hits, SessionsDAO.cache.misses
+    fake_firestore.documents[("sessions", "s")] = {
+        "profile_id": "p",
+        "questionnaire_id": "q",
+        "status": "in_progress",
+        "language": "en",
+        "created_at": datetime.now(),
+        "updated_at": datetime.now(),
+        "expires_at": datetime.now() - timedelta(minutes=1),
+    }
+
+    async def run() -> Any:
+        cached = await dao.get_from_id("s")
+        expired = await fetch_session("s", dao)
+        return cached, expired, await dao.get_from_id("s")
+
+    cached, expired, refetched = asyncio.run(run())
+
+    assert cached.status == SessionStatus.IN_PROGRESS
+    assert expired.status == refetched.status == SessionStatus.EXPIRED
+    assert fake_firestore.documents[("sessions", "s")]["status"] == SessionStatus.EXPIRED
+    assert fake_firestore.reads == 1
+    assert (SessionsDAO.cache.hits - hits, SessionsDAO.cache.misses - misses) == (2, 1)
+
+
+def test_answers_are_merged_into_a_progress_document(fake_firestore: Any) -> None:
+    dao = SessionsDAO(fake_firestore)
+
+    async def run() -> Any:
+        await dao.add_answers("s", {"P-IE-0": 1, "P-IE-1": 2})
+        await dao.add_answers("s", {"P-IE-1": 3, "P-SN-0": None})
+        return await dao.get_answers("s"), await dao.get_answers("unknown")
+
+    answers, missing = asyncio.run(run())
+
+    assert answers == {"P-IE-0": 1, "P-IE-1": 3, "P-SN-0": None}
+    assert missing == {}
+    assert ("sessions", "s") not in fake_firestore.documents
+
+
+def test_fresh_fetch_reads_completions_of_other_instances(fake_firestore: Any) -> None:
+    dao = SessionsDAO(fake_firestore)
+
+    async def run() -> Any:
+        await dao.create("p", "q", SessionStatus.IN_PROGRESS, "en", id="s")
+        # Completed by another instance, this instance still caches the session in progress
+        fake_firestore.update(("sessions", "s"), {"status": "completed", "result_id": "r"})
+        return await fetch_session("s", dao), await fetch_session("s", dao, fresh=True), await dao.get_from_id("s")
+
+    cached, fresh, refreshed = asyncio.run(run())
+
+    assert cached.status == SessionStatus.IN_PROGRESS
+    assert fresh.status == refreshed.status == SessionStatus.COMPLETED
+    assert fresh.result_id == "r"
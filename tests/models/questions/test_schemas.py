@@ -0,0 +1,13 @@
+from modelmind.models.questions.schemas import ChoiceQuestion, ScaleQuestion, TextQuestion
+
+
+def test_answer_errors_follow_the_question_type() -> None:
+    scale = ScaleQuestion(type="scale", text="", min=-3, max=3, interval=1, low_label="", high_label="")
+    choice = ChoiceQuestion(type="choice", text="", multiple=True, display="checkbox", options=["a", "b"], shuffle=False)
+    text = TextQuestion(type="text", text="")
+
+    assert [scale.answer_error(value) for value in (-3, 2.5, 3)] == [None, None, None]
+    assert all(scale.answer_error(value) for value in (4, "3", True, None))
+    assert choice.answer_error(["a", "b"]) is None and choice.answer_error("a") is None
+    assert choice.answer_error(["a", "c"]) == "['c'] not in the options"
+    assert text.answer_error("free text") is None and text.answer_error(1)
@@ -0,0 +1,37 @@
+import asyncio
+
+import httpx
+import pytest
+
+from modelmind.services.discord.webhook import DiscordWebhookClient
+
+
+def test_shared_client_is_reused_and_not_closed() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(204)
+
+    async def send() -> httpx.AsyncClient:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        webhook = DiscordWebhookClient(base_url="https://discord.test/api/webhooks/", webhook_id="42", client=client)
+        await webhook.request("POST", webhook.webhook_id, json={"content": "a"})
+        await webhook.request("POST", webhook.webhook_id, json={"content": "b"})
+        return client
+
+    client = asyncio.run(send())
+
+    assert not client.is_closed
+    assert [str(request.url) for request in requests] == ["https://discord.test/api/webhooks/42"] * 2
+    assert requests[0].headers["content-type"] == "application/json"
+
+
+def test_error_status_raises() -> None:
+    async def send() -> None:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+        webhook = DiscordWebhookClient(base_url="https://discord.test", webhook_id="42", client=client)
+        await webhook.request("POST", "42")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(send())
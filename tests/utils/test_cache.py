@@ -0,0 +1,137 @@
+import asyncio
+
+from modelmind.utils.cache import AsyncLRUCache
+
+
+def test_concurrent_misses_share_one_load() -> None:
+    cache = AsyncLRUCache(max_size=8, ttl=60)
+    loads = 0
+
+    async def loader() -> list[int]:
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return [1, 2, 3]
+
+    async def run() -> list:
+        return await asyncio.gather(*[cache.get_or_load("questions", loader) for _ in range(10)])
+
+    values = asyncio.run(run())
+
+    assert loads == 1
+    assert all(value is values[0] for value in values)
+    assert asyncio.run(cache.get_or_load("questions", loader)) is values[0]
+    assert cache.stats() == {
+        "size": 1,
+        "hits": 1,
+        "stale_hits": 0,
+        "misses": 10,
+        "evictions": 0,
+        "refresh_failures": 0,
+    }
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = AsyncLRUCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_expired_and_failed_loads_are_not_cached() -> None:
+    cache = AsyncLRUCache(max_size=2, ttl=60)
+
+    async def failing() -> int:
+        raise ValueError("not found")
+
+    async def run() -> None:
+        try:
+            await cache.get_or_load("a", failing)
+        except ValueError:
+            pass
+        await cache.get_or_load("b", lambda: asyncio.sleep(0, result=1), ttl=0)
+
+    asyncio.run(run())
+
+    assert len(cache) == 1
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+
+def test_load_running_during_invalidation_is_not_stored() -> None:
+    cache = AsyncLRUCache(max_size=2, ttl=60)
+
+    async def run() -> int:
+        async def loader() -> int:
+            await asyncio.sleep(0.01)
+            return 1
+
+        task = asyncio.ensure_future(cache.get_or_load("a", loader))
+        await asyncio.sleep(0)
+        cache.invalidate_where(lambda key, value: key == "a")
+        return await task
+
+    assert asyncio.run(run()) == 1
+    assert cache.get("a") is None
+
+
+def test_invalidating_a_key_keeps_loads_of_other_keys() -> None:
+    cache = AsyncLRUCache(max_size=4, ttl=60)
+
+    async def loader() -> int:
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def run() -> None:
+        loads = [asyncio.ensure_future(cache.get_or_load(key, loader)) for key in ("a", "b", "c")]
+        await asyncio.sleep(0)
+        cache.invalidate("a")
+        cache.invalidate_where(lambda key, value: key == "b")
+        await asyncio.gather(*loads)
+
+    asyncio.run(run())
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (None, None, 1)
+
+
+def test_stale_entry_is_served_while_refreshed_in_background() -> None:
+    cache = AsyncLRUCache(max_size=2, ttl=60, soft_ttl=0)
+    versions = iter([1, 2])
+
+    async def loader() -> int:
+        await asyncio.sleep(0)
+        return next(versions)
+
+    async def run() -> tuple[int, int, int]:
+        first = await cache.get_or_load("a", loader)
+        stale = await cache.get_or_load("a", loader)
+        await asyncio.sleep(0.01)
+        return first, stale, cache.get("a")
+
+    assert asyncio.run(run()) == (1, 1, 2)
+    assert cache.stale_hits == 1
+    assert cache.misses == 1
+
+
+def test_failed_background_refresh_is_reported_once() -> None:
+    cache = AsyncLRUCache(max_size=2, ttl=60, soft_ttl=0)
+    cache.set("a", 1)
+
+    async def loader() -> int:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("unavailable")
+
+    async def run() -> list[int]:
+        stale = [await cache.get_or_load("a", loader) for _ in range(5)]
+        await asyncio.sleep(0.02)
+        return stale
+
+    assert asyncio.run(run()) == [1] * 5
+    assert cache.stale_hits == 5
+    assert cache.refresh_failures == 1